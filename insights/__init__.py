@@ -77,7 +77,8 @@ from insights.core.plugins import (
     parser,
     rule,
 )
-from insights.core.spec_factory import RawFileProvider, TextFileProvider
+from insights.core.spec_factory import RawFileProvider, TextFileProvider, get_file_patterns
+from insights.core.vfs import open_archive
 from insights.formats import Formatter as FormatterClass, get_formatter
 from insights.parsers import get_active_lines
 from insights.util import defaults
@@ -139,26 +140,57 @@ def add_status(name, nvr, commit=None):
 add_status(package_info["NAME"], get_nvr(), package_info["COMMIT"])
 
 
-def process_dir(broker, root, graph, context, inventory=None, parallel=False):
-    ctx, broker = initialize_broker(root, context=context, broker=broker)
-    log.debug("Processing %s with %s" % (root, ctx))
+_SINGLE_GRAPHS = {}
 
-    if isinstance(ctx, ClusterArchiveContext):
-        from .core.cluster import process_cluster
 
-        archives = [f for f in ctx.all_files if f.endswith(COMPRESSION_TYPES)]
-        return process_cluster(graph, archives, broker=broker, inventory=inventory)
+def _single_graph(graph):
+    """
+    Returns the components of the `graph` in the "single" group.  The same
+    dict is returned for the same `graph` until the components change, so
+    that its :func:`insights.core.dr.get_execution_plan` is cached.
+    """
+    key = (dr.GRAPH_VERSION, id(graph))
+    if key not in _SINGLE_GRAPHS:
+        if len(_SINGLE_GRAPHS) >= 64:
+            _SINGLE_GRAPHS.clear()
+        single = dict((k, v) for k, v in graph.items() if k in dr.COMPONENTS[dr.GROUPS.single])
+        # the graph is kept, so that its id isn't reused
+        _SINGLE_GRAPHS[key] = (graph, single)
+    return _SINGLE_GRAPHS[key][1]
+
+
+def process_dir(broker, root, graph, context, inventory=None, parallel=False, fs=None, prune=False):
+    with get_pool(parallel, "insights-run-pool", {"max_workers": None}) as pool:
+        single = _single_graph(graph)
+        ctx, broker = initialize_broker(
+            root, context=context, broker=broker, components=single, pool=pool, fs=fs
+        )
+        log.debug("Processing %s with %s" % (root, ctx))
 
-    graph = dict((k, v) for k, v in graph.items() if k in dr.COMPONENTS[dr.GROUPS.single])
-    if parallel:
-        with get_pool(parallel, "insights-run-pool", {"max_workers": None}) as pool:
-            broker = dr.run_all(graph, broker, pool)
-    else:
-        broker = dr.run(graph, broker=broker)
+        if isinstance(ctx, ClusterArchiveContext):
+            from .core.cluster import process_cluster
+
+            archives = [f for f in ctx.all_files if f.endswith(COMPRESSION_TYPES)]
+            return process_cluster(graph, archives, broker=broker, inventory=inventory)
+
+        if parallel:
+            broker = dr.run_all(single, broker, pool, prune=prune)
+        else:
+            broker = dr.run(single, broker=broker, prune=prune)
     return broker
 
 
-def _run(broker, graph=None, root=None, context=None, inventory=None, parallel=False):
+def _run(
+    broker,
+    graph=None,
+    root=None,
+    context=None,
+    inventory=None,
+    parallel=False,
+    no_extract=False,
+    extract_needed=False,
+    prune=False,
+):
     """
     run is a general interface that is meant for stand-alone scripts to use
     when executing insights components.
@@ -178,6 +210,14 @@ def _run(broker, graph=None, root=None, context=None, inventory=None, parallel=F
         context (obj): The execution context that's set.
         inventory (str): Path to inventory file.
         parallel (bool): Boolean as to weather to use parallel execution or not.
+        no_extract (bool): Read the files of a tar or zip archive from the
+            archive instead of extracting it, see :mod:`insights.core.vfs`.
+        extract_needed (bool): Extract only the files of the archive that the
+            datasources in the `graph` might read, see
+            :class:`insights.core.archives.SelectiveExtractor`.
+        prune (bool): Skip the components that can never fire, see
+            :meth:`insights.core.dr.ExecutionPlan.prune`.  They are not
+            reported in ``broker.missing_requirements`` then.
 
     Returns:
         broker: object containing the result of the evaluation.
@@ -185,20 +225,23 @@ def _run(broker, graph=None, root=None, context=None, inventory=None, parallel=F
     if not root:
         context = context or HostContext
         broker[context] = context()
-        graph = dict((k, v) for k, v in graph.items() if k in dr.COMPONENTS[dr.GROUPS.single])
+        graph = _single_graph(graph)
         if parallel:
             with get_pool(parallel, "insights-run-pool", {"max_workers": None}) as pool:
-                dr.run_all(graph, broker, pool)
+                dr.run_all(graph, broker, pool, prune=prune)
         else:
-            return dr.run(graph, broker=broker)
+            return dr.run(graph, broker=broker, prune=prune)
 
+    kwargs = dict(inventory=inventory, parallel=parallel, prune=prune)
     if os.path.isdir(root):
-        return process_dir(broker, root, graph, context, inventory=inventory, parallel=parallel)
+        return process_dir(broker, root, graph, context, **kwargs)
+    elif no_extract:
+        with open_archive(root) as afs:
+            return process_dir(broker, afs.root, graph, context, fs=afs, **kwargs)
     else:
-        with extract(root) as ex:
-            return process_dir(
-                broker, ex.tmp_dir, graph, context, inventory=inventory, parallel=parallel
-            )
+        patterns = get_file_patterns(graph) if extract_needed else None
+        with extract(root, patterns=patterns) as ex:
+            return process_dir(broker, ex.tmp_dir, graph, context, **kwargs)
 
 
 def load_default_plugins():
@@ -369,7 +412,31 @@ def run(
         p.add_argument(
             "--no-load-default", help="Don't load the default plugins.", action="store_true"
         )
+        p.add_argument(
+            "--no-extract",
+            help="Read the files of a tar or zip archive without extracting it.",
+            action="store_true",
+        )
+        p.add_argument(
+            "--extract-needed",
+            help="Extract only the files of the archive needed by the rules.",
+            action="store_true",
+        )
         p.add_argument("--parallel", help="Execute rules in parallel.", action="store_true")
+        p.add_argument(
+            "--serve",
+            metavar="SOCKET",
+            help="Serve the archives sent to the UNIX socket with the JSON format instead of analyzing one archive. See insights.core.serve.",
+        )
+        p.add_argument(
+            "--workers", type=int, default=1, help="Number of worker processes with --serve."
+        )
+        p.add_argument(
+            "--max-archives",
+            type=int,
+            default=100,
+            help="Number of archives analyzed by a worker before it's replaced with --serve. 0 means no limit.",
+        )
         p.add_argument(
             "--show-skips",
             help="Capture skips in the broker for troubleshooting.",
@@ -392,6 +459,8 @@ def run(
         global _COLOR
         _COLOR = args.color
 
+        if args.serve:
+            args.format = "json"
         args.format = "insights.formats._json" if args.format == "json" else args.format
         args.format = "insights.formats._yaml" if args.format == "yaml" else args.format
         fmt = args.format if "." in args.format else "insights.formats." + args.format
@@ -469,6 +538,9 @@ def run(
     else:
         graph = dr.COMPONENTS[dr.GROUPS.single]
 
+    if args and args.serve:
+        return _serve(args, formatters[0], graph, context=context, inventory=inventory)
+
     broker = dr.Broker()
     if args:
         broker.store_skips = args.show_skips
@@ -500,9 +572,12 @@ def run(
                         context=context,
                         inventory=inventory,
                         parallel=args.parallel,
+                        no_extract=args.no_extract,
+                        extract_needed=args.extract_needed,
+                        prune=True,
                     )
             else:
-                broker = _run(broker, graph, root, context=context, inventory=inventory)
+                broker = _run(broker, graph, root, context=context, inventory=inventory, prune=True)
 
             for formatter in formatters:
                 formatter.postprocess(broker)
@@ -518,6 +593,8 @@ def run(
                         context=context,
                         inventory=inventory,
                         parallel=args.parallel,
+                        no_extract=args.no_extract,
+                        extract_needed=args.extract_needed,
                     )
             else:
                 broker = _run(broker, graph, root, context=context, inventory=inventory)
@@ -535,6 +612,8 @@ def run(
                         context=context,
                         inventory=inventory,
                         parallel=args.parallel,
+                        no_extract=args.no_extract,
+                        extract_needed=args.extract_needed,
                     )
             else:
                 broker = _run(broker, graph, root, context=context, inventory=inventory)
@@ -549,6 +628,42 @@ def run(
             raise
 
 
+def _serve(args, formatter, graph, context=None, inventory=None):
+    """
+    Serve the archives sent to the ``args.serve`` UNIX socket with the
+    components already loaded and the execution plan compiled.
+    """
+    from io import StringIO
+
+    from insights.core.serve import serve
+
+    # compile the plan once in the server, the workers inherit it
+    dr.get_execution_plan(_single_graph(graph)).compile()
+
+    def handler(request):
+        broker = dr.Broker()
+        broker.store_skips = args.show_skips
+        output = StringIO()
+        impl = formatter.Impl(
+            broker, formatter.missing, formatter.render_content, formatter.show_rules, stream=output
+        )
+        impl.preprocess()
+        _run(
+            broker,
+            graph,
+            request["archive"],
+            context=context,
+            inventory=inventory,
+            no_extract=args.no_extract,
+            extract_needed=args.extract_needed,
+            prune=True,
+        )
+        impl.postprocess()
+        return output.getvalue()
+
+    serve(args.serve, handler, workers=args.workers, max_requests=args.max_archives)
+
+
 def parse_specs(specs):
     """
     -b "hostname=/etc/hostname, redhat_release=/etc/redhat-release, .."
@@ -33,7 +33,7 @@ import json
 import os
 import tempfile
 
-from insights.cleaner.filters import AllowFilter
+from insights.cleaner.filters import AllowFilter, get_matcher
 from insights.cleaner.hostname import Hostname
 from insights.cleaner.ip import IPv4, IPv6
 from insights.cleaner.keyword import Keyword
@@ -61,6 +61,11 @@ class Cleaner(object):
     """
     Class to clean the content of Specs according to the user configuration and
     spec setting.
+
+    The `clean_content` and `clean_file` are thread-safe, the obfuscation
+    databases are protected by a lock in each obfuscator, hence the Cleaner
+    can be shared by the parallel collection.  The obfuscations are hash
+    based and don't depend on the order the content is cleaned in.
     """
 
     def __init__(self, config, rm_conf, fqdn=None):
@@ -99,6 +104,42 @@ class Cleaner(object):
             self.obfuscate.update(hostname=Hostname(self.fqdn)) if 'hostname' in obfs else None
             # - MAC obfuscation
             self.obfuscate.update(mac=Mac()) if 'mac' in obfs else None
+        # Cached pipelines, see `_get_pipeline`
+        self._pipelines = dict()
+
+    def _get_pipeline(self, no_obfuscate=None, no_redact=False, width=False):
+        """
+        Get the ordered parsers to be applied per the `no_obfuscate`,
+        `no_redact` and `width`.  The pipeline is built once per combination
+        and cached, the `allow_filter` is not included as the `allowlist` is
+        different for each spec.
+
+        Returns:
+            tuple: (redact parsers, obfuscate parsers), each is a tuple of
+            `(parser, kwargs)` pairs.
+        """
+        key = (frozenset(no_obfuscate or []), bool(no_redact), bool(width))
+        pipeline = self._pipelines.get(key)
+        if pipeline is None:
+            # 1. Redact when NO "no_redact=True" is set
+            redact = tuple(
+                [(self.redact['pattern'], {})] if self.redact['pattern'] and not no_redact else []
+            )
+            # 2. Filter as per allowlist - (inserted in clean_content)
+            # 3. Obfuscation entries with Order
+            # - Hostname
+            # - IPv4
+            # - IPv6
+            # - Keyword
+            # - Mac
+            # - Password
+            obfuscate = tuple(
+                (self.obfuscate[obf], {'width': width})
+                for obf in sorted(set(self.obfuscate.keys()) - key[0])
+                if self.obfuscate[obf]
+            )
+            pipeline = self._pipelines.setdefault(key, (redact, obfuscate))
+        return pipeline
 
     def clean_content(self, lines, no_obfuscate=None, no_redact=False, allowlist=None, width=False):
         """
@@ -119,27 +160,13 @@ class Cleaner(object):
                 line = parser.parse_line(line, **kwargs)
             return line
 
+        redact, obfuscate = self._get_pipeline(no_obfuscate, no_redact, width)
         # List of parsers to be applied with Order
-        parsers = list()
-        # 1. Redact when NO "no_redact=True" is set
-        if self.redact['pattern'] and not no_redact:
-            parsers.append((self.redact['pattern'], {})) if not no_redact else None
-        # 2. Filter as per allowlist got from add_filter  # copy it to avoid write back
-        (
-            parsers.append((self.redact['allow_filter'], {'allowlist': dict(allowlist)}))
-            if allowlist is not None
-            else None
-        )
-        # 3. Obfuscation entries
-        # - Hostname
-        # - IPv4
-        # - IPv6
-        # - Keyword
-        # - Mac
-        # - Password
-        for obf in set(self.obfuscate.keys()) - set(no_obfuscate or []):
-            if self.obfuscate[obf]:
-                parsers.append((self.obfuscate[obf], {'width': width}))
+        parsers = redact + obfuscate
+        if allowlist is not None:
+            # Filter as per allowlist got from add_filter  # copy it to avoid write back
+            allow_kwargs = {'allowlist': dict(allowlist), 'matcher': get_matcher(allowlist.keys())}
+            parsers = redact + ((self.redact['allow_filter'], allow_kwargs),) + obfuscate
 
         # handle single string
         if not isinstance(lines, list):
@@ -4,9 +4,64 @@ Filtering
 """
 
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+_MATCHERS = {}
+"""Cached matchers, see :func:`get_matcher`."""
+_MATCHERS_SIZE = 256
+
+
+def get_matcher(keys):
+    """
+    Get the compiled matcher of the specified allowlist keys.
+
+    All the keys are merged into one alternation regex so that a line which
+    contains none of the keys is discarded in a single scan.  The matchers are
+    cached per set of keys, i.e. per filtered datasource, since the keys are
+    got from ``filters.get_filters(ds, True)``.  At most ``_MATCHERS_SIZE``
+    matchers are cached.
+
+    Args:
+        keys (iterable): the keys of the allowlist
+
+    Returns:
+        function: the ``search`` method of the compiled regex
+    """
+    keys = frozenset(keys)
+    matcher = _MATCHERS.get(keys)
+    if matcher is None:
+        # longer keys first, to make the alternation deterministic
+        pattern = '|'.join(re.escape(k) for k in sorted(keys, key=lambda k: (-len(k), k)))
+        if len(_MATCHERS) >= _MATCHERS_SIZE:
+            _MATCHERS.clear()
+        matcher = _MATCHERS.setdefault(keys, re.compile(pattern).search)
+    return matcher
+
+
+def _match_line(line, allowlist, search):
+    """
+    Check the line against all the keys left in the allowlist.  Each key found
+    in the line is counted down and is removed from the allowlist when enough
+    lines containing it were found.  The `search` can be the matcher of all
+    the keys, including the removed ones, as the keys left are checked after
+    it matched.
+
+    Returns:
+        bool: True when any key is found in the line
+    """
+    if not search(line):
+        return False
+    found = False
+    for a_key in list(allowlist.keys()):  # copy keys to avoid RuntimeError
+        if a_key in line:
+            found = True
+            allowlist[a_key] -= 1
+            # stop checking it when enough lines contain the key were found
+            allowlist.pop(a_key) if allowlist[a_key] == 0 else None
+    return found
+
 
 class AllowFilter(object):
     """
@@ -18,16 +73,13 @@ class AllowFilter(object):
         if not line:
             return line
         allowlist = kwargs.get('allowlist', {})
+        # keep line when any filter match
         if allowlist:
-            for a_key in list(allowlist.keys()):  # copy keys to avoid RuntimeError
-                # keep line when any filter match
-                # FIXME:
-                # Considering performance, didn't handle multiple filters in one same line
-                if a_key in line:
-                    allowlist[a_key] -= 1
-                    # stop checking it when enough lines contain the key were found
-                    allowlist.pop(a_key) if allowlist[a_key] == 0 else None
-                    return line
+            # the matcher of the full allowlist, the keys are removed from the
+            # "allowlist" when they got enough lines
+            search = kwargs.get('matcher') or get_matcher(allowlist.keys())
+            if _match_line(line, allowlist, search):
+                return line
         # discard line when none filters found
 
     def generate_report(self, report_dir, archive_name):
@@ -40,7 +92,8 @@ class AllowFilter(object):
 
         When a key of allowlist is found in a line, it is added to the result
         list. The key is removed from the allowlist when enough lines
-        containing the key were found.
+        containing the key were found.  A line containing several keys is
+        counted for each of them.
         When the allowlist is empty, an empty result is returned.
 
         The lines are processed in reverse order.   But the processed result
@@ -50,19 +103,35 @@ class AllowFilter(object):
         :param allowlist: dictionary of allowlist
         :return: list of lines
         """
+        result = AllowFilter.filter_reversed_content(reversed(lines), allowlist)
+        # Return the result in right order
+        result.reverse()
+        return result
+
+    @staticmethod
+    def filter_reversed_content(lines, allowlist):
+        """
+        Filter the lines which are in reverse order based on allowlist.
+
+        It's the same as :meth:`filter_content` but the `lines` can be any
+        iterable, e.g. a generator which reads a file backwards.  The `lines`
+        are consumed lazily and no more lines are read once all the keys in
+        the allowlist got enough lines, hence only the kept lines are stored
+        in memory.
+
+        :param lines: iterable of lines in reverse order
+        :param allowlist: dictionary of allowlist
+        :return: list of the kept lines in reverse order
+        """
         allowlist = dict(allowlist)  # copy it to avoid write back
         result = []
-        for idx in range(len(lines) - 1, -1, -1):
-            for a_key in list(allowlist.keys()):  # copy keys to avoid RuntimeError
-                if a_key in lines[idx]:
-                    allowlist[a_key] -= 1
-                    # stop checking it when enough lines contain the key were found
-                    allowlist.pop(a_key) if allowlist[a_key] == 0 else None
-                    result.append(lines[idx])
-                    # stop checking other keys when one key is found
-                    # it's sometimes not fair to other keys, but it's
-                    # the best we can do for performance
+        if not allowlist:
+            return result
+        search = get_matcher(allowlist.keys())
+        for line in lines:
+            if _match_line(line, allowlist, search):
+                result.append(line)
+                if not allowlist:
+                    # all the keys have got enough lines
                     break
-        # Return the result in right order
-        result.reverse()
         return result
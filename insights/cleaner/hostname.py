@@ -7,6 +7,7 @@ import logging
 import hashlib
 import os
 import re
+import threading
 
 from insights.cleaner.utilities import write_report
 
@@ -28,12 +29,15 @@ class Hostname(object):
         # - Hostname obfuscate information
         # - original hostname : obfuscated hostname
         self._hn_db = dict()
+        self._lock = threading.Lock()
+        self._fqdn = fqdn
         fqdn_split = fqdn.split('.')
         self.pattern = (
             None
             if len(fqdn_split) <= 1
             else r'(?![\W\-\:\ \.])[a-zA-Z0-9\-\_\.]*\.{0}'.format('.'.join(fqdn_split[1:]))
         )
+        self._regex = re.compile(self.pattern) if self.pattern else None
         self._hostname = fqdn_split[0]
         self._hn2db(fqdn)
 
@@ -49,8 +53,14 @@ class Hostname(object):
         obf_hn = hashlib.sha1(hn_sp[0].encode('utf-8')).hexdigest()[:12]
         if len(hn_sp) > 1:
             obf_hn = '{0}.{1}'.format(obf_hn, 'example.com')
-        self._hn_db[hn] = obf_hn
-        return obf_hn
+        with self._lock:
+            return self._hn_db.setdefault(hn, obf_hn)
+
+    def _items(self):
+        # a snapshot of the database, the system FQDN first and then ordered
+        # by the original hostname
+        with self._lock:
+            return sorted(self._hn_db.items(), key=lambda x: (x[0] != self._fqdn, x[0]))
 
     def parse_line(self, line, **kwargs):
         '''
@@ -59,8 +69,8 @@ class Hostname(object):
         if not line:
             return line
         try:
-            if self.pattern:
-                hostnames = [each for each in re.findall(self.pattern, line)]
+            if self._regex:
+                hostnames = [each for each in self._regex.findall(line)]
                 for hn in hostnames:
                     new_hn = self._hn2db(hn)
                     logger.debug("Obfuscating FQDN - {0} > {1}".format(hn, new_hn))
@@ -75,7 +85,7 @@ class Hostname(object):
 
     def mapping(self):
         mapping = []
-        for ori, obf in self._hn_db.items():
+        for ori, obf in self._items():
             mapping.append({'original': ori, 'obfuscated': obf})
         return mapping
 
@@ -85,7 +95,7 @@ class Hostname(object):
             logger.info('Creating Hostname Report - %s', hn_report_file)
             lines = ['Obfuscated Hostname,Original Hostname']
             if self._hn_db:
-                for ori, obf in self._hn_db.items():
+                for ori, obf in self._items():
                     lines.append('{0},{1}'.format(obf, ori))
             else:  # pragma: no cover # never false
                 lines.append('None,None')
@@ -17,24 +17,48 @@ import os
 import re
 import socket
 import struct
+import threading
 
 from insights.cleaner.utilities import write_report
 
 logger = logging.getLogger(__name__)
 
 
+def _octet_table():
+    # the octets of the same number of digits ordered by their hash, each is
+    # replaced by the previous one in that cycle, so that no octet is kept and
+    # the length of the address doesn't change
+    table = [0] * 256
+    for octets in (range(10), range(10, 100), range(100, 256)):
+        order = sorted(octets, key=lambda o: hashlib.sha1(str(o).encode('utf-8')).digest())
+        for i, octet in enumerate(order):
+            table[octet] = order[i - 1]
+    return bytes(table)
+
+
+_OCTET_TABLE = _octet_table()
+
+
 class IPv4(object):
     """
     Class for obfuscating IPv4.
+
+    Each octet of the address is replaced as per a fixed hash based table,
+    by another octet of the same number of digits.  So an address is always
+    obfuscated to the same address of the same length, no matter in which
+    order the addresses are seen, and two addresses never get the same
+    obfuscated address.
     """
 
     def __init__(self):
         # - IP obfuscate information
-        self._ip_db = dict()  # IP database
-        self._start_ip = '10.230.230.1'
+        self._ip_db = dict()  # IP database: {obfuscated: original}
+        self._ip_idx = dict()  # Reverse index: {original: obfuscated}
+        self._lock = threading.Lock()
         self._ignore_list = ["127.0.0.1"]
         # self.pattern = r'((?<!(\.|\d))([0-9]{1,3}\.){3}([0-9]){1,3}(\/([0-9]{1,2}))?)'
         self.pattern = r"(((\b25[0-5]|\b2[0-4][0-9]|\b1[0-9][0-9]|\b[1-9][0-9]|\b[1-9]))(\.(\b25[0-5]|\b2[0-4][0-9]|\b1[0-9][0-9]|\b[1-9][0-9]|\b[0-9])){3})"
+        self._regex = re.compile(self.pattern)
 
     def _ip2int(self, ipstr):
         # converts a dotted decimal IP address into an integer that can be incremented
@@ -50,24 +74,23 @@ class IPv4(object):
         existing obfuscated IP entry
         FORMAT:
         {$obfuscated_ip: $original_ip,}
+
+        The reverse index `_ip_idx` ({$original_ip: $obfuscated_ip,}) keeps the
+        lookup O(1).
         '''
         ip_num = self._ip2int(ip)
-        ip_found = False
-        db = self._ip_db
-        for k, v in db.items():
-            if v == ip_num:
-                ret_ip = self._int2ip(k)
-                ip_found = True
-        if ip_found:  # the entry already existed
-            return ret_ip
-        else:  # the entry did not already exist
-            if len(self._ip_db) > 0:
-                new_ip = max(db.keys()) + 1
-            else:
-                new_ip = self._ip2int(self._start_ip)
-            db[new_ip] = ip_num
-
-            return self._int2ip(new_ip)
+        new_ip = self._ip_idx.get(ip_num)
+        if new_ip is None:
+            new_ip = struct.unpack('!I', socket.inet_aton(ip).translate(_OCTET_TABLE))[0]
+            with self._lock:
+                self._ip_db[new_ip] = ip_num
+                self._ip_idx[ip_num] = new_ip
+        return self._int2ip(new_ip)
+
+    def _items(self):
+        # a snapshot of the database, ordered by the obfuscated IP
+        with self._lock:
+            return sorted(self._ip_db.items())
 
     def parse_line(self, line, **kwargs):
         '''
@@ -114,10 +137,11 @@ class IPv4(object):
             else:
                 return line.replace(ip, new_ip)
 
-        if not line:
+        # an IPv4 address contains at least 3 dots
+        if not line or line.count('.') < 3:
             return line
         try:
-            ips = [each[0] for each in re.findall(self.pattern, line)]
+            ips = [each[0] for each in self._regex.findall(line)]
             for ip in sorted(ips or [], key=len, reverse=True):
                 if ip not in self._ignore_list:  # ip must in line
                     if kwargs.get('width', False):
@@ -131,7 +155,7 @@ class IPv4(object):
 
     def mapping(self):
         mapping = []
-        for k, v in self._ip_db.items():
+        for k, v in self._items():
             mapping.append({'original': self._int2ip(v), 'obfuscated': self._int2ip(k)})
         return mapping
 
@@ -140,7 +164,7 @@ class IPv4(object):
             ip_report_file = os.path.join(report_dir, "%s-ipv4.csv" % archive_name)
             logger.info('Creating IPv4 Report - %s', ip_report_file)
             lines = ['Obfuscated IPv4,Original IPv4']
-            for k, v in self._ip_db.items():
+            for k, v in self._items():
                 lines.append('{0},{1}'.format(self._int2ip(k), self._int2ip(v)))
         except Exception as e:  # pragma: no cover
             logger.exception(e)
@@ -158,6 +182,8 @@ class IPv6(object):
 
     def __init__(self):
         self._ipv6_db = dict()  # IPv6 database
+        self._ipv6_obfuscated = set()  # The obfuscated IPv6 in the database
+        self._lock = threading.Lock()
         # Ignore list for IPv6
         self._ignore_list = [r'\s+']  # ignore whitespace
         # IPv6 pattern, stolen from sos
@@ -170,6 +196,8 @@ class IPv6(object):
             r"(([0-9a-f]{1,4}(:[0-9a-f]{0,4}){0,5}))([^.])::(([0-9a-f]{1,4}"
             r"(:[0-9a-f]{1,4}){0,5})?))(/\d{1,3})?(?![:\\a-z0-9])"
         )
+        self._regex = re.compile(self.pattern, re.I)
+        self._ignore_regexs = [re.compile(_i, re.I) for _i in self._ignore_list]
 
     def _ip2db(self, ip):
         '''
@@ -192,15 +220,24 @@ class IPv6(object):
         try:
             if ip in self._ipv6_db:
                 return self._ipv6_db[ip]
-            if ip in self._ipv6_db.values():  # pragma: no cover
-                # avoid nested obfuscating
-                return None
-            self._ipv6_db[ip] = ':'.join(obfuscate_hex(h) for h in ip.split(':'))
-            return self._ipv6_db[ip]
+            with self._lock:
+                if ip in self._ipv6_db:
+                    return self._ipv6_db[ip]
+                if ip in self._ipv6_obfuscated:  # pragma: no cover
+                    # avoid nested obfuscating
+                    return None
+                self._ipv6_db[ip] = ':'.join(obfuscate_hex(h) for h in ip.split(':'))
+                self._ipv6_obfuscated.add(self._ipv6_db[ip])
+                return self._ipv6_db[ip]
         except Exception as e:  # pragma: no cover
             logger.warning(e)
             raise Exception('SubIPv6Error: Unable to Substitute IPv6 Address - %s', ip)
 
+    def _items(self):
+        # a snapshot of the database, ordered by the original IP
+        with self._lock:
+            return sorted(self._ipv6_db.items())
+
     def parse_line(self, line, **kwargs):
 
         def _sub_ip(line, ip):
@@ -211,18 +248,19 @@ class IPv6(object):
             # it's an obfuscated IP
             return line
 
-        if not line:
+        # an IPv6 address contains at least 2 colons
+        if not line or line.count(':') < 2:
             return line
 
-        for ip in re.findall(self.pattern, line, re.I):
-            if any(re.search(_i, ip[0], re.I) for _i in self._ignore_list):
+        for ip in self._regex.findall(line):
+            if any(_i.search(ip[0]) for _i in self._ignore_regexs):
                 continue
             line = _sub_ip(line, ip[0])
         return line
 
     def mapping(self):
         mapping = []
-        for k, v in self._ipv6_db.items():
+        for k, v in self._items():
             mapping.append({'original': k, 'obfuscated': v})
         return mapping
 
@@ -231,7 +269,7 @@ class IPv6(object):
             ip_report_file = os.path.join(report_dir, "%s-ipv6.csv" % archive_name)
             logger.info('Creating IPv6 Report - %s', ip_report_file)
             lines = ['Obfuscated IPv6,Original IPv6']
-            for k, v in self._ipv6_db.items():
+            for k, v in self._items():
                 lines.append('{0},{1}'.format(v, k))
         except Exception as e:  # pragma: no cover
             logger.exception(e)
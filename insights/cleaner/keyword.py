@@ -5,6 +5,8 @@ Keyword Replacement
 
 import logging
 import os
+import re
+import threading
 
 from insights.cleaner.utilities import write_report
 
@@ -21,7 +23,12 @@ class Keyword(object):
         self._kw_key = "keyword"
         self._kw_db = dict()  # keyword database
         self._keywords2db(keywords)
+        # prefilter, lines without any keyword are skipped in one scan
+        self._kw_search = (
+            re.compile('|'.join(re.escape(k) for k in self._kw_db)).search if self._kw_db else None
+        )
         self._obfuscated = set()  # keywords that have been replaced
+        self._lock = threading.Lock()
 
     def _keywords2db(self, keywords):
         # processes optional keywords to add to be obfuscated
@@ -38,19 +45,27 @@ class Keyword(object):
         except Exception as e:  # pragma: no cover
             logger.warning(e)
 
+    def _obfuscated_keywords(self):
+        # the replaced keywords, ordered by the obfuscated keyword
+        with self._lock:
+            obfuscated = list(self._obfuscated)
+        return sorted(obfuscated, key=lambda k: int(self._kw_db[k][len(self._kw_key) :]))
+
     def parse_line(self, line, **kwargs):
-        if not line:
+        if not line or self._kw_search is None or not self._kw_search(line):
             return line
         for k, v in self._kw_db.items():
             if k in line:
                 logger.debug("Replacing Keyword - %s > %s", k, v)
                 line = line.replace(k, v)
-                self._obfuscated.add(k)
+                if k not in self._obfuscated:
+                    with self._lock:
+                        self._obfuscated.add(k)
         return line
 
     def mapping(self):
         mapping = []
-        for k in self._obfuscated:
+        for k in self._obfuscated_keywords():
             mapping.append({'original': k, 'obfuscated': self._kw_db[k]})
         return mapping
 
@@ -59,7 +74,7 @@ class Keyword(object):
             kw_report_file = os.path.join(report_dir, "%s-keyword.csv" % archive_name)
             logger.info('Creating Keyword Report - %s', kw_report_file)
             lines = ['Replaced Keyword,Original Keyword']
-            for k in self._obfuscated:
+            for k in self._obfuscated_keywords():
                 lines.append('{0},{1}'.format(k, self._kw_db[k]))
         except Exception as e:  # pragma: no cover
             logger.exception(e)
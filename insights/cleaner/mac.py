@@ -7,6 +7,7 @@ import hashlib
 import logging
 import os
 import re
+import threading
 
 from insights.cleaner.utilities import write_report
 
@@ -20,12 +21,16 @@ class Mac(object):
 
     def __init__(self):
         self._mac_db = dict()  # MAC database
+        self._mac_obfuscated = set()  # The obfuscated MAC in the database
+        self._lock = threading.Lock()
         # Ignore list for MAC addresses
         # - 00:00:00:00:00:00
         # - FF:FF:FF:FF:FF:FF
         self._ignore_list = [r'\b(?:(?:00:){5}00|(?:ff:){5}ff)\b']
         # MAC address patterns
         self.pattern = r'(?<![0-9a-fA-F:-])([0-9a-fA-F]{2}([:-])(?:[0-9a-fA-F]{2}\2){4}[0-9a-fA-F]{2})(?![0-9a-fA-F:-])'
+        self._regex = re.compile(self.pattern, re.I)
+        self._ignore_regexs = [re.compile(_i, re.I) for _i in self._ignore_list]
 
     def _mac2db(self, mac):
         '''
@@ -43,17 +48,26 @@ class Mac(object):
         try:
             if mac in self._mac_db:
                 return self._mac_db[mac]
-            if mac in self._mac_db.values():  # pragma: no cover
-                # avoid nested obfuscating
-                return None
-            lower = not mac.isupper()
-            sep = '-' if '-' in mac else ':'
-            self._mac_db[mac] = sep.join(obfuscate_hex(h, lower) for h in mac.split(sep))
-            return self._mac_db[mac]
+            with self._lock:
+                if mac in self._mac_db:
+                    return self._mac_db[mac]
+                if mac in self._mac_obfuscated:  # pragma: no cover
+                    # avoid nested obfuscating
+                    return None
+                lower = not mac.isupper()
+                sep = '-' if '-' in mac else ':'
+                self._mac_db[mac] = sep.join(obfuscate_hex(h, lower) for h in mac.split(sep))
+                self._mac_obfuscated.add(self._mac_db[mac])
+                return self._mac_db[mac]
         except Exception as e:  # pragma: no cover
             logger.warning(e)
             raise Exception('SubMacError: Unable to Substitute MAC Addr - %s', mac)
 
+    def _items(self):
+        # a snapshot of the database, ordered by the original MAC
+        with self._lock:
+            return sorted(self._mac_db.items())
+
     def parse_line(self, line, **kwargs):
 
         def _sub_mac(line, mac):
@@ -64,18 +78,19 @@ class Mac(object):
             # it's an obfuscated MAC address
             return line
 
-        if not line:
+        # a MAC address contains at least 5 separators
+        if not line or (line.count(':') < 5 and line.count('-') < 5):
             return line
 
-        for mac in re.findall(self.pattern, line, re.I):
-            if not any(re.search(_i, mac[0], re.I) for _i in self._ignore_list):
+        for mac in self._regex.findall(line):
+            if not any(_i.search(mac[0]) for _i in self._ignore_regexs):
                 line = _sub_mac(line, mac[0])
 
         return line
 
     def mapping(self):
         mapping = []
-        for k, v in self._mac_db.items():
+        for k, v in self._items():
             mapping.append({'original': k, 'obfuscated': v})
         return mapping
 
@@ -84,7 +99,7 @@ class Mac(object):
             mac_report_file = os.path.join(report_dir, "%s-mac.csv" % archive_name)
             logger.info('Creating MAC addr Report - %s', mac_report_file)
             lines = ['Obfuscated MAC,Original MAC']
-            for k, v in self._mac_db.items():
+            for k, v in self._items():
                 lines.append('{0},{1}'.format(v, k))
         except Exception as e:  # pragma: no cover
             logger.exception(e)
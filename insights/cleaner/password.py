@@ -13,6 +13,8 @@ DEFAULT_PASSWORD_REGEXS = [
     r"(password[a-zA-Z0-9_]*)(\s*\:\s*\"*\s*|\s*\"*\s*=\s*\"\s*|\s*=+\s*|\s*--md5+\s*|\s*)([a-zA-Z0-9_!@#$%^&*()+=/-]+)",
     r"(password[a-zA-Z0-9_]*)(\s*\*+\s+)(.+)",
 ]
+# All the above regexes require this keyword
+PASSWORD_KEYWORD = "password"
 
 
 class Password(object):
@@ -25,13 +27,16 @@ class Password(object):
         Password.
     """
 
+    def __init__(self):
+        self._regexs = [re.compile(regex) for regex in DEFAULT_PASSWORD_REGEXS]
+
     def parse_line(self, line, **kwargs):
-        if not line:
+        if not line or PASSWORD_KEYWORD not in line:
             return line
         # password obfuscation
-        for regex in DEFAULT_PASSWORD_REGEXS:
+        for regex in self._regexs:
             tmp_line = line
-            line = re.sub(regex, r"\1\2********", tmp_line)
+            line = regex.sub(r"\1\2********", tmp_line)
             if line != tmp_line:
                 break
         return line
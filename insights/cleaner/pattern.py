@@ -17,14 +17,40 @@ class Pattern(object):
     def __init__(self, exclude, regex=False):
         self._exclude = exclude or []
         self._regex = regex
+        self._searchers = self._compile(self._exclude, regex)
+
+    @staticmethod
+    def _compile(exclude, regex):
+        '''
+        Merge the patterns into as few compiled regexes as possible, so that
+        one line is scanned once instead of once per pattern.
+        '''
+        if not exclude:
+            return []
+        if not regex:
+            return [re.compile('|'.join(re.escape(pat) for pat in exclude)).search]
+        merged, separate = [], []
+        default_flags = re.compile('').flags
+        for pat in exclude:
+            compiled = re.compile(pat)
+            # patterns with groups cannot be merged safely, e.g. backreferences,
+            # nor can the patterns with global flags, e.g. "(?i)", which would
+            # apply to all the merged patterns
+            if compiled.groups or compiled.flags != default_flags:
+                separate.append(compiled)
+            else:
+                merged.append(compiled)
+        searchers = [c.search for c in separate]
+        if len(merged) > 1:
+            merged = [re.compile('|'.join('(?:{0})'.format(c.pattern) for c in merged))]
+        return [c.search for c in merged] + searchers
 
     def parse_line(self, line, **kwargs):
         # redact line per the file-content-redaction.yaml
         if not line:
             return line
         # patterns removal
-        find = re.search if self._regex else lambda x, y: x in y
-        if any(find(pat, line) for pat in self._exclude):
+        if any(search(line) for search in self._searchers):
             logger.debug("Pattern matched, removing line: %s" % line.strip())
             # patterns found, remove it
             return None
@@ -23,6 +23,7 @@ class CoreCollector(object):
     def __init__(self, config):
         self.config = config
         self.archive = InsightsArchive(config)
+        self.tar_file = None
 
     def run_collection(self, rm_conf):
         '''
@@ -37,12 +38,17 @@ class CoreCollector(object):
         logger.debug('Beginning to run core collection ...')
 
         self.config.rhsm_facts_file = constants.rhsm_facts_file
-        collect.collect(
+        # the archive is compressed while collecting unless the directory is wanted
+        compress = not self.config.output_dir
+        output = collect.collect(
             tmp_path=self.archive.tmp_dir,
             archive_name=self.archive.archive_name,
             rm_conf=rm_conf or {},
             client_config=self.config,
+            compress=compress,
         )
+        if compress:
+            self.tar_file = self.archive.tar_file = output[0]
 
         logger.debug('Core collection finished.')
 
@@ -68,5 +74,7 @@ class CoreCollector(object):
         """
         if self.config.output_dir:
             return self.archive.archive_dir
+        elif self.tar_file:
+            return self.tar_file
         else:
             return self.archive.create_tar_file()
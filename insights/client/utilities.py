@@ -30,6 +30,7 @@ from .constants import InsightsConstants as constants
 from .collection_rules import InsightsUploadConf, load_yaml
 from insights.client import cert_auth
 
+from insights.core.archives import SIZES_SUFFIX
 from insights.core.context import Context
 from insights.parsers.os_release import OsRelease
 from insights.parsers.redhat_release import RedhatRelease
@@ -534,6 +535,17 @@ def get_rhel_version():
 
 def largest_spec_in_archive(archive_file):
     logger.info("Checking for large files...")
+    sizes_file = archive_file + SIZES_SUFFIX
+    if os.path.isfile(sizes_file):
+        # the sizes saved while the archive was created
+        with open(sizes_file) as f:
+            sizes = json.load(f)
+        largest = ("", 0, "")
+        for spec, files in sizes.items():
+            for fname, fsize, _ in files:
+                if fsize > largest[1]:
+                    largest = (fname, fsize, spec)
+        return largest
     tar_file = tarfile.open(archive_file, 'r')
     largest_fsize = 0
     largest_file_name = ""
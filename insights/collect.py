@@ -10,6 +10,7 @@ runs all datasources in ``insights.specs.Specs`` and
 from __future__ import print_function
 
 import argparse
+import json
 import logging
 import os
 import sys
@@ -21,6 +22,7 @@ from datetime import datetime, timezone
 from insights import apply_configs, apply_default_enabled, get_pool
 from insights.cleaner import Cleaner
 from insights.core import blacklist, dr, filters
+from insights.core.archives import SIZES_SUFFIX, ArchiveWriter
 from insights.core.serde import Hydration
 from insights.core.spec_factory import SAFE_ENV
 from insights.specs.manifests import manifests
@@ -191,7 +193,11 @@ def collect(
             as well as the final tar.gz.
         compress (boolean): True to create a tar.gz and remove the original
             workspace containing output. False to leave the workspace without
-            creating a tar.gz
+            creating a tar.gz.  The files are compressed as soon as they are
+            collected, with the compressor and level of the "compression" of
+            the manifest, or the compressor of `client_config`, and the sizes
+            of the specs are saved next to the archive, see
+            :data:`insights.core.archives.SIZES_SUFFIX`.
         manifest (str or dict): json document or dictionary containing the
             collection manifest. See default_manifest for an example.  This
             option works only for `insights-collect` where 'client_config'
@@ -242,37 +248,69 @@ def collect(
     output_path = os.path.join(tmp_path, archive_name)
     fs.ensure_path(output_path)
     fs.touch(os.path.join(output_path, "insights_archive.txt"))
+    archive = _create_archive_writer(output_path, client, client_config) if compress else None
 
-    broker = dr.Broker()
-    ctx = create_context(client.get("context", {}))
-    cleaner = Cleaner(client_config, black_list) if client_config else None
-    broker[ctx.__class__] = ctx
-    broker['cleaner'] = cleaner
-    broker['redact_config'] = black_list
-    broker['client_config'] = client_config
-
-    # run in "serial" mode by default
-    run_strategy = client.get("run_strategy", {"name": "serial"})
-    parallel = run_strategy.get("name") == "parallel"
-    to_persist = get_to_persist(client.get("persist", set()))
-
-    if client_config and client_config.obfuscate and parallel:
-        log.warning("Parallel collection is not supported when 'obfuscate' is enabled")
-        parallel = False
+    try:
+        broker = dr.Broker()
+        ctx = create_context(client.get("context", {}))
+        cleaner = Cleaner(client_config, black_list) if client_config else None
+        broker[ctx.__class__] = ctx
+        broker['cleaner'] = cleaner
+        broker['redact_config'] = black_list
+        broker['client_config'] = client_config
+
+        # run in "serial" mode by default
+        run_strategy = client.get("run_strategy", {"name": "serial"})
+        parallel = run_strategy.get("name") == "parallel"
+        to_persist = get_to_persist(client.get("persist", set()))
+
+        pool_args = run_strategy.get("args", {})
+        with get_pool(parallel, "insights-collector-pool", pool_args) as pool:
+            h = Hydration(
+                output_path,
+                ctx,
+                pool=pool,
+                meta_index=client.get("meta_data_index", False),
+                archive=archive,
+            )
+            broker.add_observer(h.make_persister(to_persist))
+            try:
+                dr.run_all(broker=broker, pool=pool, prune=True)
+            finally:
+                h.close()
+
+        collect_errors = _parse_broker_exceptions(broker, EXCEPTIONS_TO_REPORT)
+
+        cleaner.generate_report(archive_name) if cleaner else None
+
+        if compress:
+            return _close_archive_writer(archive, output_path, h.sizes), collect_errors
+    finally:
+        if archive is not None:
+            archive.close()
+    return output_path, collect_errors
 
-    pool_args = run_strategy.get("args", {})
-    with get_pool(parallel, "insights-collector-pool", pool_args) as pool:
-        h = Hydration(output_path, ctx, pool=pool)
-        broker.add_observer(h.make_persister(to_persist))
-        dr.run_all(broker=broker, pool=pool)
 
-    collect_errors = _parse_broker_exceptions(broker, EXCEPTIONS_TO_REPORT)
+def _create_archive_writer(output_path, client, client_config=None):
+    compression = client.get("compression", {})
+    compressor = getattr(client_config, "compressor", None) or compression.get("compressor", "gz")
+    ext = "" if compressor == "none" else "." + compressor
+    return ArchiveWriter(output_path + ".tar" + ext, compressor, level=compression.get("level"))
 
-    cleaner.generate_report(archive_name) if cleaner else None
 
-    if compress:
-        return create_archive(output_path), collect_errors
-    return output_path, collect_errors
+def _close_archive_writer(archive, output_path, sizes):
+    """
+    Adds the files not added while collecting, saves the sizes of the specs
+    next to the archive and removes the `output_path`.
+    """
+    try:
+        archive.add_tree(output_path, os.path.basename(output_path))
+    finally:
+        archive.close()
+    with open(archive.path + SIZES_SUFFIX, "w") as f:
+        json.dump(sizes, f)
+    fs.remove(output_path)
+    return archive.path
 
 
 def _parse_broker_exceptions(broker, exceptions_to_report):
@@ -1,3 +1,4 @@
+import bisect
 import datetime
 import json
 import logging
@@ -7,6 +8,7 @@ import re
 import shlex
 import yaml
 
+from array import array
 from collections import OrderedDict
 from fnmatch import fnmatch
 
@@ -1027,9 +1029,19 @@ class TextFileOutput(Parser, metaclass=ScanMeta):
     def parse_content(self, content):
         """
         Use all the defined scanners to search the log file, setting the
-        properties defined in the scanner.
+        properties defined in the scanner.  The tokens of the scanners
+        defined by :meth:`token_scan`, :meth:`keep_scan` and
+        :meth:`last_scan` are all indexed when the first of them is run.
         """
         self.lines = content
+        tokens = []
+        for scanner in self.scanners.values():
+            token, check = getattr(scanner, 'tokens', None) or (None, None)
+            if check in (all, any):
+                tokens.extend(
+                    [token] if isinstance(token, str) else token if isinstance(token, list) else []
+                )
+        self._scanner_tokens = tokens
         for scanner in self.scanners.values():
             scanner(self)
 
@@ -1039,8 +1051,52 @@ class TextFileOutput(Parser, metaclass=ScanMeta):
         strings in the given list.
         """
         search_by_expression = self._valid_search(s)
+        index = self._token_index()
+        if isinstance(s, str) and s in index:
+            return bool(index[s])
         return any(search_by_expression(l) for l in self.lines)
 
+    def _token_index(self):
+        """
+        Returns the numbers of the lines containing each token searched so
+        far, by token.  It's reset when the ``lines`` are replaced.
+        """
+        cached = getattr(self, '_token_index_cache', None)
+        if cached is None or cached[0] is not self.lines:
+            cached = self._token_index_cache = (self.lines, {})
+        return cached[1]
+
+    def _index_tokens(self, tokens):
+        """
+        Adds the numbers of the lines containing the `tokens`, and the tokens
+        of the scanners which weren't indexed yet, to the token index.
+        """
+        index = self._token_index()
+        tokens = set(tokens).union(getattr(self, '_scanner_tokens', ()))
+        self._scanner_tokens = []
+        for token in tokens:
+            if isinstance(token, str) and token not in index:
+                index[token] = [i for i, l in enumerate(self.lines) if token in l]
+
+    def _search(self, s, check=all):
+        """
+        Returns the numbers of the lines containing `s`, from the token index
+        when `check` is ``all`` or ``any``.
+        """
+        search_by_expression = self._valid_search(s, check)
+        if search_by_expression is None or check not in (all, any):
+            return [i for i, l in enumerate(self.lines) if search_by_expression(l)]
+        tokens = [s] if isinstance(s, str) else s
+        self._index_tokens(tokens)
+        index = self._token_index()
+        if len(tokens) == 1:
+            return index[tokens[0]]
+        if check is any:
+            return sorted(set().union(*(index[t] for t in tokens)))
+        found = sorted((index[t] for t in tokens), key=len)
+        others = [set(f) for f in found[1:]]
+        return [i for i in found[0] if all(i in o for o in others)]
+
     def _parse_line(self, line):
         """
         Parse the line into a dictionary and return it. Only wrap with
@@ -1048,6 +1104,12 @@ class TextFileOutput(Parser, metaclass=ScanMeta):
         """
         return {'raw_line': line}
 
+    def _parse_line_at(self, i):
+        """
+        Parse the line `i` of the ``lines``, see :meth:`_parse_line`.
+        """
+        return self._parse_line(self.lines[i])
+
     def _valid_search(self, s, check=all):
         """
         Check this given `s`, it must be a string or a list of strings.
@@ -1081,14 +1143,15 @@ class TextFileOutput(Parser, metaclass=ScanMeta):
         """
         if num is not None and not isinstance(num, int):
             raise TypeError('Required numbers must be given as a integer')
-        ret = []
-        search_by_expression = self._valid_search(s, check)
-        lines = self.lines[::-1] if reverse else self.lines
-        for l in lines:
-            if (num is None or len(ret) < num) and search_by_expression(l):
-                ret.append(self._parse_line(l))
-        # re-sort to original order
-        return ret[::-1] if reverse else ret
+        found = self._search(s, check)
+        if num is not None:
+            if num <= 0:
+                found = []
+            elif reverse:
+                found = found[-num:]
+            else:
+                found = found[:num]
+        return [self._parse_line_at(i) for i in found]
 
     @classmethod
     def scan(cls, result_key, func):
@@ -1108,6 +1171,8 @@ class TextFileOutput(Parser, metaclass=ScanMeta):
             result = func(self)
             setattr(self, result_key, result)
 
+        # the tokens searched by token_scan, keep_scan and last_scan
+        scanner.tokens = getattr(func, 'tokens', None)
         cls.scanners.update({result_key: scanner})
 
     @classmethod
@@ -1127,9 +1192,9 @@ class TextFileOutput(Parser, metaclass=ScanMeta):
         """
 
         def _scan(self):
-            search_by_expression = self._valid_search(token, check)
-            return any(search_by_expression(l) for l in self.lines)
+            return bool(self._search(token, check))
 
+        _scan.tokens = (token, check)
         cls.scan(result_key, _scan)
 
     @classmethod
@@ -1152,6 +1217,7 @@ class TextFileOutput(Parser, metaclass=ScanMeta):
         def _scan(self):
             return self.get(token, check=check, num=num, reverse=reverse)
 
+        _scan.tokens = (token, check)
         cls.scan(result_key, _scan)
 
     @classmethod
@@ -1173,9 +1239,223 @@ class TextFileOutput(Parser, metaclass=ScanMeta):
             ret = self.get(token, check=check, num=1, reverse=True)
             return ret[0] if ret else dict()
 
+        _scan.tokens = (token, check)
         cls.scan(result_key, _scan)
 
 
+# Annoyingly, strptime insists that it get the whole time string and nothing
+# but the time string.  However, for most logs we only have a string with the
+# timestamp in it.  We can't just catch the ValueError because at that point
+# we do not actually have a valid datetime object.  So we convert the time
+# format string to a regex, use that to find just the timestamp, and then use
+# strptime on that.  Thanks, Python.  All these need to cope with different
+# languages and character sets.  Note that we don't include time zone or other
+# outputs (e.g. day-of-year) that don't usually occur in time stamps.
+_TIME_FORMAT_CONVERSION = {
+    'a': r'\w{3}',
+    'A': r'\w+',  # Week day name
+    'w': r'[0123456]',  # Week day number
+    'd': r'([0 ][123456789]|[12]\d|3[01])',  # Day of month
+    'b': r'\w{3}',
+    'B': r'\w+',  # Month name
+    'm': r'([0 ]\d|1[012])',  # Month number
+    'y': r'\d{2}',
+    'Y': r'\d{4}',  # Year
+    'H': r'([01 ]\d|2[0123])',  # Hour - 24 hour format
+    'I': r'([0 ]?\d|1[012])',  # Hour - 12 hour format
+    'p': r'\w{2}',  # AM / PM
+    'M': r'([012345]\d)',  # Minutes
+    'S': r'([012345]\d|60)',  # Seconds, including leap second
+    'f': r'\d{1,6}',  # Microseconds
+}
+_TIME_FORMAT_RE = re.compile(r'%(\w)')
+_TIME_PARSERS = {}
+_ELEVEN_MONTHS = datetime.timedelta(days=330)
+
+
+def _time_format_to_re(time_format):
+    def replacer(match):
+        if match.group(1) in _TIME_FORMAT_CONVERSION:
+            return _TIME_FORMAT_CONVERSION[match.group(1)]
+        else:
+            raise ParseException(
+                "get_after does not understand strptime format '{c}'".format(c=match.group(0))
+            )
+
+    # Please do not attempt to be tricky and put a regular expression inside
+    # your time format, as we are going to also use it in strptime too and
+    # that may not work out so well.
+    return _TIME_FORMAT_RE.sub(replacer, time_format)
+
+
+def _time_parser(time_format):
+    """
+    Returns the ``(regex, parse function, logs_have_year)`` finding and
+    parsing the time stamps of the ``time_format`` of a
+    :class:`LogFileOutput`, they are built once per time format.
+    """
+    # Grab values of dict as a list first
+    if isinstance(time_format, dict):
+        time_format = list(time_format.values())
+    key = tuple(time_format) if isinstance(time_format, list) else time_format
+    try:
+        return _TIME_PARSERS[key]
+    except (KeyError, TypeError):
+        pass
+
+    # Check time_format - must be string or list.  Set the 'logs_have_year'
+    # flag and timestamp parser function appropriately.
+    if isinstance(time_format, str):
+        logs_have_year = '%Y' in time_format or '%y' in time_format
+        time_re = re.compile('(' + _time_format_to_re(time_format) + ')')
+
+        # Curry strptime with time_format string.
+        def test_parser(logstamp):
+            return datetime.datetime.strptime(logstamp, time_format)
+
+        parse_fn = test_parser
+    elif isinstance(time_format, list):
+        logs_have_year = all('%Y' in tf or '%y' in tf for tf in time_format)
+        time_re = re.compile('(' + '|'.join(_time_format_to_re(tf) for tf in time_format) + ')')
+
+        def test_all_parsers(logstamp):
+            # One of these must match, because the regex has selected only
+            # strings that will match.
+            for tf in time_format:
+                try:
+                    ts = datetime.datetime.strptime(logstamp, tf)
+                except ValueError:
+                    pass
+            return ts
+
+        parse_fn = test_all_parsers
+    else:
+        raise ParseException(
+            "get_after does not recognise time formats of type {t}".format(t=type(time_format))
+        )
+
+    _TIME_PARSERS[key] = (time_re, parse_fn, logs_have_year)
+    return _TIME_PARSERS[key]
+
+
+def _yearless_key(ts):
+    return (ts.month, ts.day, ts.hour, ts.minute, ts.second, ts.microsecond)
+
+
+class _TimeIndex(object):
+    """
+    The time stamps of the lines of a :class:`LogFileOutput`, with the
+    positions of the lines having one, or the ``ValueError`` raised while
+    parsing it.  When the time stamps are in order,
+    time windows are found by bisecting the ``keys``, the time stamps of the
+    logs without a year being compared by month, day and time.
+    """
+
+    def __init__(self, positions, stamps, keys, ordered, logs_have_year):
+        self.positions = positions
+        self.stamps = stamps
+        self.keys = keys
+        self.ordered = ordered
+        self.logs_have_year = logs_have_year
+
+    def adjust(self, logstamp, timestamp):
+        """
+        Returns the `logstamp` in the year of `timestamp` when the logs have
+        no year.
+        """
+        if self.logs_have_year:
+            return logstamp
+        # Substitute timestamp year for logstamp year
+        logstamp = logstamp.replace(year=timestamp.year)
+        if logstamp - timestamp > _ELEVEN_MONTHS:
+            # If timestamp in January and log in December, move log to
+            # previous year
+            logstamp = logstamp.replace(year=timestamp.year - 1)
+        elif timestamp - logstamp > _ELEVEN_MONTHS:
+            # If timestamp in December and log in January, move log to next
+            # year
+            logstamp = logstamp.replace(year=timestamp.year + 1)
+        return logstamp
+
+    def bounds(self, start, end):
+        """
+        Returns the range of the time stamps between `start` and `end`, or
+        None when it can't be found by bisecting.
+        """
+        if not self.ordered:
+            return None
+        for ts in (start, end):
+            if ts is not None and (not isinstance(ts, datetime.datetime) or ts.tzinfo is not None):
+                return None
+        if self.logs_have_year:
+            lo = bisect.bisect_left(self.keys, start)
+            hi = len(self.keys) if end is None else bisect.bisect_left(self.keys, end)
+            return lo, max(lo, hi)
+        # The year of a log without year is shifted unless the whole year of
+        # `start` is within eleven months of it, then month, day and time
+        # are enough to compare them.
+        if (
+            start - start.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+            > _ELEVEN_MONTHS
+            or datetime.datetime(start.year + 1, 1, 1) - start > _ELEVEN_MONTHS
+        ):
+            return None
+        lo = bisect.bisect_left(self.keys, _yearless_key(start))
+        if end is None or end.year > start.year:
+            hi = len(self.keys)
+        elif end.year == start.year:
+            hi = bisect.bisect_left(self.keys, _yearless_key(end))
+        else:
+            hi = lo
+        return lo, max(lo, hi)
+
+    def slice(self, lines, lo, hi, search):
+        """
+        Yields the numbers of the lines from the time stamp `lo` to the time
+        stamp `hi`, excluded.  Only the time stamped lines matching `search`
+        start or end the range.
+        """
+        positions = self.positions
+        if search:
+            lo = next((i for i in range(lo, hi) if search(lines[positions[i]])), hi)
+            if lo == hi:
+                return
+            hi = next(
+                (i for i in range(hi, len(positions)) if search(lines[positions[i]])),
+                len(positions),
+            )
+        elif lo == hi:
+            return
+        stop = positions[hi] if hi < len(positions) else len(lines)
+        for i in range(positions[lo], stop):
+            if not search or search(lines[i]):
+                yield i
+
+    def walk(self, lines, start, end, search):
+        """
+        Yields the numbers of the lines with a time stamp between `start` and
+        `end`, and of the following lines without a time stamp, in turn.
+        """
+        positions = self.positions
+        including_lines = False
+        for i, pos in enumerate(positions):
+            line = lines[pos]
+            # If `search` is given, keywords must be found in the line
+            if not search or search(line):
+                if isinstance(self.stamps[i], ValueError):
+                    raise self.stamps[i]
+                logstamp = self.adjust(self.stamps[i], start)
+                including_lines = logstamp >= start and (end is None or logstamp < end)
+                if including_lines:
+                    yield pos
+            # If we're including lines, add the continuation lines
+            if including_lines:
+                stop = positions[i + 1] if i + 1 < len(positions) else len(lines)
+                for j in range(pos + 1, stop):
+                    if not search or search(lines[j]):
+                        yield j
+
+
 class LogFileOutput(TextFileOutput):
     """
     Class for parsing log file content.  For more details check it's super
@@ -1271,130 +1551,144 @@ class LogFileOutput(TextFileOutput):
                 made to recognise or parse the time zone or other obscure
                 values like day of year or week of year.
         """
-        time_format = self.time_format
-        if time_format is None:
-            raise RuntimeError('Not applied when time_format does not exist')
+        for line in self._get_between(timestamp, None, s):
+            yield line
 
-        # Annoyingly, strptime insists that it get the whole time string and
-        # nothing but the time string.  However, for most logs we only have a
-        # string with the timestamp in it.  We can't just catch the ValueError
-        # because at that point we do not actually have a valid datetime
-        # object.  So we convert the time format string to a regex, use that
-        # to find just the timestamp, and then use strptime on that.  Thanks,
-        # Python.  All these need to cope with different languages and
-        # character sets.  Note that we don't include time zone or other
-        # outputs (e.g. day-of-year) that don't usually occur in time stamps.
-        format_conversion_for = {
-            'a': r'\w{3}',
-            'A': r'\w+',  # Week day name
-            'w': r'[0123456]',  # Week day number
-            'd': r'([0 ][123456789]|[12]\d|3[01])',  # Day of month
-            'b': r'\w{3}',
-            'B': r'\w+',  # Month name
-            'm': r'([0 ]\d|1[012])',  # Month number
-            'y': r'\d{2}',
-            'Y': r'\d{4}',  # Year
-            'H': r'([01 ]\d|2[0123])',  # Hour - 24 hour format
-            'I': r'([0 ]?\d|1[012])',  # Hour - 12 hour format
-            'p': r'\w{2}',  # AM / PM
-            'M': r'([012345]\d)',  # Minutes
-            'S': r'([012345]\d|60)',  # Seconds, including leap second
-            'f': r'\d{1,6}',  # Microseconds
-        }
+    def get_between(self, start, end, s=None):
+        """
+        Find all the (available) logs that are at or after the `start` time
+        stamp and before the `end` time stamp.
 
-        # Construct the regex from the time string
-        timefmt_re = re.compile(r'%(\w)')
+        The lines are selected the same way as in :meth:`get_after`, the
+        lines with a time stamp at or after `end` are excluded along with
+        the lines following them which don't have a time stamp.  For the
+        logs without a year in their time stamps, the year is taken from
+        `start`.
 
-        def replacer(match):
-            if match.group(1) in format_conversion_for:
-                return format_conversion_for[match.group(1)]
-            else:
-                raise ParseException(
-                    "get_after does not understand strptime format '{c}'".format(c=match.group(0))
-                )
+        Parameters:
+            start(datetime.datetime): lines before this time are ignored.
+            end(datetime.datetime): lines at or after this time are ignored.
+            s(str or list): one or more strings to search for.
+                If not supplied, all available lines are searched.
 
-        # Please do not attempt to be tricky and put a regular expression
-        # inside your time format, as we are going to also use it in
-        # strptime too and that may not work out so well.
-
-        # Check time_format - must be string or list.  Set the 'logs_have_year'
-        # flag and timestamp parser function appropriately.
-        # Grab values of dict as a list first
-        if isinstance(time_format, dict):
-            time_format = list(time_format.values())
-        if isinstance(time_format, str):
-            logs_have_year = '%Y' in time_format or '%y' in time_format
-            time_re = re.compile('(' + timefmt_re.sub(replacer, time_format) + ')')
-
-            # Curry strptime with time_format string.
-            def test_parser(logstamp):
-                return datetime.datetime.strptime(logstamp, time_format)
-
-            parse_fn = test_parser
-        elif isinstance(time_format, list):
-            logs_have_year = all('%Y' in tf or '%y' in tf for tf in time_format)
-            time_re = re.compile(
-                '(' + '|'.join(timefmt_re.sub(replacer, tf) for tf in time_format) + ')'
-            )
+        Yields:
+            dict:
+                The parsed lines with timestamps between these dates in the
+                same format they were supplied.
 
-            def test_all_parsers(logstamp):
-                # One of these must match, because the regex has selected only
-                # strings that will match.
-                for tf in time_format:
-                    try:
-                        ts = datetime.datetime.strptime(logstamp, tf)
-                    except ValueError:
-                        pass
-                return ts
+        Raises:
+            ParseException: If the format conversion string contains a
+                format that we don't recognise.
+        """
+        for line in self._get_between(start, end, s):
+            yield line
+
+    def _time_index(self):
+        """
+        Returns the :class:`_TimeIndex` of the lines, it's built on the first
+        time-window query and rebuilt only if the ``time_format`` changes.
+        """
+        time_format = self.time_format
+        if time_format is None:
+            raise RuntimeError('Not applied when time_format does not exist')
+        time_re, parse_fn, logs_have_year = _time_parser(time_format)
+        cached = getattr(self, '_time_index_cache', None)
+        if cached is not None and cached[0] is time_re:
+            return cached[1]
 
-            parse_fn = test_all_parsers
+        positions, stamps, parsed = [], [], {}
+        for i, line in enumerate(self.lines):
+            match = time_re.search(line)
+            if match:
+                logstamp = match.group(0)
+                if logstamp not in parsed:
+                    try:
+                        parsed[logstamp] = parse_fn(logstamp)
+                    except ValueError as e:
+                        # raised only if the line is reached by a query
+                        parsed[logstamp] = e
+                positions.append(i)
+                stamps.append(parsed[logstamp])
+        if any(isinstance(ts, ValueError) for ts in stamps):
+            keys, ordered = None, False
         else:
-            raise ParseException(
-                "get_after does not recognise time formats of type {t}".format(t=type(time_format))
+            keys = stamps if logs_have_year else [_yearless_key(ts) for ts in stamps]
+            ordered = all(a <= b for a, b in zip(keys, keys[1:]))
+        index = _TimeIndex(positions, stamps, keys, ordered, logs_have_year)
+        self._time_index_cache = (time_re, index)
+        return index
+
+    def _get_between(self, start, end, s):
+        index = self._time_index()
+        search_by_expression = self._valid_search(s)
+        bounds = index.bounds(start, end)
+        if bounds is None:
+            found = index.walk(self.lines, start, end, search_by_expression if s else None)
+        else:
+            found = index.slice(
+                self.lines, bounds[0], bounds[1], search_by_expression if s else None
             )
+        for i in found:
+            yield self._parse_line_at(i)
 
-        # Most logs will appear in string format, but some logs (e.g.
-        # Messages) are available in list-of-dicts format.  So we choose one
-        # of two 'date_compare' functions.  HOWEVER: we still have to check
-        # the string found for a valid date, because log parsing often fails.
-        # Because of generators, we check this per line
 
-        # Now try to find the time stamp in each log line and add lines to
-        # our output if they are currently being included in the log.
+class _SyslogLines(object):
+    """
+    The parsed fields of the lines of a :class:`Syslog`, filled as the lines
+    are parsed.  For each line, ``fields`` holds the offset of the ``': '``
+    before the message and the ids of its timestamp, hostname and procname
+    in ``strings``, -1 when not parsed yet or absent, -2 as the offset of a
+    line without message.
+    """
 
-        eleven_months = datetime.timedelta(days=330)
-        including_lines = False
-        search_by_expression = self._valid_search(s)
-        for line in self.lines:
-            # If `s` is not None, keywords must be found in the line
-            if s and not search_by_expression(line):
-                continue
-            # Otherwise, search all lines
-            match = time_re.search(line)
-            if match:
-                logstamp = parse_fn(match.group(0))
-                if not logs_have_year:
-                    # Substitute timestamp year for logstamp year
-                    logstamp = logstamp.replace(year=timestamp.year)
-                    if logstamp - timestamp > eleven_months:
-                        # If timestamp in January and log in December, move
-                        # log to previous year
-                        logstamp = logstamp.replace(year=timestamp.year - 1)
-                    elif timestamp - logstamp > eleven_months:
-                        # If timestamp in December and log in January, move
-                        # log to next year
-                        logstamp = logstamp.replace(year=timestamp.year + 1)
-                if logstamp >= timestamp:
-                    # Later - include
-                    including_lines = True
-                    yield self._parse_line(line)
-                else:
-                    # Earlier - start excluding
-                    including_lines = False
-            else:
-                # If we're including lines, add this continuation line
-                if including_lines:
-                    yield self._parse_line(line)
+    def __init__(self, lines, time_format):
+        self.lines = lines
+        self.time_format = time_format
+        self.fields = array('l', [-1]) * (4 * len(lines))
+        self.strings = []
+        self.ids = {}
+        self.stamps = {}
+        self.procnames = None
+
+    def _id(self, string):
+        if string not in self.ids:
+            self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return self.ids[string]
+
+    def _valid_stamp(self, logstamp):
+        if logstamp not in self.stamps:
+            try:
+                datetime.datetime.strptime(logstamp, self.time_format)
+                self.stamps[logstamp] = True
+            except ValueError:
+                self.stamps[logstamp] = False
+        return self.stamps[logstamp]
+
+    def parse(self, i):
+        """
+        Returns the dictionary of the line `i`, see :meth:`Syslog._parse_line`.
+        """
+        line = self.lines[i]
+        fields = self.fields
+        at = 4 * i
+        if fields[at] == -1:
+            sep = line.find(': ')
+            fields[at] = -2 if sep == -1 else sep
+            if sep != -1:
+                info_splits = line[:sep].strip().rsplit(None, 2)
+                if len(info_splits) == 3 and self._valid_stamp(info_splits[0]):
+                    fields[at + 1] = self._id(info_splits[0])
+                    fields[at + 2] = self._id(info_splits[1])
+                    fields[at + 3] = self._id(info_splits[2])
+        msg_info = {'raw_message': line}
+        if fields[at] != -2:
+            msg_info['message'] = line[fields[at] + 2 :].strip()
+            if fields[at + 1] != -1:
+                msg_info['timestamp'] = self.strings[fields[at + 1]]
+                msg_info['hostname'] = self.strings[fields[at + 2]]
+                msg_info['procname'] = self.strings[fields[at + 3]]
+        return msg_info
 
 
 class Syslog(LogFileOutput):
@@ -1475,6 +1769,26 @@ class Syslog(LogFileOutput):
                 msg_info['procname'] = info_splits[2]
         return msg_info
 
+    def _syslog_lines(self):
+        cached = getattr(self, '_syslog_lines_cache', None)
+        if (
+            cached is None
+            or cached.lines is not self.lines
+            or cached.time_format != self.time_format
+        ):
+            cached = self._syslog_lines_cache = _SyslogLines(self.lines, self.time_format)
+        return cached
+
+    def _parse_line_at(self, i):
+        """
+        Parse the line `i` of the ``lines``, the fields of the lines are
+        kept in a :class:`_SyslogLines` unless :meth:`_parse_line` is
+        overridden.
+        """
+        if type(self)._parse_line is not Syslog._parse_line:
+            return super(Syslog, self)._parse_line_at(i)
+        return self._syslog_lines().parse(i)
+
     def get_logs_by_procname(self, proc):
         """
         Parameters:
@@ -1483,11 +1797,19 @@ class Syslog(LogFileOutput):
         Yields:
             (dict): The parsed syslog messages produced by that process or facility
         """
-        for line in self.lines:
-            l = self._parse_line(line)
-            procid = l.get('procname', '')
-            if proc == procid or proc == procid.split('[')[0]:
-                yield l
+        cached = self._syslog_lines()
+        if cached.procnames is None:
+            # the lines by procname, and by procname without its "[pid]"
+            procnames = {}
+            for i in range(len(self.lines)):
+                procid = self._parse_line_at(i).get('procname', '')
+                procnames.setdefault(procid, []).append(i)
+                name = procid.split('[')[0]
+                if name != procid:
+                    procnames.setdefault(name, []).append(i)
+            cached.procnames = procnames
+        for i in cached.procnames.get(proc, []):
+            yield self._parse_line_at(i)
 
 
 class IniConfigFile(ConfigParser):
@@ -1,20 +1,42 @@
 #!/usr/bin/env python
 
+import bz2
+import gzip
 import logging
 import os
+import tarfile
 import tempfile
+import threading
 
 from contextlib import contextmanager
 
+from insights.core.context import ExecutionContextMeta, SerializedArchiveContext
 from insights.core.exceptions import InvalidContentType
+from insights.core.vfs import open_archive
 from insights.util import fs, subproc, which
 from insights.util.content_type import from_file as content_type_from_file
 
+try:
+    import lzma
+except ImportError:  # pragma: no cover
+    lzma = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
 
 COMPRESSION_TYPES = ("zip", "tar", "gz", "bz2", "xz")
 
+SIZES_SUFFIX = ".sizes.json"
+"""
+The suffix of the file saving the sizes of the specs next to the archive
+created by :func:`insights.collect.collect`.
+"""
+
 
 class ZipExtractor(object):
     def __init__(self, timeout=None):
@@ -66,6 +88,67 @@ class TarExtractor(object):
         return self
 
 
+class SelectiveExtractor(object):
+    """
+    Extracts only the files of a tar or zip archive matching the glob
+    `patterns`, relative to the root of the execution context identified in
+    the archive, see :func:`insights.core.spec_factory.get_file_patterns`.
+    A file identifying the context is extracted as well, so that the same
+    context is identified in the extracted files.
+
+    When no context with a marker is identified, or when it's a serialized or
+    a cluster archive, the whole archive is extracted as usual.
+    """
+
+    def __init__(self, patterns, timeout=None):
+        self.patterns = patterns
+        self.timeout = timeout
+        self.tmp_dir = None
+        self.created_tmp_dir = False
+
+    def _select(self, afs):
+        files = afs.files()
+        top = afs.listdir(afs.root)
+        if any(f.endswith(COMPRESSION_TYPES) and afs.isfile(os.path.join(afs.root, f)) for f in top):
+            return None
+        root, context = ExecutionContextMeta.identify(files)
+        if context is None or context.marker is None or issubclass(context, SerializedArchiveContext):
+            return None
+        marker = os.path.join(root, context.marker.strip(os.sep))
+        # a file identifying the context at the same root
+        selected = set([next(f for f in files if f == marker or f.startswith(marker + os.sep))])
+        ctx = context(root)
+        for pattern in self.patterns:
+            selected.update(afs.glob(os.path.join(root, ctx.locate_path(pattern).lstrip("/"))))
+        return selected
+
+    def _extract_all(self, path, extract_dir):
+        if self.content_type == "application/zip":
+            extractor = ZipExtractor(timeout=self.timeout)
+        else:
+            extractor = TarExtractor(timeout=self.timeout)
+        try:
+            extractor.from_path(path, extract_dir=extract_dir, content_type=self.content_type)
+        finally:
+            self.tmp_dir = extractor.tmp_dir
+            self.created_tmp_dir = extractor.created_tmp_dir
+        return self
+
+    def from_path(self, path, extract_dir=None, content_type=None):
+        self.content_type = content_type or content_type_from_file(path)
+        if os.path.isdir(path):
+            return self._extract_all(path, extract_dir)
+        with open_archive(path) as afs:
+            selected = self._select(afs)
+            if selected is None:
+                return self._extract_all(path, extract_dir)
+            self.tmp_dir = tempfile.mkdtemp(prefix="insights-", dir=extract_dir)
+            self.created_tmp_dir = True
+            logger.debug("Extracting %d of %d files in '%s'", len(selected), len(afs.files()), self.tmp_dir)
+            afs.extract(selected, self.tmp_dir)
+        return self
+
+
 class Extraction(object):
     def __init__(self, tmp_dir, content_type):
         self.tmp_dir = tmp_dir
@@ -73,7 +156,7 @@ class Extraction(object):
 
 
 @contextmanager
-def extract(path, timeout=None, extract_dir=None, content_type=None):
+def extract(path, timeout=None, extract_dir=None, content_type=None, patterns=None):
     """
     Extract path into a temporary directory in `extract_dir`.
 
@@ -82,9 +165,15 @@ def extract(path, timeout=None, extract_dir=None, content_type=None):
 
     If the extraction takes longer than `timeout` seconds, the temporary path
     is removed, and an exception is raised.
+
+    With `patterns`, only the files matching them are extracted wherever
+    possible, see :class:`SelectiveExtractor`.  The `timeout` doesn't apply
+    to that selective extraction.
     """
     content_type = content_type or content_type_from_file(path)
-    if content_type == "application/zip":
+    if patterns is not None:
+        extractor = SelectiveExtractor(patterns, timeout=timeout)
+    elif content_type == "application/zip":
         extractor = ZipExtractor(timeout=timeout)
     else:
         extractor = TarExtractor(timeout=timeout)
@@ -96,3 +185,122 @@ def extract(path, timeout=None, extract_dir=None, content_type=None):
     finally:
         if extractor.created_tmp_dir:
             fs.remove(extractor.tmp_dir, chmod=True)
+
+
+def _gz(fileobj, level):
+    return gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=6 if level is None else level)
+
+
+def _bz2(fileobj, level):
+    return bz2.BZ2File(fileobj, "wb", compresslevel=9 if level is None else level)
+
+
+def _xz(fileobj, level):
+    return lzma.LZMAFile(fileobj, "wb", preset=level)
+
+
+def _zst(fileobj, level):
+    return zstandard.ZstdCompressor(level=3 if level is None else level).stream_writer(fileobj)
+
+
+COMPRESSORS = {"gz": _gz, "bz2": _bz2, "none": None}
+"""
+The compressors supported by :class:`ArchiveWriter`.  "xz" and "zst" are
+available when the :mod:`lzma` and ``zstandard`` modules can be imported.
+"""
+if lzma is not None:
+    COMPRESSORS["xz"] = _xz
+if zstandard is not None:
+    COMPRESSORS["zst"] = _zst
+
+
+class ArchiveWriter(object):
+    """
+    Writes a tar archive as a stream, compressing the files as they are
+    added, instead of archiving a whole directory once it's complete.  The
+    files can be added from several threads.
+
+    Args:
+        path (str): the path of the archive to create.
+        compressor (str): one of the :data:`COMPRESSORS`.
+        level (int): the compression level, the default of the compressor
+            when it's None.
+
+    Attributes:
+        sizes (dict): the size and the compressed size of each added file by
+            name in the archive.  The "gz" and "zst" compressors are flushed
+            after each file to measure its compressed size, "bz2" and "xz"
+            can't be flushed without ending the stream, their compressed
+            sizes are None.
+    """
+
+    def __init__(self, path, compressor="gz", level=None):
+        if compressor not in COMPRESSORS:
+            raise ValueError("Unsupported compressor: %s" % compressor)
+        self.path = path
+        self.compressor = compressor
+        self.sizes = {}
+        self._lock = threading.Lock()
+        self._file = open(path, "wb")
+        compress = COMPRESSORS[compressor]
+        self._stream = compress(self._file, level) if compress else self._file
+        # not a "w|" stream, which would buffer the members before the compressor
+        self._tar = tarfile.open(fileobj=self._stream, mode="w", format=tarfile.PAX_FORMAT)
+
+    def add(self, path, arcname):
+        """
+        Adds the file, symbolic link or directory `path` as `arcname`, the
+        content of a directory isn't added.  A name is added only once.
+
+        Returns:
+            tuple: the size and the compressed size of the file.
+        """
+        with self._lock:
+            if arcname in self.sizes:
+                return self.sizes[arcname]
+            start = self._file.tell()
+            info = self._tar.gettarinfo(path, arcname)
+            if info.isreg():
+                with open(path, "rb") as f:
+                    self._tar.addfile(info, f)
+            else:
+                self._tar.addfile(info)
+            self.sizes[arcname] = (info.size, self._compressed_size(start))
+            return self.sizes[arcname]
+
+    def _compressed_size(self, start):
+        if self.compressor in ("bz2", "xz"):
+            return None
+        if self._stream is not self._file:
+            self._stream.flush()
+        return self._file.tell() - start
+
+    def add_tree(self, root, arcname):
+        """
+        Adds the files under the directory `root` which weren't added yet.
+        """
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames) + [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))]:
+                path = os.path.join(dirpath, name)
+                self.add(path, os.path.join(arcname, os.path.relpath(path, root)))
+
+    def close(self):
+        """
+        Completes the archive, it can be called more than once.
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            try:
+                self._tar.close()
+                if self._stream is not self._file:
+                    self._stream.close()
+            finally:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
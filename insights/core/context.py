@@ -157,6 +157,8 @@ class ExecutionContextMeta(type):
 
 class ExecutionContext(object, metaclass=ExecutionContextMeta):
     marker = None
+    # the insights.core.vfs.ArchiveFS of an archive analyzed without extraction
+    fs = None
 
     def __init__(self, root="/", timeout=None, all_files=None):
         self.root = root
@@ -54,14 +54,15 @@ import inspect
 import json
 import logging
 import os
+import pickle
 import pkgutil
 import re
 import sys
+import threading
 import time
 import traceback
 
 from collections import defaultdict
-from functools import reduce as _reduce
 
 from insights.contrib.toposort import toposort_flatten
 from insights.core.blacklist import BLACKLISTED_SPECS
@@ -88,6 +89,40 @@ HIDDEN = set()
 IGNORE = defaultdict(set)
 ENABLED = defaultdict(lambda: True)
 
+GRAPH_VERSION = 0
+"""
+Incremented whenever a component is registered or a dependency is added, so
+that the cached information derived from the graph can be invalidated.
+"""
+
+
+_GRAPH_INDEX_SIZE = 4096
+
+_DEPENDENCY_GRAPHS = {}
+"""Cached dependency graphs, see :func:`get_dependency_graph`."""
+
+_REGISTRY_POINTS = {}
+"""Cached registry points, see :func:`get_registry_points`."""
+
+_SUBGRAPHS = {}
+"""Cached members of the subgraphs, see :func:`get_subgraphs`."""
+
+
+def _graph_changed():
+    global GRAPH_VERSION
+    GRAPH_VERSION += 1
+    _PLAN_CACHE.clear()
+    _DEPENDENCY_GRAPHS.clear()
+    _REGISTRY_POINTS.clear()
+    _SUBGRAPHS.clear()
+
+
+def _cache(cache, key, value):
+    if len(cache) >= _GRAPH_INDEX_SIZE:
+        cache.clear()
+    cache[key] = value
+    return value
+
 
 def set_enabled(component, enabled=True):
     """
@@ -321,31 +356,25 @@ def walk_dependencies(root, visitor):
 def get_dependency_graph(component):
     """
     Generate a component's graph of dependencies, which can be passed to
-    :func:`run` or :func:`run_incremental`.
+    :func:`run` or :func:`run_incremental`.  The graph is cached until a
+    component is registered or a dependency is added.
     """
     if component not in DEPENDENCIES:
         raise Exception("%s is not a registered component." % get_name(component))
 
-    if not DEPENDENCIES[component]:
-        return {component: set()}
-
-    graph = defaultdict(set)
-
-    def visitor(c, parent):
-        if parent is not None:
-            graph[parent].add(c)
-
-    walk_dependencies(component, visitor)
-
-    graph = dict(graph)
-
-    # Find all items that don't depend on anything.
-    extra_items_in_deps = _reduce(set.union, graph.values(), set()) - set(graph.keys())
-
-    # Add empty dependencies where needed.
-    graph.update(dict((item, set()) for item in extra_items_in_deps))
+    graph = _DEPENDENCY_GRAPHS.get(component)
+    if graph is None:
+        graph = {}
+        stack = [component]
+        while stack:
+            c = stack.pop()
+            if c not in graph:
+                graph[c] = frozenset(get_dependencies(c))
+                stack.extend(graph[c])
+        graph = _cache(_DEPENDENCY_GRAPHS, component, graph)
 
-    return graph
+    # the callers are free to modify the graph they get
+    return dict((k, set(v)) for k, v in graph.items())
 
 
 def get_dependency_specs(component):
@@ -428,7 +457,8 @@ def get_registry_points(component, datasource=None):
     Loop through the dependency graph to identify the corresponding spec registry
     points for the component. This is primarily used by datasources and returns a
     `set`. In most cases only one registry point will be included in the set, but
-    in some cases more than one.
+    in some cases more than one.  The result is cached until a component is
+    registered or a dependency is added.
 
     Args:
         component (callable): The component object
@@ -437,34 +467,38 @@ def get_registry_points(component, datasource=None):
     Returns:
         (set): A list of the registry points found.
     """
-    reg_points = set()
-    if is_registry_point(component):
-        reg_points.add(component)
+    return set(_get_registry_points(component, datasource))
+
+
+def _get_registry_points(component, datasource=None):
+    key = (component, datasource)
+    reg_points = _REGISTRY_POINTS.get(key)
+    if reg_points is not None:
         return reg_points
 
+    if is_registry_point(component):
+        return _cache(_REGISTRY_POINTS, key, frozenset([component]))
+
     # avoid infinite recursive call
     if datasource is None:
         datasource = is_datasource(component)
 
+    reg_points = set()
     if datasource:
         # Always search dependents for datasources
         for dep in get_dependents(component):
             if is_registry_point(dep):
                 reg_points.add(dep)
             else:
-                dep_reg_pts = get_registry_points(dep, True)
-                if dep_reg_pts:
-                    reg_points.update(dep_reg_pts)
+                reg_points.update(_get_registry_points(dep, True))
     else:
         # Always search dependencies for Parsers/Combiners
         for dep in get_dependencies(component):
             if is_registry_point(dep):
                 reg_points.add(dep)
             else:
-                dep_reg_pts = get_registry_points(dep, False)
-                if dep_reg_pts:
-                    reg_points.update(dep_reg_pts)
-    return reg_points
+                reg_points.update(_get_registry_points(dep, False))
+    return _cache(_REGISTRY_POINTS, key, frozenset(reg_points))
 
 
 def get_subgraphs(graph=None):
@@ -476,30 +510,38 @@ def get_subgraphs(graph=None):
     Return the sub-graphs sorted as per the "prio".
     """
     graph = graph or DEPENDENCIES
+    # the members only depend on the components in the graph
+    key = frozenset(graph)
+    subgraphs = _SUBGRAPHS.get(key)
+    if subgraphs is None:
+        subgraphs = _cache(_SUBGRAPHS, key, _get_subgraph_members(graph))
+    for members in subgraphs:
+        yield dict((s, get_dependencies(s)) for s in members)
+
+
+def _get_subgraph_members(graph):
     # Sort the keys as per "prio", 0 -> no priority
     keys = sorted(
         graph,
-        key=lambda x: getattr(next(iter(get_registry_points(x) or [object])), 'prio', 0),
+        key=lambda x: getattr(next(iter(_get_registry_points(x) or [object])), 'prio', 0),
         reverse=True,
     )
-    frontier = set()
-    seen = set()
-    while keys:
-        frontier.add(keys.pop(0))
+    subgraphs = []
+    done = set()
+    for key in keys:
+        if key in done:
+            continue
+        frontier = set([key])
+        seen = set()
         while frontier:
             component = frontier.pop()
             seen.add(component)
             frontier |= set([d for d in get_dependencies(component) if d in graph])
             frontier |= set([d for d in get_dependents(component) if d in graph])
             frontier -= seen
-        yield dict((s, get_dependencies(s)) for s in seen)
-        # Remove processed keys without changing their order
-        for s in seen:
-            try:
-                keys.remove(s)
-            except Exception:
-                pass
-        seen.clear()
+        done |= seen
+        subgraphs.append(tuple(seen))
+    return subgraphs
 
 
 def _import(path, continue_on_error):
@@ -604,6 +646,7 @@ def stringify_requirements(requires):
 
 def _register_component(delegate):
     component = delegate.component
+    _graph_changed()
 
     dependencies = delegate.get_dependencies()
     DEPENDENCIES[component] = dependencies
@@ -815,6 +858,7 @@ class ComponentType(object):
 
         DEPENDENCIES[self.component].add(dep)
         COMPONENTS[group][self.component].add(dep)
+        _graph_changed()
 
 
 class Broker(object):
@@ -848,11 +892,22 @@ class Broker(object):
             the execution time here is the sum of their individual execution
             times.
         store_skips (bool): Weather to store skips in the broker or not.
+        pruned (set): components that were skipped without being visited as
+            they can never fire with the seeded broker. See :func:`run`.
+        planned (frozenset): the components of the graph being run.
+
+    The instances of the components added with :meth:`add_lazy` are only
+    loaded when they are first got from the broker.  They are in the broker
+    but not in `instances` until then.
     """
 
     def __init__(self, seed_broker=None):
         self.instances = dict(seed_broker.instances) if seed_broker else {}
+        self._lazy = dict(seed_broker._lazy) if seed_broker else {}
+        self._lazy_lock = threading.Lock()
         self.missing_requirements = {}
+        self.pruned = set()
+        self.planned = frozenset()
         self.exceptions = defaultdict(list)
         self.tracebacks = {}
         self.exec_times = {}
@@ -922,16 +977,51 @@ class Broker(object):
             self.exceptions[component].append(ex)
             self.tracebacks[ex] = tb
 
+    def add_lazy(self, component, loader):
+        """
+        Add a component whose instance is loaded the first time it's got from
+        the broker.
+
+        Args:
+            component: the component.
+            loader (func): called without arguments to load the instance.
+                When it returns None, the component is removed from the
+                broker.
+        """
+        if component in self:
+            raise KeyError("Already exists in broker with key: %s" % get_name(component))
+        self._lazy[component] = loader
+
+    def _load(self, component):
+        loader = self._lazy.get(component)
+        if loader is None:
+            return
+        # the loader is called without the lock, the first instance wins when
+        # several threads load the same component
+        instance = loader()
+        with self._lazy_lock:
+            if self._lazy.pop(component, None) is not None and instance is not None:
+                self.instances.setdefault(component, instance)
+
+    def _load_all(self):
+        for component in list(self._lazy):
+            self._load(component)
+
     def __iter__(self):
+        if self._lazy:
+            return iter(list(self.instances) + list(self._lazy))
         return iter(self.instances)
 
     def keys(self):
+        self._load_all()
         return self.instances.keys()
 
     def items(self):
+        self._load_all()
         return self.instances.items()
 
     def values(self):
+        self._load_all()
         return self.instances.values()
 
     def get_by_type(self, _type):
@@ -945,21 +1035,24 @@ class Broker(object):
         return r
 
     def __contains__(self, component):
-        return component in self.instances
+        return component in self.instances or component in self._lazy
 
     def __setitem__(self, component, instance):
         msg = "Already exists in broker with key: %s"
-        if component in self.instances:
+        if component in self:
             raise KeyError(msg % get_name(component))
 
         self.instances[component] = instance
 
     def __delitem__(self, component):
+        self._lazy.pop(component, None)
         if component in self.instances:
             del self.instances[component]
             return
 
     def __getitem__(self, component):
+        if component in self._lazy:
+            self._load(component)
         if component in self.instances:
             return self.instances[component]
 
@@ -1070,82 +1163,277 @@ def determine_components(components):
 _determine_components = determine_components
 
 
+def _run_component(component, broker, runnable, process=None, start=None):
+    """
+    Invokes the component when it's `runnable` and records the result, the
+    exception and the execution time of it in the broker.
+
+    The result is returned by `process` instead when it's given, e.g. when
+    the component was invoked in another process since `start`.
+    """
+    start = start or time.time()
+    try:
+        if runnable:
+            log.info("Trying %s" % get_name(component))
+            result = process() if process else DELEGATES[component].process(broker)
+            broker[component] = result
+    except BlacklistedSpec as bs:
+        for x in get_registry_points(component):
+            BLACKLISTED_SPECS.append(str(x).split('.')[-1])
+        broker.add_exception(component, bs, traceback.format_exc())
+    except MissingRequirements as mr:
+        if log.isEnabledFor(logging.DEBUG):
+            name = get_name(component)
+            reqs = stringify_requirements(mr.requirements)
+            log.debug("%s missing requirements %s" % (name, reqs))
+        broker.add_exception(component, mr)
+    except SkipComponent as sc:
+        if broker.store_skips:
+            log.debug(sc)
+            broker.add_exception(component, sc, traceback.format_exc())
+        else:
+            pass
+    except Exception as ex:
+        log.debug(ex)
+        tb = traceback.format_exc()
+        broker.add_exception(component, ex, tb)
+        for reg_spec in get_registry_points(component):
+            broker.add_exception(reg_spec, ex, tb)
+    finally:
+        broker.exec_times[component] = time.time() - start
+        broker.fire_observers(component)
+
+
 def run_components(ordered_components, components, broker):
     """
     Runs a list of preordered components using the provided broker.
 
     This function allows callers to order components themselves and cache the
-    result so they don't incur the toposort overhead on every run.
+    result so they don't incur the toposort overhead on every run.  See
+    :class:`ExecutionPlan` as well.
     """
+    broker.planned = frozenset(ordered_components)
     for component in ordered_components:
-        start = time.time()
-        try:
-            if (
-                component not in broker
-                and component in components
-                and component in DELEGATES
-                and is_enabled(component)
-            ):
-                log.info("Trying %s" % get_name(component))
-                result = DELEGATES[component].process(broker)
-                broker[component] = result
-        except BlacklistedSpec as bs:
-            for x in get_registry_points(component):
-                BLACKLISTED_SPECS.append(str(x).split('.')[-1])
-            broker.add_exception(component, bs, traceback.format_exc())
-        except MissingRequirements as mr:
-            if log.isEnabledFor(logging.DEBUG):
-                name = get_name(component)
-                reqs = stringify_requirements(mr.requirements)
-                log.debug("%s missing requirements %s" % (name, reqs))
-            broker.add_exception(component, mr)
-        except SkipComponent as sc:
-            if broker.store_skips:
-                log.debug(sc)
-                broker.add_exception(component, sc, traceback.format_exc())
-            else:
-                pass
-        except Exception as ex:
-            log.debug(ex)
-            tb = traceback.format_exc()
-            broker.add_exception(component, ex, tb)
-            for reg_spec in get_registry_points(component):
-                broker.add_exception(reg_spec, ex, tb)
-        finally:
-            broker.exec_times[component] = time.time() - start
-            broker.fire_observers(component)
+        _run_component(
+            component,
+            broker,
+            component not in broker
+            and component in components
+            and component in DELEGATES
+            and is_enabled(component),
+        )
 
     return broker
 
 
-def run(components=None, broker=None):
+class ExecutionPlan(object):
+    """
+    A compiled execution plan of a dependency graph.
+
+    The components of the graph are sorted into an order that satisfies their
+    dependency relationships, and the components that can be invoked are
+    determined once, so a plan can be reused to evaluate the same graph
+    against many brokers, e.g. a stream of archives, without the toposort
+    overhead.  The plan is recompiled automatically when components are
+    loaded or dependencies are added after it was compiled.  Whether a
+    component is enabled is still checked at run time.
+
+    Use :func:`get_execution_plan` to get a cached plan.
+
+    Args:
+        components: Can be one of a dependency graph, a single component, a
+            component group, or a component type.  See :func:`run`.
+
+    Attributes:
+        components (dict): the dependency graph.
+        order (list): the components of the graph in execution order.
+        runnable (frozenset): the components in the graph that can be invoked.
+        version (int): the :data:`GRAPH_VERSION` when it's compiled.
+    """
+
+    def __init__(self, components=None):
+        self._source = components or COMPONENTS[GROUPS.single]
+        self._pruned_orders = {}
+        self.components = {}
+        self.order = []
+        self.runnable = frozenset()
+        self.version = None
+        self.compile()
+
+    def compile(self):
+        """
+        (Re)compile the plan per the current graph.
+        """
+        self.components = dict(determine_components(self._source))
+        self.order = run_order(self.components)
+        self.runnable = frozenset(c for c in self.order if c in self.components and c in DELEGATES)
+        self.version = GRAPH_VERSION
+        self._pruned_orders = {}
+        self._priorities = None
+
+    @property
+    def priorities(self):
+        """
+        dict: The scheduling priority of each component, the higher the
+        sooner it's started by :func:`run_parallel` once it's ready.  It's
+        a tuple of the ``prio`` of the datasource and the length of the
+        longest path of dependents in the graph.
+        """
+        if self.stale:
+            self.compile()
+        if self._priorities is None:
+            longest = {}
+            for c in reversed(self.order):
+                longest[c] = 1 + max([longest[d] for d in get_dependents(c) if d in longest] or [0])
+            self._priorities = dict(
+                (c, (getattr(DELEGATES.get(c), "prio", 0), longest[c])) for c in self.order
+            )
+        return self._priorities
+
+    def prune(self, broker):
+        """
+        Statically determine the components that can never fire with the
+        seeded `broker`, e.g. the specs and parsers of an execution context
+        which is not in the broker.
+
+        A component can fire when it's already in the broker, or when it's
+        enabled, all of its required dependencies can fire and at least one
+        dependency in each of its "at least one" lists can fire.  Components
+        which handle missing dependencies themselves, e.g. rules which return
+        a skip response, are always kept.
+
+        The result is cached per the graph members present in the broker and
+        the disabled components, i.e. per execution context type in general.
+
+        Returns:
+            tuple: (the pruned execution order, the set of pruned components)
+        """
+        if self.stale:
+            self.compile()
+        seeded = frozenset(c for c in self.order if c in broker)
+        disabled = frozenset(c for c in self.runnable if not ENABLED[c])
+        key = (seeded, disabled)
+        if key not in self._pruned_orders:
+            can_fire = set(seeded)
+            for c in self.order:
+                if c in can_fire or c not in self.runnable or c in disabled:
+                    continue
+                delegate = DELEGATES[c]
+                if type(delegate).process is not ComponentType.process or (
+                    all(r in can_fire for r in delegate.requires)
+                    and all(can_fire.intersection(d) for d in delegate.at_least_one)
+                ):
+                    can_fire.add(c)
+            order = [c for c in self.order if c in can_fire]
+            pruned = self.runnable - can_fire - disabled
+            if len(self._pruned_orders) >= _PLAN_CACHE_SIZE:
+                self._pruned_orders.clear()
+            self._pruned_orders[key] = (order, pruned)
+        return self._pruned_orders[key]
+
+    @property
+    def stale(self):
+        """
+        bool: True when the graph was changed after the plan was compiled.
+        """
+        return self.version != GRAPH_VERSION
+
+    def run(self, broker=None, prune=False):
+        """
+        Executes the plan with the `broker`.
+
+        Keyword Args:
+            prune (bool): Whether to skip the components that can never fire
+                with the seeded broker, see :meth:`prune`.  The pruned
+                components are not visited at all, so they are neither
+                reported in ``broker.missing_requirements`` nor passed to
+                the observers.  They are recorded in ``broker.pruned``.
+
+        Returns:
+            Broker: The broker after evaluation.
+        """
+        if self.stale:
+            self.compile()
+        broker = broker or Broker()
+        runnable = self.runnable
+        order = self.order
+        if prune:
+            order, pruned = self.prune(broker)
+            broker.pruned.update(pruned)
+            log.debug("Pruned %d of %d components", len(pruned), len(runnable))
+        broker.planned = frozenset(order)
+        for component in order:
+            _run_component(
+                component,
+                broker,
+                component in runnable and component not in broker and ENABLED[component],
+            )
+        return broker
+
+
+_PLAN_CACHE = {}
+_PLAN_CACHE_SIZE = 64
+
+
+def get_execution_plan(components=None):
+    """
+    Get the cached :class:`ExecutionPlan` of the components.  The plans are
+    cached per the :data:`GRAPH_VERSION` and the identity of `components`,
+    so the same dependency graph object has to be passed to get the same
+    plan, and it must not be changed in place afterwards.  The cache is
+    cleared when components are loaded or dependencies are added.
+
+    Args:
+        components: Can be one of a dependency graph, a single component, a
+            component group, or a component type.  See :func:`run`.
+
+    Returns:
+        ExecutionPlan: the plan of the components
+    """
+    components = components or COMPONENTS[GROUPS.single]
+    key = (GRAPH_VERSION, id(components))
+    cached = _PLAN_CACHE.get(key)
+    if cached is None:
+        if len(_PLAN_CACHE) >= _PLAN_CACHE_SIZE:
+            _PLAN_CACHE.clear()
+        # the components are kept, so that their id isn't reused
+        cached = _PLAN_CACHE[key] = (components, ExecutionPlan(components))
+    return cached[1]
+
+
+def run(components=None, broker=None, prune=False):
     """
     Executes components in an order that satisfies their dependency
     relationships.
 
     Keyword Args:
         components: Can be one of a dependency graph, a single component, a
-            component group, or a component type. If it's anything other than a
-            dependency graph, the appropriate graph is built for you and before
-            evaluation.
+            component group, a component type, or an :class:`ExecutionPlan`.
+            If it's anything other than a dependency graph or a plan, the
+            appropriate graph is built for you and before evaluation.
         broker (Broker): Optionally pass a broker to use for evaluation. One is
             created by default, but it's often useful to seed a broker with an
             initial dependency.
+        prune (bool): Whether to skip the components that can never fire with
+            the seeded broker.  See :meth:`ExecutionPlan.run`.
     Returns:
         Broker: The broker after evaluation.
     """
+    if isinstance(components, ExecutionPlan):
+        return components.run(broker, prune=prune)
     components = components or COMPONENTS[GROUPS.single]
-    components = determine_components(components)
     broker = broker or Broker()
     # If a SerializedArchiveContext then data found in the archive's
     # ./meta_data directory are prepopulated in the broker as Specs so
     # no need to collect them again
     if broker.get(SerializedArchiveContext) is not None:
+        components = dict(determine_components(components))
         for comp in list(components):
             if comp in broker:
                 for dep in components[comp]:
                     components.pop(dep, None)
-    return run_components(run_order(components), components, broker)
+        return run_components(run_order(components), components, broker)
+    return get_execution_plan(components).run(broker, prune=prune)
 
 
 def generate_incremental(components=None, broker=None):
@@ -1155,7 +1443,7 @@ def generate_incremental(components=None, broker=None):
         yield graph, broker or Broker()
 
 
-def run_incremental(components=None, broker=None):
+def run_incremental(components=None, broker=None, prune=False):
     """
     Executes components in an order that satisfies their dependency
     relationships. Disjoint subgraphs are executed one at a time and a broker
@@ -1171,18 +1459,195 @@ def run_incremental(components=None, broker=None):
         broker (Broker): Optionally pass a broker to use for evaluation. One is
             created by default, but it's often useful to seed a broker with an
             initial dependency.
+        prune (bool): Whether to skip the components that can never fire with
+            the seeded broker.  See :meth:`ExecutionPlan.run`.
     Yields:
         Broker: the broker used to evaluate each subgraph.
     """
     for graph, _broker in generate_incremental(components, broker):
-        yield run(graph, broker=_broker)
+        yield run(graph, broker=_broker, prune=prune)
+
+
+def _process_remote(payload):
+    """
+    Invokes a component in a worker process of :func:`run_parallel`.  The
+    `payload` is the pickled name of the component and its dependencies by
+    name, the result is returned pickled, or None when it can't be pickled.
+    """
+    name, instances = pickle.loads(payload)
+    broker = Broker()
+    for n, instance in instances.items():
+        broker[get_component(n) or n] = instance
+    try:
+        result = DELEGATES[get_component(name)].process(broker)
+    except Exception as ex:
+        try:
+            pickle.dumps(ex)
+        except Exception:
+            raise Exception(repr(ex))
+        raise
+    try:
+        return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+
+
+def run_parallel(components=None, broker=None, pool=None, prune=False):
+    """
+    Executes components with the `pool` as soon as their dependencies have
+    been tried.
+
+    The scheduler keeps at most ``pool._max_workers`` components in flight and
+    starts the ready components per their :attr:`ExecutionPlan.priorities`,
+    i.e. the datasources with higher ``prio`` and then the components with
+    longer paths of dependents first.  Each component is tried only after all
+    of its dependencies were tried and their observers were fired, the same
+    as :func:`run`.  Components that can't be invoked, e.g. the contexts, are
+    handled in the calling thread.
+
+    With a thread pool, the components share the broker.  With any other
+    pool, e.g. a ProcessPoolExecutor, only the datasources are executed in
+    the pool, with a broker of their dependencies and of the instances
+    seeded outside of the graph, and their results are merged into the
+    broker.  The other components, and the datasources whose dependencies
+    or results can't be pickled, are executed in the calling thread.
+    Without a pool the components are executed with :func:`run`.
+
+    Keyword Args:
+        components: Can be one of a dependency graph, a single component, a
+            component group, a component type, or an :class:`ExecutionPlan`.
+        broker (Broker): Optionally pass a broker to use for evaluation.
+        pool (Executor): The pool to execute the components.
+        prune (bool): Whether to skip the components that can never fire with
+            the seeded broker.  See :meth:`ExecutionPlan.run`.
+    Returns:
+        Broker: The broker after evaluation.
+    """
+    import heapq
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    from insights.core.plugins import is_datasource
+
+    broker = broker or Broker()
+    if pool is None:
+        return run(components, broker=broker, prune=prune)
+
+    if isinstance(components, ExecutionPlan):
+        plan = components
+    else:
+        components = components or COMPONENTS[GROUPS.single]
+        if broker.get(SerializedArchiveContext) is not None:
+            # See "run" - the graph depends on the broker content
+            components = dict(determine_components(components))
+            for comp in list(components):
+                if comp in broker:
+                    for dep in components[comp]:
+                        components.pop(dep, None)
+            plan = ExecutionPlan(components)
+        else:
+            plan = get_execution_plan(components)
+
+    if plan.stale:
+        plan.compile()
+    order = plan.order
+    if prune:
+        order, pruned = plan.prune(broker)
+        broker.pruned.update(pruned)
+        log.debug("Pruned %d of %d components", len(pruned), len(plan.runnable))
+    broker.planned = frozenset(order)
+
+    runnable = plan.runnable
+    priorities = plan.priorities
+    index = dict((c, i) for i, c in enumerate(order))
+    waiting = dict((c, set(d for d in plan.components.get(c, ()) if d in index)) for c in order)
+    dependents = defaultdict(list)
+    for c, deps in waiting.items():
+        for d in deps:
+            dependents[d].append(c)
+
+    def _key(c):
+        prio, longest = priorities[c]
+        return (-prio, -longest, index[c])
+
+    def _done(c, ready):
+        for d in dependents[c]:
+            waiting[d].discard(c)
+            if not waiting[d]:
+                heapq.heappush(ready, (_key(d), d))
+
+    threads = isinstance(pool, ThreadPoolExecutor)
+    seeds = None
+    if not threads:
+        try:
+            seeds = dict(
+                (get_name(k), broker[k]) for k in list(broker.instances) if k not in plan.components
+            )
+            pickle.dumps(seeds)
+        except Exception as ex:
+            log.debug("The datasources are executed in the calling thread: %r" % ex)
+            seeds = None
+
+    def _submit(c):
+        if threads:
+            return pool.submit(_run_component, c, broker, True)
+        name = get_name(c)
+        if (
+            seeds is None
+            or not is_datasource(c)
+            or get_component(name) is not c
+            or DELEGATES[c].get_missing_dependencies(broker)
+        ):
+            return None
+        instances = dict(seeds)
+        for d in DELEGATES[c].get_dependencies() | IGNORE.get(c, set()):
+            if d in broker:
+                n = get_name(d)
+                if (get_component(n) or n) != d:
+                    # e.g. an anonymous spec, it can't be found by name
+                    return None
+                instances[n] = broker[d]
+        try:
+            payload = pickle.dumps((name, instances), pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return None
+        return pool.submit(_process_remote, payload)
+
+    def _finish(c, f, start):
+        if threads:
+            f.result()
+        elif f.exception() is None and f.result() is None:
+            # the result couldn't be sent back, invoke it again here
+            _run_component(c, broker, True)
+        else:
+            _run_component(c, broker, True, lambda: pickle.loads(f.result()), start)
+
+    ready = [(_key(c), c) for c in order if not waiting[c]]
+    heapq.heapify(ready)
+    max_workers = getattr(pool, "_max_workers", None) or 1
+    running = {}
+    while ready or running:
+        while ready and len(running) < max_workers:
+            _, c = heapq.heappop(ready)
+            f = None
+            runs = c in runnable and c not in broker and ENABLED[c]
+            if runs:
+                f = _submit(c)
+            if f is not None:
+                running[f] = (c, time.time())
+            else:
+                _run_component(c, broker, runs)
+                _done(c, ready)
+        if running:
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for f in finished:
+                c, start = running.pop(f)
+                _finish(c, f, start)
+                _done(c, ready)
+    return broker
 
 
-def run_all(components=None, broker=None, pool=None):
+def run_all(components=None, broker=None, pool=None, prune=False):
     if pool:
-        futures = []
-        for graph, _broker in generate_incremental(components, broker):
-            futures.append(pool.submit(run, graph, _broker))
-        return [f.result() for f in futures]
+        return [run_parallel(components, broker, pool, prune=prune)]
     else:
-        return list(run_incremental(components=components, broker=broker))
+        return list(run_incremental(components=components, broker=broker, prune=prune))
@@ -49,15 +49,15 @@ class Evaluator(Formatter):
         self.broker.add_observer(self.observer)
 
     def run_serial(self, graph=None):
-        dr.run(graph or dr.COMPONENTS[dr.GROUPS.single], broker=self.broker)
+        dr.run(graph or dr.COMPONENTS[dr.GROUPS.single], broker=self.broker, prune=True)
 
     def run_incremental(self, graph=None, parallel=False):
         components = graph or dr.COMPONENTS[dr.GROUPS.single]
         if parallel:
             with insights.get_pool(parallel, "insights-engine-pool", {"max_workers": None}) as pool:
-                dr.run_all(components, self.broker, pool)
+                dr.run_all(components, self.broker, pool, prune=True)
         else:
-            dr.run_all(components, self.broker)
+            dr.run_all(components, self.broker, prune=True)
 
     def format_response(self, response):
         """
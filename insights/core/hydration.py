@@ -87,14 +87,14 @@ def _create_user_defined_context(path, context, all_files):
     return ctx
 
 
-def _create_autodetected_context(path, all_files):
+def _create_autodetected_context(path, all_files, cluster=True):
     if not all_files:
         raise InvalidArchive(
             "Cannot detect execution context: No files in path: {0}".format(path)
         )
 
     # ClusterArchiveContext does not support the handles() method
-    ctx = _create_cluster_archive_context(path)
+    ctx = _create_cluster_archive_context(path) if cluster else None
     if ctx:
         return ctx
 
@@ -103,18 +103,39 @@ def _create_autodetected_context(path, all_files):
     return context(common_path, all_files=all_files)
 
 
-def create_context(path, context=None):
-    all_files = list(get_all_files(path))
+def create_context(path, context=None, fs=None):
+    """
+    Creates the context of the directory `path`.
 
-    if context:
-        return _create_user_defined_context(path, context, all_files)
+    With `fs`, an :class:`insights.core.vfs.ArchiveFS`, `path` is its root and
+    the files are read from the archive without extracting it.  The context
+    keeps the `fs`.  Cluster archives aren't supported this way.
+    """
+    if fs is None:
+        all_files = list(get_all_files(path))
+    else:
+        if context is ClusterArchiveContext:
+            raise InvalidArchive("Cluster archives must be extracted: {0}".format(path))
+        all_files = fs.files()
 
+    if context:
+        ctx = _create_user_defined_context(path, context, all_files)
     else:
-        return _create_autodetected_context(path, all_files)
+        ctx = _create_autodetected_context(path, all_files, cluster=fs is None)
+    ctx.fs = fs
+    return ctx
+
 
+def initialize_broker(path, context=None, broker=None, components=None, pool=None, fs=None):
+    """
+    Creates the context of the directory `path` and a broker seeded with it.
 
-def initialize_broker(path, context=None, broker=None):
-    ctx = create_context(path, context=context)
+    For a serialized archive, the broker is hydrated from the archive.  When
+    `components` is specified, only what they need is hydrated, lazily or by
+    the `pool`.  See :py:meth:`insights.core.serde.Hydration.hydrate`.  See
+    :py:func:`create_context` for `fs`.
+    """
+    ctx = create_context(path, context=context, fs=fs)
     broker = broker or dr.Broker()
     if isinstance(ctx, ClusterArchiveContext):
         return ctx, broker
@@ -122,5 +143,5 @@ def initialize_broker(path, context=None, broker=None):
     broker[ctx.__class__] = ctx
     if isinstance(ctx, SerializedArchiveContext):
         h = Hydration(root=ctx.root, ctx=ctx)
-        broker = h.hydrate(broker=broker)
+        broker = h.hydrate(broker=broker, components=components, pool=pool)
     return ctx, broker
@@ -29,6 +29,7 @@ from __future__ import print_function
 
 import logging
 import signal
+import threading
 import traceback
 
 from pprint import pformat
@@ -44,6 +45,7 @@ from insights.core.exceptions import (
     TimeoutException,
     ValidationException,
 )
+from insights.util import watchdog
 
 log = logging.getLogger(__name__)
 
@@ -94,22 +96,56 @@ class datasource(PluginType):
     prio = 0
     raw = False
 
-    def _handle_timeout(self, signum, frame):
-        raise TimeoutException(
+    def _timeout_exception(self):
+        return TimeoutException(
             "Datasource spec {ds_name} timed out after {secs} seconds!".format(
                 ds_name=dr.get_name(self.component), secs=self.timeout
             )
         )
 
-    def invoke(self, broker):
-        # Grab the timeout from the decorator, or use the default of 120.
+    def _handle_timeout(self, signum, frame):
+        raise self._timeout_exception()
 
-        if HostContext in broker:
-            self.timeout = getattr(self, "timeout", 120)
+    def _call(self, broker):
+        """
+        Call the component, with a deadline of `self.timeout` seconds when
+        collecting.  When the deadline expires, the subprocesses spawned by
+        the component are killed and a :class:`TimeoutException` is raised.
+        The deadline works in any thread.  In the main thread the component
+        is also interrupted by ``signal.SIGALRM``, so that a component hung
+        in Python code is stopped as well.
+        """
+        if HostContext not in broker:
+            return self.component(broker)
+        # Grab the timeout from the decorator, or use the default of 120.
+        self.timeout = getattr(self, "timeout", 120)
+        alarm = threading.current_thread() is threading.main_thread()
+        if alarm:
             signal.signal(signal.SIGALRM, self._handle_timeout)
             signal.alarm(self.timeout)
         try:
-            return self.component(broker)
+            with watchdog.deadline(self.timeout) as dl:
+                try:
+                    result = self.component(broker)
+                except TimeoutException:
+                    # interrupted by the alarm, kill its subprocesses as well
+                    dl.expire()
+                    raise
+                except Exception:
+                    if dl.expired:
+                        # e.g. failed as its subprocess was killed
+                        raise self._timeout_exception()
+                    raise
+        finally:
+            if alarm:
+                signal.alarm(0)
+        if dl.expired:
+            raise self._timeout_exception()
+        return result
+
+    def invoke(self, broker):
+        try:
+            return self._call(broker)
         except ContentException as ce:
             log.debug(ce)
             ce_tb = traceback.format_exc()
@@ -128,9 +164,6 @@ class datasource(PluginType):
             for reg_spec in dr.get_registry_points(self.component):
                 broker.add_exception(reg_spec, te, te_tb)
             raise SkipComponent()
-        finally:
-            if HostContext in broker:
-                signal.alarm(0)
 
 
 class parser(PluginType):
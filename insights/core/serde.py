@@ -9,14 +9,15 @@ to register as an observer on a :py:class:`Broker`.
 import json as ser
 import logging
 import os
+import threading
 import time
 import traceback
 
-from glob import glob
 from functools import partial
 
 from insights.core import dr
 from insights.core.exceptions import ContentException
+from insights.core.vfs import get_fs
 from insights.util import fs
 
 log = logging.getLogger(__name__)
@@ -24,6 +25,12 @@ log = logging.getLogger(__name__)
 SERIALIZERS = {}
 DESERIALIZERS = {}
 
+META_INDEX = "meta_data.idx"
+"""
+The single file saving the metadata of all the components, see
+:py:class:`Hydration`.
+"""
+
 
 def serializer(_type):
     """
@@ -141,15 +148,38 @@ class Hydration(object):
     components. It puts metadata about a component's evaluation in a metadata
     file for the component and allows the serializer for a component to put raw
     data beneath a working directory.
+
+    With `meta_index`, the metadata of all the components are saved in the
+    single :data:`META_INDEX` file instead, so that loading an archive reads
+    one file instead of one per component.  Each line of the file is the
+    metadata of a component.  When :py:meth:`close` is called, the records are
+    followed by a line with the table of their offsets and lengths, and a last
+    line with the offset of that table.  The :data:`META_INDEX` file is loaded
+    when it exists, otherwise the ``meta_data`` directory is.
+
+    With an `archive`, an :class:`insights.core.archives.ArchiveWriter`, the
+    files of each component are added to the archive as soon as the component
+    is saved, and their sizes are recorded in :attr:`sizes` by component name
+    as lists of ``(relative_path, size, compressed_size)``.  The other files
+    under `root`, e.g. the :data:`META_INDEX`, have to be added once it's
+    closed, see :meth:`ArchiveWriter.add_tree`.
     """
-    def __init__(self, root=None, ctx=None, meta_root="meta_data", data_root="data", pool=None):
+    def __init__(self, root=None, ctx=None, meta_root="meta_data", data_root="data", pool=None, meta_index=False,
+                 archive=None):
         self.root = root
         self.ctx = ctx
         self.meta_root = os.path.join(root, meta_root) if root else None
         self.data_root = os.path.join(root, data_root) if root else None
+        self.meta_index = os.path.join(root, META_INDEX) if root else None
         self.ser_name = dr.get_base_module_name(ser)
         self.created = False
         self.pool = pool
+        self.use_meta_index = meta_index
+        self._index = {}
+        self._index_file = None
+        self._lock = threading.Lock()
+        self.archive = archive
+        self.sizes = {}
 
     def _hydrate_one(self, doc):
         """ Returns (component, results, errors, duration) """
@@ -163,22 +193,95 @@ class Hydration(object):
         results = unmarshal(doc["results"], root=self.data_root, ctx=self.ctx, ds=key)
         return (key, results, exec_time, ser_time)
 
-    def hydrate(self, broker=None):
+    def _load_meta_file(self, path):
+        with get_fs(self.ctx).open(path, "r") as f:
+            return ser.load(f)
+
+    def _load_meta_index(self):
+        """
+        Returns the offsets table and the content of the records of the
+        :data:`META_INDEX` file.  The table is None when the file wasn't
+        closed.
+        """
+        with get_fs(self.ctx).open(self.meta_index, "rb") as f:
+            content = f.read()
+        trailer = content[-21:]
+        if len(trailer) == 21 and trailer.endswith(b"\n") and trailer[:-1].isdigit():
+            start = int(trailer[:-1])
+            table = ser.loads(content[start:-21].decode("utf-8"))["index"]
+            return table, content[:start]
+        return None, content
+
+    def _meta_loaders(self, names=None):
+        """
+        Yields the functions loading the metadata of each component, from the
+        :data:`META_INDEX` file if it exists or from the ``meta_data``
+        directory.  Only the metadata of the components in `names` are loaded
+        when it's specified, the others are skipped without being parsed
+        wherever possible.
+        """
+        vfs = get_fs(self.ctx)
+        if self.meta_index and vfs.isfile(self.meta_index):
+            table, content = self._load_meta_index()
+            if table is not None and names is not None:
+                for name in names:
+                    if name in table:
+                        offset, length = table[name]
+                        yield partial(ser.loads, content[offset:offset + length].decode("utf-8"))
+            else:
+                for line in content.splitlines():
+                    yield partial(ser.loads, line.decode("utf-8"))
+        elif names is not None:
+            for name in names:
+                path = os.path.join(self.meta_root, name + "." + self.ser_name)
+                if vfs.isfile(path):
+                    yield partial(self._load_meta_file, path)
+        else:
+            for path in vfs.glob(os.path.join(self.meta_root, "*")):
+                yield partial(self._load_meta_file, path)
+
+    def _load_results(self, doc):
+        try:
+            _, results, _, _ = self._hydrate_one(doc)
+            return results or None
+        except ContentException as ex:
+            log.debug(ex)
+        except ValueError as ve:
+            log.debug(ve)
+        except Exception as ex:
+            log.warning(ex)
+
+    def hydrate(self, broker=None, components=None, pool=None):
         """
         Loads a Broker from a previously saved one. A Broker is created if one
         isn't provided.
+
+        When `components` is specified, only the components required to
+        evaluate them are hydrated, and their results are loaded lazily when
+        they are first got from the broker, see :py:meth:`Broker.add_lazy`.
+        With a `pool`, the results are loaded by the pool in the background
+        instead.
+
+        Args:
+            broker (Broker): the broker to hydrate.
+            components: the dependency graph, component or list of components
+                to evaluate, see :py:func:`insights.core.dr.run`.
+            pool (ThreadPoolExecutor): the pool to load the results, only used
+                with `components`.
         """
 
         broker = broker or dr.Broker()
-        for path in glob(os.path.join(self.meta_root, "*")):
+        if components is not None:
+            return self._hydrate_lazy(broker, components, pool)
+
+        for load in self._meta_loaders():
             try:
-                with open(path) as f:
-                    doc = ser.load(f)
-                    res = self._hydrate_one(doc)
-                    comp, results, exec_time, ser_time = res
-                    if results:
-                        broker[comp] = results
-                        broker.exec_times[comp] = exec_time + ser_time
+                doc = load()
+                res = self._hydrate_one(doc)
+                comp, results, exec_time, ser_time = res
+                if results:
+                    broker[comp] = results
+                    broker.exec_times[comp] = exec_time + ser_time
             except ContentException as ex:
                 log.debug(ex)
             except ValueError as ve:
@@ -187,6 +290,49 @@ class Hydration(object):
                 log.warning(ex)
         return broker
 
+    def _hydrate_lazy(self, broker, components, pool):
+        graph = dr.determine_components(components)
+        names = set(dr.get_name(c) for c in graph)
+        names.update(dr.get_name(d) for deps in graph.values() for d in deps)
+        for load in self._meta_loaders(sorted(names)):
+            try:
+                doc = load()
+                if not doc["results"] or doc["name"] not in names:
+                    continue
+                comp = dr.get_component_by_name(doc["name"])
+                if comp is None or comp in broker:
+                    continue
+                loader = partial(self._load_results, doc)
+                broker.add_lazy(comp, pool.submit(loader).result if pool else loader)
+                broker.exec_times[comp] = doc["exec_time"] + doc["ser_time"]
+            except Exception as ex:
+                log.warning(ex)
+        return broker
+
+    def _write_meta_index(self, name, doc):
+        data = (ser.dumps(doc) + "\n").encode("utf-8")
+        with self._lock:
+            if self._index_file is None:
+                self._index_file = open(self.meta_index, "ab")
+            offset = self._index_file.tell()
+            self._index_file.write(data)
+            self._index_file.flush()
+            self._index[name] = [offset, len(data)]
+
+    def close(self):
+        """
+        Writes the offsets table of the :data:`META_INDEX` file and closes it.
+        It does nothing unless the Hydration was created with `meta_index`.
+        """
+        with self._lock:
+            if self._index_file is None:
+                return
+            f, self._index_file = self._index_file, None
+            with f:
+                start = f.tell()
+                f.write((ser.dumps({"index": self._index}) + "\n").encode("utf-8"))
+                f.write(("%020d\n" % start).encode("utf-8"))
+
     def dehydrate(self, comp, broker):
         """
         Saves a component in the given broker to the file system.
@@ -195,7 +341,8 @@ class Hydration(object):
             raise Exception("Hydration meta_path not set. Can't dehydrate.")
 
         if not self.created:
-            fs.ensure_path(self.meta_root, mode=0o770)
+            if not self.use_meta_index:
+                fs.ensure_path(self.meta_root, mode=0o770)
             if self.data_root:
                 fs.ensure_path(self.data_root, mode=0o770)
             self.created = True
@@ -221,7 +368,12 @@ class Hydration(object):
         except Exception as ex:
             log.exception(ex)
         else:
-            if doc is not None and (doc["results"] or doc["errors"]):
+            if doc is not None and (doc["results"] or doc["errors"]) and self.use_meta_index:
+                try:
+                    self._write_meta_index(name, doc)
+                except Exception as boom:
+                    log.error("Could not serialize %s to %s: %r" % (name, self.meta_index, boom))
+            elif doc is not None and (doc["results"] or doc["errors"]):
                 path = None
                 try:
                     path = os.path.join(self.meta_root, name + "." + self.ser_name)
@@ -231,6 +383,34 @@ class Hydration(object):
                     log.error("Could not serialize %s to %s: %r" % (name, self.ser_name, boom))
                     if path:
                         fs.remove(path)
+                        path = None
+                if path and self.archive is not None:
+                    self._archive(path)
+            if doc is not None and doc["results"] and self.archive is not None:
+                self._archive_results(name, doc["results"])
+
+    def _archive(self, path):
+        arcname = os.path.join(os.path.basename(self.root), os.path.relpath(path, self.root))
+        return self.archive.add(path, arcname)
+
+    def _archive_results(self, name, results):
+        """
+        Adds the files of the results of a component to the archive and
+        records their sizes in :attr:`sizes`.
+        """
+        sizes = []
+        for result in results if isinstance(results, list) else [results]:
+            obj = result.get("object")
+            rel = obj.get("relative_path") if isinstance(obj, dict) else None
+            path = os.path.join(self.data_root, rel) if rel else None
+            if path and os.path.lexists(path):
+                try:
+                    sizes.append((rel,) + self._archive(path))
+                except Exception as boom:
+                    log.error("Could not archive %s: %r" % (path, boom))
+        if sizes:
+            self.sizes[name] = sizes
+            log.debug("Archived %s: %d bytes", name, sum(s[1] for s in sizes))
 
     def make_persister(self, to_persist):
         """
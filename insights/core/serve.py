@@ -0,0 +1,196 @@
+"""
+Serve
+=====
+
+A pre-forking server evaluating archives on a UNIX socket.  It's used by
+``insights-run --serve`` so that loading the components, building the
+dependency graph and compiling the execution plan are paid once instead of
+once per archive.
+
+The components are loaded in the server process before the workers are
+forked, so every worker starts with a warm registry.  A worker exits after
+`max_requests` archives to cap its memory and a new one is forked in its
+place.
+
+The protocol is one request per connection: the client sends a JSON object
+with the ``archive`` path followed by a newline, and the server replies
+with the output of the handler and closes the connection.  When the handler
+fails, the reply is a JSON object with an ``error`` key instead.
+
+.. code-block:: python
+
+    from insights.core.serve import request
+
+    output = request("/run/insights.sock", "/tmp/archive.tar.gz")
+"""
+
+import errno
+import json
+import logging
+import os
+import signal
+import socket
+import stat
+import sys
+import time
+
+log = logging.getLogger(__name__)
+
+RESPAWN_DELAY = 0.1
+""" float: The initial delay in seconds before a failed worker is forked again """
+MAX_RESPAWN_DELAY = 30
+""" float: The delay is doubled for each failed worker up to this limit """
+
+
+def _in_use(path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except socket.error:
+        return False
+    finally:
+        probe.close()
+
+
+def _bind(path, backlog=128):
+    if os.path.lexists(path):
+        # replace only the socket left by a server that's gone
+        if not stat.S_ISSOCK(os.lstat(path).st_mode) or _in_use(path):
+            raise OSError(errno.EADDRINUSE, os.strerror(errno.EADDRINUSE), path)
+        os.unlink(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.listen(backlog)
+    return sock
+
+
+def _readline(conn):
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if b"\n" in chunk:
+            break
+    return b"".join(chunks).split(b"\n", 1)[0]
+
+
+def _handle(conn, handler):
+    try:
+        output = handler(json.loads(_readline(conn).decode("utf-8")))
+    except Exception as ex:
+        log.exception("Failed to handle the request")
+        output = json.dumps({"error": "{0}: {1}".format(type(ex).__name__, ex)})
+    conn.sendall(output.encode("utf-8"))
+
+
+def _work(sock, handler, max_requests):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    handled = 0
+    while not max_requests or handled < max_requests:
+        conn, _ = sock.accept()
+        try:
+            _handle(conn, handler)
+        finally:
+            conn.close()
+        handled += 1
+
+
+def _fork(sock, handler, max_requests):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _work(sock, handler, max_requests)
+        except BaseException:
+            log.exception("Worker %s failed", os.getpid())
+            code = 1
+        finally:
+            # never return into the caller of serve in the worker
+            os._exit(code)
+    log.debug("Started worker %s", pid)
+    return pid
+
+
+def _terminate(signum, frame):
+    sys.exit(0)
+
+
+def serve(path, handler, workers=1, max_requests=100):
+    """
+    Serve the requests on the UNIX socket `path` until the process is
+    interrupted or terminated.
+
+    Args:
+        path (str): the path of the UNIX socket.  A socket left by a server
+            which is gone is replaced, OSError is raised when the path is in
+            use.
+        handler (function): called with the request dictionary in a worker,
+            returns the output as a string.
+        workers (int): the number of worker processes.
+        max_requests (int): the number of requests handled by a worker before
+            it's replaced.  0 means no limit.  A worker which failed is
+            replaced after a delay, doubled for each failure in a row, see
+            `RESPAWN_DELAY` and `MAX_RESPAWN_DELAY`.
+    """
+    sock = _bind(path)
+    children = set()
+    delay = 0
+    previous = signal.signal(signal.SIGTERM, _terminate)
+    log.info("Serving on %s with %d worker(s)", path, workers)
+    try:
+        while True:
+            while len(children) < workers:
+                children.add(_fork(sock, handler, max_requests))
+            pid, status = os.wait()
+            children.discard(pid)
+            log.debug("Worker %s exited with status %s", pid, status)
+            if status:
+                delay = min(max(delay * 2, RESPAWN_DELAY), MAX_RESPAWN_DELAY)
+                log.warning("Worker %s failed, replacing it in %s seconds", pid, delay)
+                time.sleep(delay)
+            else:
+                delay = 0
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
+        sock.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def request(path, archive, timeout=None):
+    """
+    Send an archive to the server listening on the UNIX socket `path`.
+
+    Args:
+        path (str): the path of the UNIX socket.
+        archive (str): the path of the archive or directory to evaluate.
+        timeout (float): the timeout of the socket operations in seconds.
+
+    Returns:
+        str: the output of the server.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+        data = json.dumps({"archive": os.path.realpath(archive)}) + "\n"
+        sock.sendall(data.encode("utf-8"))
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks).decode("utf-8")
+    finally:
+        sock.close()
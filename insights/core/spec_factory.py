@@ -4,10 +4,12 @@ import os
 import re
 import shlex
 import signal
+import threading
 import traceback
+import uuid
 
 from collections import defaultdict
-from glob import glob
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import call
 
 from insights.cleaner import DEFAULT_OBFUSCATIONS
@@ -16,12 +18,14 @@ from insights.core import blacklist, dr, filters
 from insights.core.context import ExecutionContext, FSRoots, HostContext
 from insights.core.exceptions import (
     BlacklistedSpec,
+    CalledProcessError,
     ContentException,
     NoFilterException,
     SkipComponent,
 )
 from insights.core.plugins import component, datasource, is_datasource
 from insights.core.serde import deserializer, serializer
+from insights.core.vfs import get_fs
 from insights.util import fs, streams, which
 from insights.util.mangle import mangle_command
 
@@ -211,10 +215,11 @@ class FileProvider(ContentProvider):
 
     def _is_inside_root(self):
         """Checks that `self.relative_path` does not point outside `self.root`."""
-        resolved = os.path.realpath(self.path)
+        vfs = get_fs(self.ctx)
+        resolved = vfs.realpath(self.path)
 
         # pathlib.Path.is_relative_to() has been added only in Python 3.9
-        resolved_root = os.path.realpath(self.root)
+        resolved_root = vfs.realpath(self.root)
         if not resolved_root.endswith(os.sep):
             resolved_root += os.sep
 
@@ -225,8 +230,9 @@ class FileProvider(ContentProvider):
             msg = "Relative path points outside the root: %s"
             raise ValueError(msg % (self.path))
 
+        vfs = get_fs(self.ctx)
         # 1. No Such File
-        if not os.path.exists(self.path):
+        if not vfs.exists(self.path):
             raise ContentException("%s does not exist." % self.path)
         # 2. Check only when collecting
         if isinstance(self.ctx, HostContext):
@@ -238,7 +244,7 @@ class FileProvider(ContentProvider):
                 log.warning("WARNING: Skipping file %s", os.sep + self.relative_path)
                 raise BlacklistedSpec()
 
-        if not os.access(self.path, os.R_OK):
+        if not vfs.access(self.path):
             raise ContentException("Cannot access %s" % self.path)
 
     def __repr__(self):
@@ -257,11 +263,15 @@ class RawFileProvider(FileProvider):
 
     def load(self):
         self.loaded = True
-        with open(self.path, 'rb') as f:
+        with get_fs(self.ctx).open(self.path, 'rb') as f:
             return f.read()
 
     def write(self, dst):
         fs.ensure_path(os.path.dirname(dst))
+        if self.ctx is not None and self.ctx.fs:
+            with open(dst, "wb") as f:
+                f.write(self.content)
+            return
         call([which("cp", env=SAFE_ENV), self.path, dst], env=SAFE_ENV)
 
 
@@ -292,8 +302,25 @@ class TextFileProvider(FileProvider):
             self.rc = rc
             return out
 
-        fsize = os.stat(self.path).st_size
-        with open(self.path, "r", encoding="utf-8", errors="surrogateescape") as f:
+        vfs = get_fs(self.ctx)
+        fsize = vfs.getsize(self.path)
+        if not isinstance(self.ctx, HostContext) and self._filters:
+            # Post-filtering ONLY when processing data
+            # Read the file backwards and keep the filtered lines only, so the
+            # memory is proportional to the result rather than the file
+            start = 0
+            if fsize > MAX_CONTENT_SIZE:
+                # read the last ``MAX_CONTENT_SIZE`` MB only
+                start = fsize - MAX_CONTENT_SIZE
+                log.debug("Extra-huge file is truncated %s", self.relative_path)
+            content = AllowFilter.filter_reversed_content(
+                fs.reverse_readlines(self.path, start=start, opener=vfs.open),
+                self._filters,
+            )
+            content.reverse()
+            return content
+
+        with vfs.open(self.path, "r") as f:
             if fsize > MAX_CONTENT_SIZE:
                 # read the last ``MAX_CONTENT_SIZE`` MB only
                 f.seek(fsize - MAX_CONTENT_SIZE)
@@ -301,9 +328,6 @@ class TextFileProvider(FileProvider):
                 content = [l.rstrip("\n") for l in f][1:]  # discard the first line which is broken
             else:
                 content = [l.rstrip("\n") for l in f]
-            if not isinstance(self.ctx, HostContext) and self._filters:
-                # Post-filtering ONLY when processing data
-                content = AllowFilter.filter_content(content, self._filters)
             return content
 
     def _stream(self):
@@ -321,7 +345,7 @@ class TextFileProvider(FileProvider):
                     with streams.connect(*args, env=SAFE_ENV) as s:
                         yield s
                 else:
-                    with open(self.path, "r", encoding="utf-8", errors="surrogateescape") as f:
+                    with get_fs(self.ctx).open(self.path, "r") as f:
                         yield f
         except StopIteration:
             raise
@@ -338,11 +362,115 @@ class SerializedRawOutputProvider(RawFileProvider):
     pass
 
 
+class _ConcurrentLoader(object):
+    """
+    Loads the output of a group of command providers, at most `workers`
+    commands at once.  The commands are started once the output of any of
+    them is needed, and each provider gets the output or the exception of its
+    own command.
+    """
+
+    def __init__(self, providers, workers):
+        self.providers = providers
+        self.workers = workers
+        self._futures = None
+        self._lock = threading.Lock()
+        for provider in providers:
+            provider._loader = self
+
+    def load(self, provider):
+        with self._lock:
+            if self._futures is None:
+                pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="insights-foreach"
+                )
+                self._futures = {id(p): pool.submit(p._load) for p in self.providers}
+                # the submitted commands still run
+                pool.shutdown(wait=False)
+            future = self._futures.pop(id(provider), None)
+        return future.result() if future is not None else provider._load()
+
+
+class _ContainerBatch(object):
+    """
+    Runs the commands of a group of container providers of the same
+    container in one exec.  Each command is followed by a line with a random
+    marker and its exit code, by which the output is split per provider.
+
+    The exec is given the longest timeout of the commands.  The commands
+    which didn't finish in it, e.g. when the exec times out, run on their own
+    as usual.  When the exec fails before any command is done, e.g. when the
+    container is gone, all the providers get that failure.
+    """
+
+    def __init__(self, providers):
+        self.providers = providers
+        self._results = None
+        self._lock = threading.Lock()
+        for provider in providers:
+            provider._batch = self
+
+    def result(self, provider):
+        """
+        Returns the (exit code, output) of the command of `provider`, or None
+        when it has to be run on its own.
+        """
+        with self._lock:
+            if self._results is None:
+                self._results = self._run()
+            return self._results.pop(id(provider), None)
+
+    def _run(self):
+        first = self.providers[0]
+        marker = uuid.uuid4().hex
+        script = []
+        for provider in self.providers:
+            # <podman|docker> exec -e <env> container_id command...
+            command = shlex.split(provider.cmd)[5:]
+            script.append(
+                "%s 2>&1; printf '\\n%s %%d\\n' $?"
+                % (" ".join(shlex.quote(a) for a in command), marker)
+            )
+        exec_cmd = shlex.split(first.cmd)[:5] + ["sh", "-c", "\n".join(script)]
+        timeouts = [p.timeout or p.ctx.timeout for p in self.providers]
+        signums = set(p.signum for p in self.providers)
+        try:
+            rc, output = first.ctx.shell_out(
+                [exec_cmd],
+                split=False,
+                keep_rc=True,
+                timeout=None if None in timeouts else max(timeouts),
+                env=first._env,
+                # stop gracefully when the commands asked for different signals
+                signum=signums.pop() if len(signums) == 1 else signal.SIGTERM,
+            )
+        except Exception:
+            log.debug(traceback.format_exc())
+            return {}
+        parts = re.split("\n%s (\\d+)\n" % marker, output)
+        if len(parts) == 1 and rc in (1, 125):
+            # the exec failed, e.g. 125 of podman or 1 of docker for no such container
+            return dict((id(p), (rc, output)) for p in self.providers)
+        done = len(parts) // 2
+        if done < len(self.providers):
+            log.debug(
+                "Running %d commands in %s one by one",
+                len(self.providers) - done,
+                first.container_id,
+            )
+        return dict(
+            (id(p), (int(parts[2 * i + 1]), parts[2 * i]))
+            for i, p in enumerate(self.providers[:done])
+        )
+
+
 class CommandOutputProvider(ContentProvider):
     """
     Class used in datasources to return output from commands.
     """
 
+    _loader = None
+
     def __init__(
         self,
         cmd,
@@ -430,6 +558,11 @@ class CommandOutputProvider(ContentProvider):
         return env
 
     def load(self):
+        if self._loader is not None:
+            return self._loader.load(self)
+        return self._load()
+
+    def _load(self):
         command = self.create_args()
 
         raw = self.ctx.shell_out(
@@ -470,6 +603,8 @@ class CommandOutputProvider(ContentProvider):
 
 
 class ContainerProvider(CommandOutputProvider):
+    _batch = None
+
     def __init__(
         self,
         cmd_path,
@@ -504,6 +639,24 @@ class ContainerProvider(CommandOutputProvider):
             cleaner,
         )
 
+    def _load(self):
+        result = self._batch.result(self) if self._batch is not None else None
+        if result is None:
+            return super(ContainerProvider, self)._load()
+        rc, output = result
+        if self.split and self._filters:
+            # the same as the "grep -F" added by create_args
+            self.keep_rc = True
+            output = "".join(
+                l for l in output.splitlines(True) if any(f in l for f in self._filters)
+            )
+            rc = 0 if output else 1
+        if self.keep_rc:
+            self.rc = rc
+        elif rc:
+            raise CalledProcessError(rc, self.cmd, output[:1024])
+        return output.splitlines() if self.split else output
+
 
 class ContainerFileProvider(ContainerProvider):
     def _misc_settings(self):
@@ -796,12 +949,13 @@ class glob_file(object):
     def __call__(self, broker):
         cleaner = broker.get('cleaner')
         ctx = _get_context(self.context, broker)
+        vfs = get_fs(ctx)
         root = ctx.root
         results = []
         for pattern in self.patterns:
             pattern = ctx.locate_path(pattern)
-            for path in sorted(glob(os.path.join(root, pattern.lstrip('/')))):
-                if self.ignore_func(path) or os.path.isdir(path):
+            for path in sorted(vfs.glob(os.path.join(root, pattern.lstrip('/')))):
+                if self.ignore_func(path) or vfs.isdir(path):
                     continue
                 try:
                     results.append(
@@ -933,7 +1087,7 @@ class listdir(object):
         p = os.path.join(ctx.root, self.path.lstrip('/'))
         p = ctx.locate_path(p)
         try:
-            result = os.listdir(p)
+            result = get_fs(ctx).listdir(p)
         except OSError as e:
             raise ContentException(str(e))
         return sorted([r for r in result if not self.ignore_func(r)])
@@ -958,7 +1112,7 @@ class listglob(listdir):
         ctx = _get_context(self.context, broker)
         p = os.path.join(ctx.root, self.path.lstrip('/'))
         p = ctx.locate_path(p)
-        result = glob(p)
+        result = get_fs(ctx).glob(p)
         # generator expression; we don't need the full list at this step
         result = (os.path.relpath(r, start=ctx.root) for r in result)
         result = sorted([r for r in result if not self.ignore_func(r)])
@@ -1171,6 +1325,9 @@ class foreach_execute(object):
             calling process when the command is invoked.
         override_env (dict): A dict of environment variables to override from the
             calling process when the command is invoked.
+        workers (int): The number of commands to run at once when the output
+            of any of them is needed.  By default, each command runs when its
+            own output is needed.
 
     Returns:
         function: A datasource that returns a list of outputs for each command
@@ -1189,6 +1346,7 @@ class foreach_execute(object):
         inherit_env=None,
         override_env=None,
         signum=None,
+        workers=None,
         **kwargs,
     ):
         deps = deps if deps is not None else []
@@ -1202,11 +1360,17 @@ class foreach_execute(object):
         self.inherit_env = inherit_env if inherit_env is not None else []
         self.override_env = override_env if override_env is not None else dict()
         self.signum = signum
+        self.workers = workers
         self.__name__ = self.__class__.__name__
         datasource(self.provider, self.context, *deps, multi_output=True, raw=self.raw, **kwargs)(
             self
         )
 
+    def _load_concurrently(self, result):
+        if self.workers and self.workers > 1 and len(result) > 1:
+            _ConcurrentLoader(result, self.workers)
+        return result
+
     def __call__(self, broker):
         result = []
         source = broker[self.provider]
@@ -1240,7 +1404,7 @@ class foreach_execute(object):
             except Exception:
                 log.debug(traceback.format_exc())
         if result:
-            return result
+            return self._load_concurrently(result)
         raise ContentException("No results found for [%s]" % self.cmd)
 
 
@@ -1294,6 +1458,7 @@ class foreach_collect(object):
         source = broker[self.provider]
         cleaner = broker.get('cleaner')
         ctx = _get_context(self.context, broker)
+        vfs = get_fs(ctx)
         root = ctx.root
         if isinstance(source, ContentProvider):
             source = source.content
@@ -1301,8 +1466,8 @@ class foreach_collect(object):
             source = [source]
         for e in source:
             pattern = ctx.locate_path(self.path % e)
-            for p in glob(os.path.join(root, pattern.lstrip('/'))):
-                if self.ignore_func(p) or os.path.isdir(p):
+            for p in vfs.glob(os.path.join(root, pattern.lstrip('/'))):
+                if self.ignore_func(p) or vfs.isdir(p):
                     continue
                 try:
                     result.append(
@@ -1354,6 +1519,9 @@ class container_execute(foreach_execute):
             CalledProcessError is raised. If None, timeout is infinite.
         inherit_env (list): The list of environment variables to inherit from the
             calling process when the command is invoked.
+        workers (int): The number of commands to run at once when the output
+            of any of them is needed.  By default, each command runs when its
+            own output is needed.
 
     Returns:
         function: A datasource that returns a list of outputs for each command
@@ -1361,6 +1529,12 @@ class container_execute(foreach_execute):
     """
 
     def __call__(self, broker):
+        result = _container_providers(self, broker)
+        if result:
+            return self._load_concurrently(result)
+        raise ContentException("No results found for [%s]" % self.cmd)
+
+    def _create_providers(self, broker):
         result = []
         source = broker[self.provider]
         cleaner = broker.get('cleaner')
@@ -1404,9 +1578,7 @@ class container_execute(foreach_execute):
                 raise nfe
             except Exception:
                 log.debug(traceback.format_exc())
-        if result:
-            return result
-        raise ContentException("No results found for [%s]" % self.cmd)
+        return result
 
 
 class container_collect(foreach_execute):
@@ -1427,6 +1599,8 @@ class container_collect(foreach_execute):
         timeout (int): Number of seconds to wait for the command to complete.
             If the timeout is reached before the command returns, a
             CalledProcessError is raised. If None, timeout is infinite.
+        workers (int): The number of files to read at once when any of them
+            is needed.  By default, each file is read when it's needed.
 
     Returns:
         function: A datasource that returns a list of file contents created by
@@ -1445,6 +1619,7 @@ class container_collect(foreach_execute):
         inherit_env=None,
         override_env=None,
         signum=None,
+        workers=None,
         **kwargs,
     ):
         super(container_collect, self).__init__(
@@ -1458,10 +1633,17 @@ class container_collect(foreach_execute):
             inherit_env,
             override_env,
             signum,
+            workers,
             **kwargs,
         )
 
     def __call__(self, broker):
+        result = _container_providers(self, broker)
+        if result:
+            return self._load_concurrently(result)
+        raise ContentException("No results found for [%s]" % self.cmd)
+
+    def _create_providers(self, broker):
         result = []
         source = broker[self.provider]
         cleaner = broker.get('cleaner')
@@ -1502,9 +1684,59 @@ class container_collect(foreach_execute):
                 raise nfe
             except Exception:
                 log.debug(traceback.format_exc())
-        if result:
-            return result
-        raise ContentException("No results found for [%s]" % self.cmd)
+        return result
+
+
+_container_lock = threading.Lock()
+
+
+def _container_providers(spec, broker):
+    """
+    Returns the providers of the container `spec`.
+
+    The providers of the other container specs of the current run, see
+    :attr:`insights.core.dr.Broker.planned`, which are ready to run with the
+    same `provider` of containers, are created at the same time and kept in
+    the broker till those specs run.  The commands of all of them in the
+    same container are then run in one exec, see :class:`_ContainerBatch`.
+    """
+    with _container_lock:
+        created = broker.get("container_providers")
+        if created is None:
+            created = broker["container_providers"] = {}
+        if spec not in created:
+            specs = [spec] + sorted(
+                (
+                    s
+                    for s in dr.get_dependents(spec.provider)
+                    if isinstance(s, (container_execute, container_collect))
+                    and s is not spec
+                    and s in broker.planned
+                    and s not in created
+                    and s not in broker
+                    and dr.is_enabled(s)
+                    and all(d in broker for d in dr.get_dependencies(s))
+                ),
+                key=dr.get_name,
+            )
+            groups = defaultdict(list)
+            for s in specs:
+                try:
+                    created[s] = s._create_providers(broker)
+                except Exception as ex:
+                    # raised when the spec runs
+                    created[s] = ex
+                    continue
+                for p in created[s]:
+                    groups[(p.engine, p.container_id, tuple(sorted(p._env.items())))].append(p)
+            for providers in groups.values():
+                if len(providers) > 1:
+                    _ContainerBatch(providers)
+        # keep the spec to not create its providers again
+        result, created[spec] = created[spec], None
+    if isinstance(result, Exception):
+        raise result
+    return result
 
 
 class first_of(object):
@@ -1593,6 +1825,46 @@ class find(object):
         return dict(results)
 
 
+def get_file_patterns(components):
+    """
+    Get the glob patterns of the files the file datasources among
+    `components` might read, relative to the root of their context.  It's used
+    to extract only the files of an archive that are needed to evaluate the
+    `components`.
+
+    Args:
+        components (iterable): the components, e.g. a dependency graph.
+
+    Returns:
+        list: the sorted glob patterns, or None when they can't be determined
+        because another datasource depends directly on a context which isn't a
+        :class:`HostContext`, i.e. might read any file.
+    """
+    patterns = set()
+    for comp in components:
+        if isinstance(comp, simple_file):
+            patterns.add(comp.path)
+        elif isinstance(comp, first_file):
+            patterns.update(comp.paths)
+        elif isinstance(comp, glob_file):
+            patterns.update(comp.patterns)
+        elif isinstance(comp, foreach_collect):
+            patterns.add(re.sub(r"%(\(\w+\))?[sd]", "*", comp.path))
+        elif isinstance(comp, listglob):
+            patterns.add(comp.path)
+        elif isinstance(comp, listdir):
+            patterns.add(os.path.join(comp.path, "*"))
+        elif is_datasource(comp):
+            for dep in dr.get_dependencies(comp):
+                if (
+                    isinstance(dep, type)
+                    and issubclass(dep, ExecutionContext)
+                    and not issubclass(dep, HostContext)
+                ):
+                    return None
+    return sorted(p.lstrip("/") for p in patterns)
+
+
 @serializer(CommandOutputProvider)
 def serialize_command_output(obj, root):
     rel = os.path.join("insights_commands", obj.relative_path)
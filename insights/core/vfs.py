@@ -0,0 +1,505 @@
+"""
+Virtual Filesystem
+==================
+
+Read-only access to the files of a tar or zip archive without extracting it.
+
+An :class:`ArchiveFS` indexes the members of an archive once and reads them on
+demand.  The path of a member is the path of the archive joined with the name
+of the member, e.g. ``/tmp/sosreport.tar.xz/sosreport-host/etc/hosts``.  A
+context created with an ArchiveFS, see
+:func:`insights.core.hydration.create_context`, keeps it as its ``fs``, and the
+datasources of :mod:`insights.core.spec_factory` access the files with
+:func:`get_fs`.
+
+.. code-block:: python
+
+    with open_archive("/tmp/insights-host.tar.gz") as afs:
+        ctx, broker = initialize_broker(afs.root, fs=afs)
+"""
+
+import errno
+import fnmatch
+import glob as _glob
+import io
+import os
+import stat
+import tarfile
+import tempfile
+import threading
+import zipfile
+import zlib
+
+from bisect import bisect_right
+from collections import defaultdict
+from contextlib import contextmanager
+
+from insights.core.exceptions import InvalidContentType
+from insights.util.content_type import from_file as content_type_from_file
+from insights.util.fs import ensure_path
+
+SPOOL_SIZE = 8 * 1024 * 1024
+"""Members larger than it are copied to a temporary file instead of memory."""
+
+_CHUNK = 65536
+
+
+class LocalFS(object):
+    """
+    The local filesystem, used by the contexts without a virtual filesystem.
+    """
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def isdir(self, path):
+        return os.path.isdir(path)
+
+    def isfile(self, path):
+        return os.path.isfile(path)
+
+    def getsize(self, path):
+        return os.path.getsize(path)
+
+    def listdir(self, path):
+        return os.listdir(path)
+
+    def glob(self, pattern):
+        return _glob.glob(pattern)
+
+    def realpath(self, path):
+        return os.path.realpath(path)
+
+    def access(self, path):
+        return os.access(path, os.R_OK)
+
+    def open(self, path, mode="rb"):
+        """
+        Opens the file in binary mode, or as UTF-8 text with
+        "surrogateescape" errors when "b" is not in `mode`.
+        """
+        if "b" in mode:
+            return io.open(path, mode)
+        return io.open(path, mode, encoding="utf-8", errors="surrogateescape")
+
+
+LOCAL_FS = LocalFS()
+
+
+def get_fs(ctx):
+    """
+    Returns:
+        LocalFS: the filesystem of the context, :data:`LOCAL_FS` unless the
+        context was created on an :class:`ArchiveFS`.
+    """
+    return getattr(ctx, "fs", None) or LOCAL_FS
+
+
+class IndexedGzipFile(object):
+    """
+    A seekable, read-only view of the decompressed content of a gzip file.
+
+    Seeking backwards in a :class:`gzip.GzipFile` decompresses the file again
+    from its start.  An IndexedGzipFile keeps a copy of the decompressor every
+    `spacing` bytes of output, so that it restarts from the closest copy
+    instead.  The copies are made while the file is read the first time, e.g.
+    when the members of a tar archive are listed.
+
+    Args:
+        path (str): the path of the gzip file.
+        spacing (int): the number of decompressed bytes between two copies.
+    """
+
+    mode = "rb"
+
+    def __init__(self, path, spacing=4 * 1024 * 1024):
+        self.name = path
+        self.spacing = spacing
+        self._file = open(path, "rb")
+        self._pos = 0
+        self._size = None
+        zobj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        # uncompressed offsets and their (compressed offset, decompressor)
+        self._points = [0]
+        self._states = [(0, zobj)]
+        self._restore(0)
+
+    def _restore(self, index):
+        offset, zobj = self._states[index]
+        self._file.seek(offset)
+        self._zobj = zobj.copy()
+        self._out = self._points[index]
+        self._buf = b""
+
+    def _advance(self):
+        """
+        Decompresses the data after the buffer.  Returns False at the end.
+        """
+        self._out += len(self._buf)
+        self._buf = b""
+        while not self._buf:
+            if self._zobj.eof:
+                data = self._zobj.unused_data or self._file.read(_CHUNK)
+                if not data.strip(b"\0"):
+                    return False
+                # the next member of a multi-member gzip file
+                self._zobj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            else:
+                data = self._file.read(_CHUNK)
+                if not data:
+                    return False
+            self._buf = self._zobj.decompress(data)
+        end = self._out + len(self._buf)
+        if not self._zobj.eof and end >= self._points[-1] + self.spacing:
+            # the decompressor consumed all the data read so far
+            self._points.append(end)
+            self._states.append((self._file.tell(), self._zobj.copy()))
+        return True
+
+    def read(self, size=-1):
+        pos = self._pos
+        index = bisect_right(self._points, pos) - 1
+        if pos < self._out or self._points[index] > self._out + len(self._buf):
+            self._restore(index)
+        chunks = []
+        remaining = size
+        while remaining:
+            offset = pos - self._out
+            if offset < len(self._buf):
+                end = len(self._buf) if remaining < 0 else offset + remaining
+                chunk = self._buf[offset:end]
+                chunks.append(chunk)
+                pos += len(chunk)
+                remaining = remaining - len(chunk) if remaining > 0 else remaining
+                continue
+            if not self._advance():
+                break
+        self._pos = pos
+        return b"".join(chunks)
+
+    def _get_size(self):
+        if self._size is None:
+            self._restore(len(self._points) - 1)
+            while self._advance():
+                pass
+            self._size = self._out + len(self._buf)
+        return self._size
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._get_size()
+        self._pos = max(offset, 0)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def close(self):
+        self._file.close()
+
+
+class ArchiveFS(LocalFS):
+    """
+    The index of the members of an archive, with the same interface as
+    :class:`LocalFS`.  Subclasses list the members and read them.
+
+    The members are read under a lock and copied in memory, or to a
+    temporary file when they are larger than `spool_size`, so the files
+    returned by :meth:`open` are independent and seekable.
+
+    Attributes:
+        path (str): the real path of the archive.
+        root (str): the virtual path of the top of the archive, it's the
+            `path` of the archive.
+    """
+
+    def __init__(self, path, spool_size=SPOOL_SIZE):
+        self.path = os.path.realpath(path)
+        self.root = self.path
+        self.spool_size = spool_size
+        self._lock = threading.Lock()
+        self._files = {}
+        self._sizes = {}
+        self._links = {}
+        self._dirs = defaultdict(set)
+        self._dirs[""] = set()
+        self._index()
+
+    def _index(self):
+        raise NotImplementedError()
+
+    def _copy(self, member, dst):
+        """
+        Copies the content of the member to `dst` with :meth:`_spool`.
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _add(self, name, member=None, size=0, link=None, isdir=False):
+        name = os.path.normpath(name.replace("\\", "/")).lstrip("/")
+        if name in (".", "") or name == ".." or name.startswith("../"):
+            return
+        parent, base = os.path.split(name)
+        if isdir:
+            self._dirs[name]
+        elif link is not None:
+            self._links[name] = link
+        else:
+            self._files[name] = member
+            self._sizes[name] = size
+        # the archive might not have the entries of the directories
+        while base:
+            self._dirs[parent].add(base)
+            parent, base = os.path.split(parent)
+
+    def _resolve(self, rel):
+        """
+        Returns the relative path with the symbolic links resolved, None when
+        it points outside of the archive.
+        """
+        parts = [p for p in rel.split("/") if p and p != "."]
+        resolved = []
+        hops = 0
+        while parts:
+            part = parts.pop(0)
+            if part == "..":
+                if not resolved:
+                    return None
+                resolved.pop()
+                continue
+            link = self._links.get("/".join(resolved + [part]))
+            if link is None:
+                resolved.append(part)
+                continue
+            hops += 1
+            if hops > 40 or link.startswith("/"):
+                return None
+            parts = link.split("/") + parts
+        return "/".join(resolved)
+
+    def _relpath(self, path):
+        path = os.path.normpath(path)
+        if path == self.root:
+            return ""
+        if not path.startswith(self.root + os.sep):
+            return None
+        return self._resolve(path[len(self.root) + 1 :])
+
+    def files(self):
+        """
+        Returns:
+            list: the paths of all the regular files in the archive.
+        """
+        return [os.path.join(self.root, name) for name in sorted(self._files)]
+
+    def extract(self, paths, dst):
+        """
+        Extracts the files and directories `paths` of the archive into the
+        directory `dst`.  The symbolic links are resolved, i.e. a link to a
+        file is extracted as a copy of the file.
+
+        Returns:
+            list: the paths of the extracted files.
+        """
+        rels = set()
+        for path in paths:
+            rel = os.path.normpath(path)[len(self.root) + 1 :]
+            if self._relpath(path) in self._dirs:
+                ensure_path(os.path.join(dst, rel))
+            elif self._relpath(path) in self._files:
+                rels.add(rel)
+
+        def offset(rel):
+            # read the members of a compressed tar in order, without seeking back
+            return getattr(self._files[self._resolve(rel)], "offset_data", 0)
+
+        extracted = []
+        for rel in sorted(rels, key=offset):
+            target = os.path.join(dst, rel)
+            ensure_path(os.path.dirname(target))
+            with open(target, "wb") as f, self._lock:
+                self._copy(self._files[self._resolve(rel)], f)
+            extracted.append(target)
+        return extracted
+
+    def exists(self, path):
+        rel = self._relpath(path)
+        return rel is not None and (rel in self._files or rel in self._dirs)
+
+    def isdir(self, path):
+        return self._relpath(path) in self._dirs
+
+    def isfile(self, path):
+        return self._relpath(path) in self._files
+
+    def getsize(self, path):
+        rel = self._relpath(path)
+        if rel not in self._files:
+            raise OSError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        return self._sizes[rel]
+
+    def listdir(self, path):
+        rel = self._relpath(path)
+        if rel not in self._dirs:
+            code = errno.ENOTDIR if rel in self._files else errno.ENOENT
+            raise OSError(code, os.strerror(code), path)
+        return sorted(self._dirs[rel])
+
+    def glob(self, pattern):
+        pattern = os.path.normpath(pattern)
+        if not pattern.startswith(self.root + os.sep):
+            return []
+        parts = pattern[len(self.root) + 1 :].split("/")
+        matches = [""]
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            found = []
+            for base in matches:
+                if _glob.has_magic(part):
+                    names = self._dirs.get(self._resolve(base), ())
+                    if not part.startswith("."):
+                        names = [n for n in names if not n.startswith(".")]
+                    candidates = [os.path.join(base, n) for n in fnmatch.filter(names, part)]
+                else:
+                    candidates = [os.path.join(base, part)]
+                for c in candidates:
+                    rel = self._resolve(c)
+                    if rel in self._dirs or (last and rel in self._files):
+                        found.append(c)
+            matches = found
+        return [os.path.join(self.root, m) for m in matches]
+
+    def realpath(self, path):
+        rel = self._relpath(path)
+        if rel is None:
+            return os.path.normpath(path)
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def access(self, path):
+        return self.exists(path)
+
+    def open(self, path, mode="rb"):
+        rel = self._relpath(path)
+        if rel not in self._files:
+            raise IOError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+        with self._lock:
+            dst = self._copy(self._files[rel], io.BytesIO())
+        dst.seek(0)
+        if "b" in mode:
+            return dst
+        return io.TextIOWrapper(dst, encoding="utf-8", errors="surrogateescape")
+
+    def _spool(self, src, dst):
+        """
+        Copies `src` to `dst`, a BytesIO, or to a temporary file once it's
+        larger than `spool_size`.  Returns the one holding the content.
+        """
+        while True:
+            data = src.read(_CHUNK)
+            if not data:
+                return dst
+            dst.write(data)
+            if isinstance(dst, io.BytesIO) and dst.tell() > self.spool_size:
+                tmp = tempfile.TemporaryFile()
+                tmp.write(dst.getvalue())
+                dst = tmp
+
+
+class TarFS(ArchiveFS):
+    """
+    The :class:`ArchiveFS` of a tar archive.  The gzip compressed ones are
+    read with an :class:`IndexedGzipFile` so that the members can be read in
+    any order.
+    """
+
+    def _index(self):
+        with open(self.path, "rb") as f:
+            gzipped = f.read(2) == b"\x1f\x8b"
+        if gzipped:
+            self._gz = IndexedGzipFile(self.path)
+            self._tar = tarfile.open(fileobj=self._gz, mode="r:")
+        else:
+            self._gz = None
+            self._tar = tarfile.open(self.path, "r:*")
+        files = {}
+        for m in self._tar.getmembers():
+            if m.isdir():
+                self._add(m.name, isdir=True)
+            elif m.issym():
+                self._add(m.name, link=m.linkname)
+            elif m.isfile():
+                files[m.name] = m
+                self._add(m.name, member=m, size=m.size)
+            elif m.islnk() and m.linkname in files:
+                # a hard link has no content, it's the one of the file before
+                target = files[m.linkname]
+                self._add(m.name, member=target, size=target.size)
+
+    def _copy(self, member, dst):
+        src = self._tar.extractfile(member)
+        return self._spool(src, dst)
+
+    def close(self):
+        self._tar.close()
+        if self._gz is not None:
+            self._gz.close()
+
+
+class ZipFS(ArchiveFS):
+    """
+    The :class:`ArchiveFS` of a zip archive.
+    """
+
+    def _index(self):
+        self._zip = zipfile.ZipFile(self.path)
+        for info in self._zip.infolist():
+            if info.filename.endswith("/"):
+                self._add(info.filename, isdir=True)
+            elif stat.S_ISLNK(info.external_attr >> 16):
+                link = self._zip.read(info).decode("utf-8", "surrogateescape")
+                self._add(info.filename, link=link)
+            else:
+                self._add(info.filename, member=info, size=info.file_size)
+
+    def _copy(self, member, dst):
+        with self._zip.open(member) as src:
+            return self._spool(src, dst)
+
+    def close(self):
+        self._zip.close()
+
+
+@contextmanager
+def open_archive(path, spool_size=SPOOL_SIZE):
+    """
+    Opens the tar or zip archive `path` as an :class:`ArchiveFS`.
+
+    Raises:
+        InvalidContentType: when it's not a tar or zip archive.
+    """
+    if zipfile.is_zipfile(path):
+        afs = ZipFS(path, spool_size=spool_size)
+    elif tarfile.is_tarfile(path):
+        afs = TarFS(path, spool_size=spool_size)
+    else:
+        raise InvalidContentType(content_type_from_file(path))
+    try:
+        yield afs
+    finally:
+        afs.close()
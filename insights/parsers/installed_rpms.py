@@ -18,7 +18,7 @@ from insights.core.exceptions import SkipComponent
 from insights.specs import Specs
 from insights.util import deprecated
 from insights.util import rsplit
-from insights.util.rpm_vercmp import rpm_version_compare
+from insights.util.rpm_vercmp import version_key
 
 
 # This list of architectures is taken from PDC (Product Definition Center):
@@ -87,7 +87,8 @@ here https://pdc.fedoraproject.org/rest_api/v1/arches/.
 class RpmList(object):
     """
     Mixin class providing ``__contains__``, ``get_max``, ``get_min``,
-    ``newest``, and ``oldest`` implementations for components that handle rpms.
+    ``newest``, ``oldest`` and ``older_than`` implementations for components
+    that handle rpms.
     """
 
     def __contains__(self, package_name):
@@ -140,6 +141,30 @@ class RpmList(object):
         else:
             return min(self.packages[package_name])
 
+    def older_than(self, rpms):
+        """
+        Returns the installed packages older than the given ones, e.g. the
+        fixed packages of an erratum, the installed packages being compared
+        by their precomputed :attr:`InstalledRpm.version_key`.
+
+        Args:
+            rpms (list): :class:`InstalledRpm` objects or package strings
+                such as 'bash-4.2.46-34.el7'
+
+        Returns:
+            dict: Lists of the installed RPMs older than the given package of
+            the same name, by package name.  The packages which aren't
+            installed in an older version are not included.
+        """
+        older = {}
+        for rpm in rpms:
+            rpm = rpm if isinstance(rpm, InstalledRpm) else InstalledRpm.from_package(rpm)
+            key = rpm.version_key
+            found = [p for p in self.packages.get(rpm.name, []) if p.version_key < key]
+            if found:
+                older[rpm.name] = found
+        return older
+
     # re-export get_max/min with more descriptive names
     newest = get_max
     oldest = get_min
@@ -598,10 +623,20 @@ class InstalledRpm(object):
     def __repr__(self):
         return str(self)
 
-    def __eq__(self, other):
-        if not isinstance(other, InstalledRpm):
-            return False
+    @property
+    def version_key(self):
+        """
+        tuple: The key ordering the packages by epoch, version and release
+        as rpm does, see :func:`insights.util.rpm_vercmp.version_key`.  It's
+        computed once, unless the epoch, version or release changes.
+        """
+        evr = (self.epoch, self.version, self.release)
+        cached = self.__dict__.get('_version_key')
+        if cached is None or cached[0] != evr:
+            cached = self._version_key = (evr, tuple(version_key(v) for v in evr))
+        return cached[1]
 
+    def _check_name(self, other):
         if self.name != other.name:
             raise ValueError(
                 'Cannot compare packages with differing names {0} != {1}'.format(
@@ -609,16 +644,19 @@ class InstalledRpm(object):
                 )
             )
 
-        return rpm_version_compare(self, other) == 0
-
-    def __lt__(self, other):
+    def __eq__(self, other):
         if not isinstance(other, InstalledRpm):
             return False
 
-        if self == other:
+        self._check_name(other)
+        return self.version_key == other.version_key
+
+    def __lt__(self, other):
+        if not isinstance(other, InstalledRpm):
             return False
 
-        return rpm_version_compare(self, other) < 0
+        self._check_name(other)
+        return self.version_key < other.version_key
 
     def __ne__(self, other):
         return not self == other
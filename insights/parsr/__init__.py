@@ -51,12 +51,26 @@ import logging
 import os
 import string
 import traceback
+import weakref
 
 from bisect import bisect_left
+from collections import OrderedDict
 from io import StringIO
 
 log = logging.getLogger(__name__)
 
+_DEBUGGED = weakref.WeakSet()
+"""
+The parsers with debug enabled.  Grammars are run without the bookkeeping of
+``_debug_hook`` while it's empty.
+"""
+
+_generation = 0
+"""
+Incremented when any parser gets new children, to invalidate the dispatch
+tables of the parsers.
+"""
+
 
 class Node(object):
     """
@@ -69,7 +83,9 @@ class Node(object):
         self.children = []
 
     def add_child(self, child):
+        global _generation
         self.children.append(child)
+        _generation += 1
         return self
 
     def set_children(self, children):
@@ -118,10 +134,21 @@ def _debug_hook(func):
     _debug_hook wraps the process function of every parser. It maintains a
     stack of active parsers during evaluation to help with error reporting and
     prints diagnostic messages for parsers with debug enabled.
+
+    When the :py:class:`Context` is ``fast``, the process function is called
+    directly: no parser has debug enabled and the errors aren't needed yet.
+    The results of memoized parsers are looked up in the Context first.
     """
 
+    # classes without their own process function wrap the inherited wrapper
+    raw = getattr(func, "_raw", func)
+
     @functools.wraps(func)
     def inner(self, pos, data, ctx):
+        if ctx.fast:
+            if self._memo:
+                return ctx.memoized(self, raw, pos, data)
+            return raw(self, pos, data, ctx)
         if ctx.function_error is not None:
             # no point in continuing...
             raise Exception()
@@ -143,9 +170,46 @@ def _debug_hook(func):
         finally:
             ctx.parser_stack.pop()
 
+    inner._raw = raw
     return inner
 
 
+def _first_chars(parser, seen):
+    """
+    Returns the ``_first`` of a parser, or None if it's already being computed.
+    """
+    if parser in seen:
+        return None
+    seen.add(parser)
+    try:
+        return parser._first(seen)
+    finally:
+        seen.discard(parser)
+
+
+def _first_seq(parsers, seen):
+    """
+    Returns the ``_first`` of parsers matching one after the other.
+    """
+    chars = set()
+    for p in parsers:
+        f = _first_chars(p, seen)
+        if f is None:
+            return None
+        chars |= f[0]
+        if not f[1]:
+            return chars, False
+    return chars, True
+
+
+class _FunctionError(BaseException):
+    """
+    Raised by a mapped or lifted function failing in a ``fast``
+    :py:class:`Context`. It isn't caught by the parsers, the input is parsed
+    again to report the error.
+    """
+
+
 class Backtrack(Exception):
     """
     Mapped or Lifted functions should Backtrack if they want to fail without
@@ -162,8 +226,16 @@ class Context(object):
     parser. It stores an indention stack to track hanging indents, a tag stack
     for grammars like xml or apache configuration, the active parser stack for
     error reporting, and accumulated errors for the farthest position reached.
+
+    A ``fast`` Context only records the farthest position reached: the
+    parsers aren't tracked and no error is accumulated. It also holds the
+    results of the memoized parsers by parser and position, up to
+    ``memo_size`` of them.
     """
 
+    fast = False
+    memo_size = 10000
+
     def __init__(self, lines, src=None):
         self.pos = -1
         self.indents = []
@@ -173,6 +245,30 @@ class Context(object):
         self.parser_stack = []
         self.errors = []
         self.function_error = None
+        self.memo = OrderedDict()
+
+    def memoized(self, parser, func, pos, data):
+        """
+        Returns the result of the process function of a memoized parser at a
+        position, calling it only the first time. The oldest results are
+        dropped once there are ``memo_size`` of them: the parsers mostly move
+        forward in the input.
+        """
+        key = (id(parser), pos)
+        memo = self.memo
+        try:
+            res = memo[key]
+        except KeyError:
+            try:
+                res = func(parser, pos, data, self)
+            except Exception:
+                res = None
+            if len(memo) >= self.memo_size:
+                memo.popitem(last=False)
+            memo[key] = res
+        if res is None:
+            raise Exception()
+        return res
 
     def set(self, pos, msg):
         """
@@ -184,6 +280,11 @@ class Context(object):
         stack and new error are recorded. This is the "farthest failure
         heurstic."
         """
+        if self.fast:
+            if pos > self.pos:
+                self.pos = pos
+            return
+
         if pos > self.pos:
             self.errors = []
 
@@ -204,12 +305,15 @@ class Context(object):
 class _ParserMeta(type):
     """
     ParserMeta wraps every parser subclass's process function with the
-    ``_debug_hook`` decorator.
+    ``_debug_hook`` decorator. A subclass with its own process function but
+    without its own ``_first`` can start with any character.
     """
 
     def __init__(cls, name, bases, clsdict):
         orig = getattr(cls, "process")
         setattr(cls, "process", _debug_hook(orig))
+        if "process" in clsdict and "_first" not in clsdict:
+            cls._first = Parser._first
 
 
 class Parser(Node, metaclass=_ParserMeta):
@@ -217,6 +321,9 @@ class Parser(Node, metaclass=_ParserMeta):
     Parser is the common base class of all Parsers.
     """
 
+    _memo = False
+    _table = None
+
     def __init__(self):
         super(Parser, self).__init__()
         self.name = None
@@ -228,8 +335,53 @@ class Parser(Node, metaclass=_ParserMeta):
         parser is invoked.
         """
         self._debug = d
+        if d:
+            _DEBUGGED.add(self)
+        else:
+            _DEBUGGED.discard(self)
+        return self
+
+    def memoize(self, m=True):
+        """
+        Set to ``True`` to remember the results of the parser by position
+        during a parse, so backtracking into it again doesn't parse the same
+        input twice. It's worth it for a parser tried several times at the same
+        positions, like the start of the alternatives of a :py:class:`Choice`.
+
+        The results are shared, so the functions of :py:class:`Map` and
+        :py:class:`Lift` parsers shouldn't modify them. Parsers depending on
+        the indent or tag stacks of the :py:class:`Context` can't be memoized.
+        """
+        self._memo = m
         return self
 
+    def _first(self, seen):
+        """
+        Returns the characters a match of the parser can start with and
+        whether it can match without consuming any input as a ``(chars,
+        nullable)`` tuple, or None if it can't be told. ``seen`` holds the
+        parsers already being computed, so recursive grammars stop.
+        """
+        return None
+
+    def _candidates(self, c):
+        """
+        Returns the children that can match at the character ``c``, leaving
+        out those that can't start with it. The table is built again once the
+        grammar changes.
+        """
+        table = self._table
+        if table is None or table[0] != _generation:
+            firsts = [(p, _first_chars(p, set())) for p in self.children]
+            table = self._table = (_generation, firsts, {})
+        cands = table[2]
+        try:
+            return cands[c]
+        except KeyError:
+            res = tuple(p for p, f in table[1] if f is None or f[1] or c in f[0])
+            cands[c] = res
+            return res
+
     @staticmethod
     def _accumulate(first, rest):
         results = [first] if first else []
@@ -335,8 +487,19 @@ class Parser(Node, metaclass=_ParserMeta):
         """
         data = list(data)
         data.append(None)  # add a terminal so we don't overrun
-        ctx = Ctx(data, src=src)
 
+        if not _DEBUGGED:
+            # Only a failed parse needs the active parsers, to report the
+            # errors: the input is parsed without tracking them first.
+            ctx = Ctx(data, src=src)
+            ctx.fast = True
+            try:
+                _, ret = self.process(0, data, ctx)
+                return ret
+            except (Exception, _FunctionError):
+                pass
+
+        ctx = Ctx(data, src=src)
         try:
             _, ret = self.process(0, data, ctx)
             return ret
@@ -401,6 +564,9 @@ class Char(Parser):
         ctx.set(pos, msg)
         raise Exception(msg)
 
+    def _first(self, seen):
+        return set([self.char]), False
+
     def __repr__(self):
         if self.name is None:
             return "Char({0})".format(self.char)
@@ -436,6 +602,9 @@ class InSet(Parser):
         ctx.set(pos, msg)
         raise Exception(msg)
 
+    def _first(self, seen):
+        return self.values, False
+
     def __repr__(self):
         if self.name is None:
             return "InSet({0!r})".format(sorted(self.values))
@@ -484,6 +653,10 @@ class String(Parser):
             raise Exception(msg)
         return pos, "".join(results)
 
+    def _first(self, seen):
+        chars = self.chars | set(["\\"]) if self.echars else self.chars
+        return chars, self.min_length <= 0
+
 
 class Literal(Parser):
     """
@@ -552,6 +725,11 @@ class Literal(Parser):
                     raise Exception(msg)
             return pos, ("".join(result) if self.value is self._NULL else self.value)
 
+    def _first(self, seen):
+        if self.ignore_case:
+            return None
+        return set(self.chars[:1]), not self.chars
+
 
 class Wrapper(Parser):
     """
@@ -567,6 +745,9 @@ class Wrapper(Parser):
     def process(self, pos, data, ctx):
         return self.children[0].process(pos, data, ctx)
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class Mark(object):
     """
@@ -594,6 +775,9 @@ class PosMarker(Wrapper):
         pos, result = super(PosMarker, self).process(pos, data, ctx)
         return pos, Mark(lineno, col, result)
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class Sequence(Parser):
     """
@@ -645,6 +829,9 @@ class Sequence(Parser):
             results.append(res)
         return pos, results
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class Choice(Parser):
     """
@@ -676,13 +863,25 @@ class Choice(Parser):
         return self.add_child(other)
 
     def process(self, pos, data, ctx):
-        for c in self.children:
+        children = self._candidates(data[pos]) if ctx.fast else self.children
+        for c in children:
             try:
                 return c.process(pos, data, ctx)
-            except:
+            except Exception:
                 pass
         raise Exception()
 
+    def _first(self, seen):
+        chars = set()
+        nullable = False
+        for p in self.children:
+            f = _first_chars(p, seen)
+            if f is None:
+                return None
+            chars |= f[0]
+            nullable = nullable or f[1]
+        return chars, nullable
+
 
 class Many(Parser):
     """
@@ -728,6 +927,8 @@ class Many(Parser):
         results = []
         p = self.children[0]
         while True:
+            if ctx.fast and not self._candidates(data[pos]):
+                break
             try:
                 pos, res = p.process(pos, data, ctx)
                 results.append(res)
@@ -741,6 +942,12 @@ class Many(Parser):
 
         return pos, results
 
+    def _first(self, seen):
+        f = _first_chars(self.children[0], seen)
+        if f is None:
+            return None
+        return f[0], f[1] or self.lower <= 0
+
     def __repr__(self):
         if not self.name:
             return "Many({0}, lower={1})".format(self.children[0], self.lower)
@@ -791,6 +998,12 @@ class Until(Parser):
                 break
         return pos, results
 
+    def _first(self, seen):
+        f = _first_chars(self.children[0], seen)
+        if f is None:
+            return None
+        return f[0], True
+
 
 class FollowedBy(Parser):
     """
@@ -820,6 +1033,9 @@ class FollowedBy(Parser):
         right.process(new, data, ctx)
         return new, res
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class NotFollowedBy(Parser):
     """
@@ -854,6 +1070,9 @@ class NotFollowedBy(Parser):
             ctx.set(new, msg)
             raise Exception()
 
+    def _first(self, seen):
+        return _first_chars(self.children[0], seen)
+
 
 class KeepLeft(Parser):
     """
@@ -882,6 +1101,9 @@ class KeepLeft(Parser):
         pos, _ = right.process(pos, data, ctx)
         return pos, res
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class KeepRight(Parser):
     """
@@ -909,6 +1131,9 @@ class KeepRight(Parser):
         pos, _ = left.process(pos, data, ctx)
         return right.process(pos, data, ctx)
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class Opt(Parser):
     """
@@ -942,6 +1167,12 @@ class Opt(Parser):
         except Exception:
             return pos, self.default
 
+    def _first(self, seen):
+        f = _first_chars(self.children[0], seen)
+        if f is None:
+            return None
+        return f[0], True
+
 
 class Map(Parser):
     """
@@ -974,8 +1205,13 @@ class Map(Parser):
             tb = traceback.format_exc()
             msg = (self.name or "Map") + " raised{l}{tb}".format(l=os.linesep, tb=tb)
             ctx.function_error = (pos, msg)
+            if ctx.fast:
+                raise _FunctionError()
             raise
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
     def __repr__(self):
         if not self.name:
             return "Map({0}({1}))".format(self.func.__name__, self.children[0])
@@ -1035,8 +1271,13 @@ class Lift(Parser):
             msg = (self.name or "Lift") + " raised{l}{tb}".format(l=os.linesep, tb=tb)
             ctx.set(pos, msg)
             ctx.function_error = (pos, msg)
+            if ctx.fast:
+                raise _FunctionError()
             raise
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class Forward(Parser):
     """
@@ -1066,6 +1307,9 @@ class Forward(Parser):
     def process(self, pos, data, ctx):
         return self.children[0].process(pos, data, ctx)
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class EOF(Parser):
     """
@@ -1086,6 +1330,9 @@ class EOF(Parser):
         ctx.set(pos, msg)
         raise Exception(msg)
 
+    def _first(self, seen):
+        return set([None]), False
+
 
 class EnclosedComment(Parser):
     """
@@ -1108,6 +1355,9 @@ class EnclosedComment(Parser):
     def process(self, pos, data, ctx):
         return self.children[0].process(pos, data, ctx)
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class OneLineComment(Parser):
     """
@@ -1129,6 +1379,9 @@ class OneLineComment(Parser):
     def process(self, pos, data, ctx):
         return self.children[0].process(pos, data, ctx)
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class WithIndent(Wrapper):
     """
@@ -1158,6 +1411,9 @@ class WithIndent(Wrapper):
         finally:
             ctx.indents.pop()
 
+    def _first(self, seen):
+        return _first_seq([WS] + self.children, seen)
+
 
 class HangingString(Parser):
     """
@@ -1196,6 +1452,12 @@ class HangingString(Parser):
         ret = " ".join(results)
         return pos, ret
 
+    def _first(self, seen):
+        f = _first_chars(self.children[0], seen)
+        if f is None:
+            return None
+        return f[0], True
+
 
 class StartTagName(Wrapper):
     """
@@ -1209,6 +1471,9 @@ class StartTagName(Wrapper):
         ctx.tags.append(res)
         return pos, res
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class EndTagName(Wrapper):
     """
@@ -1238,6 +1503,9 @@ class EndTagName(Wrapper):
             raise Exception(msg)
         return pos, res
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 class EmptyQuotedString(Parser):
     def __init__(self, chars):
@@ -1249,6 +1517,9 @@ class EmptyQuotedString(Parser):
     def process(self, pos, data, ctx):
         return self.children[0].process(pos, data, ctx)
 
+    def _first(self, seen):
+        return _first_seq(self.children, seen)
+
 
 def _make_number(sign, int_part, frac_part):
     tmp = sign + int_part + ("".join(frac_part) if frac_part else "")
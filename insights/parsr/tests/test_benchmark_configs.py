@@ -0,0 +1,136 @@
+"""
+Benchmark of the parsr grammars on a corpus of large configurations: an
+Apache configuration with the content of hundreds of included files, an nginx
+configuration with a huge ``map`` block and a multipath configuration with
+thousands of devices.  It also compares a grammar whose alternatives share a
+prefix with and without memoizing the prefix.
+
+It's skipped by default, run it with `pytest --runslow -s`.
+"""
+
+import time
+
+import pytest
+
+from insights.parsers.httpd_conf import DocParser
+from insights.parsers.multipath_conf import parse_doc
+from insights.parsers.nginx_conf import NginxConfPEG
+from insights.parsr import Char, Many, String, WS
+from insights.tests import context_wrap
+
+VHOSTS = 1000
+MAP_ENTRIES = 20000
+DEVICES = 2000
+
+
+def httpd_conf():
+    lines = ['ServerRoot "/etc/httpd"', "Listen 80"]
+    for i in range(VHOSTS):
+        lines.extend(
+            [
+                "<VirtualHost *:{0}>".format(8000 + i),
+                "  ServerName host{0}.example.com".format(i),
+                '  DocumentRoot "/var/www/{0}"'.format(i),
+                '  <Directory "/var/www/{0}">'.format(i),
+                "    Options Indexes FollowSymLinks",
+                "    AllowOverride None",
+                "    Require all granted",
+                "  </Directory>",
+                "  # included from conf.d/host{0}.conf".format(i),
+                "  LogLevel warn",
+                "</VirtualHost>",
+            ]
+        )
+    return "\n".join(lines)
+
+
+def nginx_conf():
+    lines = ["http {", "  map $host $backend {", "    default upstream0;"]
+    for i in range(MAP_ENTRIES):
+        lines.append("    host{0}.example.com upstream{1};".format(i, i % 100))
+    lines.extend(
+        [
+            "  }",
+            "  server {",
+            "    listen 80;",
+            "    location / {",
+            "      proxy_pass http://$backend;",
+            "    }",
+            "  }",
+            "}",
+        ]
+    )
+    return "\n".join(lines)
+
+
+def multipath_conf():
+    lines = ["defaults {", "  user_friendly_names yes", "}", "devices {"]
+    for i in range(DEVICES):
+        lines.extend(
+            [
+                "  device {",
+                '    vendor "VENDOR{0}"'.format(i),
+                '    product "PRODUCT{0}"'.format(i),
+                "    path_grouping_policy group_by_prio",
+                "    no_path_retry 12",
+                "  }",
+            ]
+        )
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def shared_prefix(memoize):
+    Name = WS >> String("abcdefghijklmnopqrstuvwxyz") << WS
+    Attrs = Many(Name)
+    if memoize:
+        Attrs.memoize()
+    Stmt = (Attrs + Char(";")) | (Attrs + Char("{") + Char("}")) | (Attrs + Char("."))
+    return Many(Stmt)
+
+
+def best_of(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        duration = time.time() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def test_benchmark_configs(request):
+    if not request.config.getoption("--runslow"):
+        pytest.skip("benchmark, run with --runslow")
+
+    httpd, nginx, multipath = httpd_conf(), nginx_conf(), multipath_conf()
+    httpd_parser = DocParser(None)
+    nginx_parser = NginxConfPEG(context_wrap("user root;"))
+
+    assert len(httpd_parser(httpd)[0]) == VHOSTS + 2
+    assert len(nginx_parser.Top(nginx)[0][0].children) == 2
+    assert len(parse_doc(multipath, None)["devices"]["device"]) == DEVICES
+
+    statements = " ".join(["alpha beta gamma delta epsilon ."] * 2000)
+    assert shared_prefix(True)(statements) == shared_prefix(False)(statements)
+
+    print(
+        "\nhttpd: {0} virtual hosts in {1:.2f}s".format(
+            VHOSTS, best_of(lambda: httpd_parser(httpd))
+        )
+    )
+    print(
+        "nginx: {0} map entries in {1:.2f}s".format(
+            MAP_ENTRIES, best_of(lambda: nginx_parser.Top(nginx))
+        )
+    )
+    print(
+        "multipath: {0} devices in {1:.2f}s".format(
+            DEVICES, best_of(lambda: parse_doc(multipath, None))
+        )
+    )
+    for memoize in (False, True):
+        p = shared_prefix(memoize)
+        print(
+            "shared prefix, memoize={0}: {1:.2f}s".format(memoize, best_of(lambda: p(statements)))
+        )
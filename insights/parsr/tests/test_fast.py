@@ -0,0 +1,55 @@
+import logging
+
+import pytest
+
+from insights.parsr import Char, Context, Many, _DEBUGGED
+
+
+def boom(_):
+    raise Exception("Boom")
+
+
+class RecordingContext(Context):
+    contexts = []
+
+    def __init__(self, lines, src=None):
+        super(RecordingContext, self).__init__(lines, src=src)
+        self.contexts.append(self)
+
+
+def test_fast_then_errors():
+    RecordingContext.contexts = []
+    p = Many(Char("a") % "A") + (Char("b") % "B")
+    assert p("aab", Ctx=RecordingContext) == [["a", "a"], "b"]
+    assert [c.fast for c in RecordingContext.contexts] == [True]
+    assert RecordingContext.contexts[0].parser_stack == []
+
+    # the errors are accumulated in a second parse
+    RecordingContext.contexts = []
+    with pytest.raises(Exception) as ex:
+        p("aac", Ctx=RecordingContext)
+    assert [c.fast for c in RecordingContext.contexts] == [True, False]
+    assert "At line 1 column 3" in str(ex.value)
+    assert "B\n    Expected b. Got 'c'." in str(ex.value)
+
+
+def test_fast_function_error():
+    # the function error stops the parse although an alternative matches
+    p = (Char("a").map(boom) | Char("a")) + Char("b")
+    with pytest.raises(Exception) as ex:
+        p("ab")
+    assert "Boom" in str(ex.value)
+
+
+def test_debug_disables_fast(caplog):
+    RecordingContext.contexts = []
+    a = Char("a").debug()
+    assert a in _DEBUGGED
+    try:
+        with caplog.at_level(logging.DEBUG, logger="insights.parsr"):
+            assert a("a", Ctx=RecordingContext) == "a"
+        assert [c.fast for c in RecordingContext.contexts] == [False]
+        assert "Trying Char(a) at line 1 col 1" in caplog.text
+    finally:
+        a.debug(False)
+    assert a not in _DEBUGGED
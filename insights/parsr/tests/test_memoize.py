@@ -0,0 +1,88 @@
+import pytest
+
+from insights.parsr import Char, Context, Many, Opt, Parser, WS
+
+
+class Counter(object):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, x):
+        self.calls += 1
+        return "".join(x)
+
+
+def grammar(memoize):
+    count = Counter()
+    xs = Many(Char("x")).map(count)
+    if memoize:
+        xs.memoize()
+    p = (xs + Char("a")) | (xs + Char("b"))
+    return p, count
+
+
+def test_memoize():
+    p, count = grammar(False)
+    assert p("xxxb") == ["xxx", "b"]
+    assert count.calls == 2
+
+    p, count = grammar(True)
+    assert p("xxxb") == ["xxx", "b"]
+    assert count.calls == 1
+
+
+def test_memoize_errors():
+    p, _ = grammar(False)
+    with pytest.raises(Exception) as expected:
+        p("xxxc")
+
+    p, _ = grammar(True)
+    with pytest.raises(Exception) as ex:
+        p("xxxc")
+    assert str(ex.value) == str(expected.value)
+
+
+def test_memo_size():
+    class SmallContext(Context):
+        memo_size = 2
+        contexts = []
+
+        def __init__(self, lines, src=None):
+            super(SmallContext, self).__init__(lines, src=src)
+            self.contexts.append(self)
+
+    x = Char("x").memoize()
+    p = Many(x | Char("y"))
+    assert p("xxxxy", Ctx=SmallContext) == ["x", "x", "x", "x", "y"]
+    ctx = SmallContext.contexts[0]
+    assert len(ctx.memo) == 2
+    assert [pos for (_, pos) in ctx.memo] == [2, 3]
+
+
+def test_dispatch():
+    a = Char("a")
+    b = WS >> Char("b")
+    c = Opt(Char("c"))
+    p = a | b
+    assert p._candidates("a") == (a,)
+    assert p._candidates("b") == (b,)
+    assert p._candidates(" ") == (b,)
+    assert p._candidates("d") == ()
+
+    # the tables follow the changes of the grammar
+    p | c
+    assert p._candidates("d") == (c,)
+    assert p("c") == "c"
+
+
+def test_dispatch_unknown_parser():
+    class Digit(Parser):
+        def process(self, pos, data, ctx):
+            if data[pos] is not None and data[pos].isdigit():
+                return pos + 1, data[pos]
+            raise Exception()
+
+    d = Digit()
+    p = Char("a") | d
+    assert p._candidates("1") == (d,)
+    assert p("1") == "1"
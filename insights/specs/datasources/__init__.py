@@ -10,6 +10,8 @@ template to ensure it is loaded.
 """
 
 import os
+import re
+import signal
 import time
 
 DEFAULT_SHELL_TIMEOUT = 10
@@ -54,6 +56,92 @@ def get_running_commands(ps, ctx, commands):
     return sorted(ret)
 
 
+def _query_owners(ctx, file_paths):
+    """
+    Query the RPM packages owning the files with a single ``rpm -qf`` command
+
+    The output is mapped to the files only when ``rpm`` succeeds.  When it
+    fails only because of files not owned by any package, the other files are
+    queried again together.
+
+    Returns:
+        list: The package of each of the ``file_paths`` or None, or None when
+        the output can't be mapped to them: the owners of a file owned by
+        several packages are listed one after the other, and the errors are
+        mixed with the packages.
+    """
+    rc, output = ctx.shell_out(
+        "/usr/bin/rpm -qf {0}".format(" ".join(file_paths)),
+        timeout=DEFAULT_SHELL_TIMEOUT,
+        keep_rc=True,
+        signum=signal.SIGTERM,
+    )
+    if rc == 0:
+        return output if len(output) == len(file_paths) else None
+
+    not_owned = set()
+    for line in output:
+        if line.startswith(("error:", "warning:")):
+            return None
+        match = re.match(r"file (.+) is not owned by any package$", line)
+        if match:
+            not_owned.add(match.group(1))
+    owned = [path for path in file_paths if path not in not_owned]
+    if not not_owned or len(owned) + len(not_owned) != len(file_paths):
+        return None
+    owners = _query_owners(ctx, owned) if owned else []
+    if owners is None:
+        return None
+    owners = iter(owners)
+    return [None if path in not_owned else next(owners) for path in file_paths]
+
+
+def get_packages(ctx, file_paths):
+    """
+    Get the RPM packages that own the specified filenames with path
+
+    The symbolic links are resolved in-process and the files are queried with
+    a single ``rpm -qf`` command, and once more without the files not owned by
+    any package when there are some.  They're queried one by one only when
+    the output can't be mapped to them.
+
+    Arguments:
+        ctx: The current execution context
+        file_paths(list): The full paths and filenames for RPM query
+
+    Returns:
+        dict: The name of the RPM package that provides each ``file`` of the
+        ``file_paths``.  The files not associated with an RPM are left out.
+    """
+    resolved = dict()
+    for file_path in file_paths:
+        real_path = os.path.realpath(file_path)
+        if os.path.exists(real_path):
+            resolved[file_path] = real_path
+    real_paths = sorted(set(resolved.values()))
+    if not real_paths:
+        return {}
+
+    owners = _query_owners(ctx, real_paths)
+    if owners is None:
+        owners = []
+        for real_path in real_paths:
+            rc, pkg = ctx.shell_out(
+                "/usr/bin/rpm -qf {0}".format(real_path),
+                timeout=DEFAULT_SHELL_TIMEOUT,
+                keep_rc=True,
+                signum=signal.SIGTERM,
+            )
+            owners.append(pkg[0] if rc == 0 and pkg else None)
+    owners = dict(zip(real_paths, owners))
+
+    return {
+        file_path: owners[real_path]
+        for file_path, real_path in resolved.items()
+        if owners[real_path] is not None
+    }
+
+
 def get_recent_files(target_path, last_modify_hours=24, latest_count=0):
     """
     Get the recent updated or created files, limited to lastest_count files
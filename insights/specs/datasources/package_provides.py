@@ -3,7 +3,6 @@ Custom datasource for package_provides
 """
 
 import logging
-import signal
 
 from insights.combiners.ps import Ps
 from insights.core.context import HostContext
@@ -13,7 +12,7 @@ from insights.core.plugins import datasource
 from insights.core.spec_factory import DatasourceProvider
 from insights.specs import Specs
 
-from . import get_running_commands, DEFAULT_SHELL_TIMEOUT
+from . import get_packages, get_running_commands
 
 logger = logging.getLogger(__name__)
 
@@ -30,18 +29,7 @@ def get_package(ctx, file_path):
         str: The name of the RPM package that provides the ``file``
         or None if file is not associated with an RPM.
     """
-    rc, resolved = ctx.shell_out(
-        "/usr/bin/readlink -e {0}".format(file_path), timeout=DEFAULT_SHELL_TIMEOUT, keep_rc=True
-    )
-    if rc == 0 and resolved:
-        rc, pkg = ctx.shell_out(
-            "/usr/bin/rpm -qf {0}".format(resolved[0]),
-            timeout=DEFAULT_SHELL_TIMEOUT,
-            keep_rc=True,
-            signum=signal.SIGTERM,
-        )
-        if rc == 0 and pkg:
-            return pkg[0]
+    return get_packages(ctx, [file_path]).get(file_path)
 
 
 @datasource(Ps, HostContext)
@@ -69,11 +57,9 @@ def cmd_and_pkg(broker):
     """ list: List of commands to search for, added as filters for the spec """
 
     if commands:
-        pkg_cmd = list()
-        for cmd in get_running_commands(broker[Ps], broker[HostContext], list(commands)):
-            pkg = get_package(broker[HostContext], cmd)
-            if pkg is not None:
-                pkg_cmd.append("{0} {1}".format(cmd, pkg))
+        cmds = get_running_commands(broker[Ps], broker[HostContext], list(commands))
+        pkgs = get_packages(broker[HostContext], cmds)
+        pkg_cmd = ["{0} {1}".format(cmd, pkgs[cmd]) for cmd in cmds if cmd in pkgs]
         if pkg_cmd:
             return DatasourceProvider(
                 '\n'.join(pkg_cmd),
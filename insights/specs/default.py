@@ -94,6 +94,9 @@ from insights.specs.datasources.sap import sap_hana_sid, sap_hana_sid_SID_nr
 
 logger = logging.getLogger(__name__)
 
+FOREACH_WORKERS = 8
+""" int: Number of commands run at once by the specs run for every interface or device """
+
 
 class DefaultSpecs(Specs):
     # Dependent specs that aren't in the registry
@@ -302,14 +305,16 @@ class DefaultSpecs(Specs):
     )
     etc_udev_oracle_asm_rules = glob_file(r"/etc/udev/rules.d/*asm*.rules")
     etcd_conf = simple_file("/etc/etcd/etcd.conf")
-    ethtool = foreach_execute(ethernet.interfaces, "/sbin/ethtool %s")
-    ethtool_S = foreach_execute(ethernet.interfaces, "/sbin/ethtool -S %s")
-    ethtool_T = foreach_execute(ethernet.interfaces, "/sbin/ethtool -T %s")
-    ethtool_c = foreach_execute(ethernet.interfaces, "/sbin/ethtool -c %s")
-    ethtool_g = foreach_execute(ethernet.interfaces, "/sbin/ethtool -g %s")
-    ethtool_i = foreach_execute(ethernet.interfaces, "/sbin/ethtool -i %s")
-    ethtool_k = foreach_execute(ethernet.interfaces, "/sbin/ethtool -k %s")
-    ethtool_priv_flags = foreach_execute(ethernet.interfaces, "/sbin/ethtool --show-priv-flags %s")
+    ethtool = foreach_execute(ethernet.interfaces, "/sbin/ethtool %s", workers=FOREACH_WORKERS)
+    ethtool_S = foreach_execute(ethernet.interfaces, "/sbin/ethtool -S %s", workers=FOREACH_WORKERS)
+    ethtool_T = foreach_execute(ethernet.interfaces, "/sbin/ethtool -T %s", workers=FOREACH_WORKERS)
+    ethtool_c = foreach_execute(ethernet.interfaces, "/sbin/ethtool -c %s", workers=FOREACH_WORKERS)
+    ethtool_g = foreach_execute(ethernet.interfaces, "/sbin/ethtool -g %s", workers=FOREACH_WORKERS)
+    ethtool_i = foreach_execute(ethernet.interfaces, "/sbin/ethtool -i %s", workers=FOREACH_WORKERS)
+    ethtool_k = foreach_execute(ethernet.interfaces, "/sbin/ethtool -k %s", workers=FOREACH_WORKERS)
+    ethtool_priv_flags = foreach_execute(
+        ethernet.interfaces, "/sbin/ethtool --show-priv-flags %s", workers=FOREACH_WORKERS
+    )
     falconctl_aid = simple_command("/opt/CrowdStrike/falconctl -g --aid")
     falconctl_backend = simple_command("/opt/CrowdStrike/falconctl -g --backend")
     falconctl_rfm = simple_command("/opt/CrowdStrike/falconctl -g --rfm-state")
@@ -736,7 +741,11 @@ class DefaultSpecs(Specs):
     rndc_status = simple_command("/usr/sbin/rndc status")
     ros_config = simple_file("/var/lib/pcp/config/pmlogger/config.ros")
     rpm_V_package = foreach_execute(
-        rpm.rpm_v_pkg_list, "/bin/rpm -V %s", keep_rc=True, signum=signal.SIGTERM
+        rpm.rpm_v_pkg_list,
+        "/bin/rpm -V %s",
+        keep_rc=True,
+        signum=signal.SIGTERM,
+        workers=FOREACH_WORKERS,
     )
     rpm_ostree_status = simple_command("/usr/bin/rpm-ostree status --json", signum=signal.SIGTERM)
     rpm_pkgs = rpm.pkgs_with_writable_dirs
@@ -839,7 +848,9 @@ class DefaultSpecs(Specs):
     sendmail_mc = simple_file("/etc/mail/sendmail.mc")
     sestatus = simple_command("/usr/sbin/sestatus -b")
     setup_named_chroot = simple_file("/usr/libexec/setup-named-chroot.sh")
-    smartctl_health = foreach_execute(dev.physical_devices, "/usr/sbin/smartctl -H %s -j")
+    smartctl_health = foreach_execute(
+        dev.physical_devices, "/usr/sbin/smartctl -H %s -j", workers=FOREACH_WORKERS
+    )
     smbstatus_p = simple_command("/usr/bin/smbstatus -p")
     snmpd_conf = simple_file("/etc/snmp/snmpd.conf")
     sockstat = simple_file("/proc/net/sockstat")
@@ -989,7 +1000,9 @@ class DefaultSpecs(Specs):
     x86_ibrs_enabled = simple_file("sys/kernel/debug/x86/ibrs_enabled")
     x86_pti_enabled = simple_file("sys/kernel/debug/x86/pti_enabled")
     x86_retp_enabled = simple_file("sys/kernel/debug/x86/retp_enabled")
-    xfs_info = foreach_execute(mount_ds.xfs_mounts, "/usr/sbin/xfs_info %s")  # INSPEC-409
+    xfs_info = foreach_execute(
+        mount_ds.xfs_mounts, "/usr/sbin/xfs_info %s", workers=FOREACH_WORKERS
+    )  # INSPEC-409
     xfs_quota_state = simple_command("/sbin/xfs_quota -x -c 'state -gu'")
     xinetd_conf = glob_file(["/etc/xinetd.conf", "/etc/xinetd.d/*"])
     yum_conf = simple_file("/etc/yum.conf")
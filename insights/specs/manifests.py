@@ -49,6 +49,17 @@ client:
     args:
       max_workers: null
 
+  # Save the metadata of all the components in the single "meta_data.idx"
+  # file instead of one file per component in the "meta_data" directory.
+  # meta_data_index: true
+
+  # The compressor and its level of the archive created with "compress".
+  # The compressor can be gz, xz, bz2, zst (with the zstandard module) or
+  # none, the compressor of insights-client overrides it.
+  # compression:
+  #   compressor: gz
+  #   level: 6
+
 plugins:
   # disable everything by default
   # defaults to false if not specified.
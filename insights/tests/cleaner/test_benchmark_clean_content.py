@@ -0,0 +1,94 @@
+"""
+Benchmark of the `Cleaner.clean_content` on a large sosreport-style log,
+against the per-parser path it replaced, which listed the parsers again on
+each call and scanned a line once per pattern and per keyword.
+
+It's skipped by default, run it with `pytest --runslow -s`.
+"""
+
+import re
+import time
+
+import pytest
+
+from insights.client.config import InsightsConfig
+from insights.cleaner import Cleaner
+
+LINES = 200000
+TEMPLATES = [
+    "Jan  1 00:00:{0:02d} test1 systemd[1]: Started Session {1} of user root.\n",
+    "Jan  1 00:00:{0:02d} test1 kernel: eth0: link up, 1000Mbps, full-duplex, lpa 0x{1:04X}\n",
+    "Jan  1 00:00:{0:02d} test1 sshd[{1}]: Accepted publickey for root from 192.168.{2}.{3} port 22\n",
+    "Jan  1 00:00:{0:02d} test1 NetworkManager[{1}]: <info> dhcp6: address fe80::{1:x}\n",
+    "Jan  1 00:00:{0:02d} test1 kernel: IPv6: ADDRCONF(NETDEV_UP): eth0: 52:54:00:12:{2:02x}:{3:02x}\n",
+    "Jan  1 00:00:{0:02d} test1.example.com app[{1}]: login password=secret{1} user=admin\n",
+]
+
+
+def _log_lines():
+    for i in range(LINES):
+        yield TEMPLATES[i % len(TEMPLATES)].format(i % 60, i, i // 250 % 250, i % 250 + 1)
+
+
+class _NoCache(dict):
+    # the pipeline is built again on each call
+    def get(self, key, default=None):
+        return default
+
+    def setdefault(self, key, default=None):
+        return default
+
+
+def _per_parser(pp):
+    """
+    Turns the cleaner into the per-parser path: no cached pipeline, one scan
+    of a line per pattern, and no keyword prefilter.
+    """
+    pp._pipelines = _NoCache()
+    pattern = pp.redact['pattern']
+    pattern._searchers = [re.compile(re.escape(pat)).search for pat in pattern._exclude]
+    pp.obfuscate['keyword']._kw_search = lambda line: True
+    return pp
+
+
+def _time(func, *args):
+    start = time.time()
+    ret = func(*args)
+    return ret, time.time() - start
+
+
+def test_benchmark_clean_content(request):
+    if not request.config.getoption("--runslow"):
+        pytest.skip("benchmark, run with --runslow")
+
+    hostname = 'test1.example.com'
+    conf = InsightsConfig(obfuscation_list=['ipv4', 'ipv6', 'hostname', 'mac'], hostname=hostname)
+    rm_conf = {'patterns': ['secret9999', 'token='], 'keywords': ['admin', 'root']}
+    lines = list(_log_lines())
+
+    def _per_line(pp):
+        # e.g. the facts, which are cleaned one string at a time
+        return [pp.clean_content(line) for line in lines]
+
+    elapsed = {}
+    results = {}
+    for path, make in (
+        ("pipeline", lambda: Cleaner(conf, rm_conf, hostname)),
+        ("per-parser", lambda: _per_parser(Cleaner(conf, rm_conf, hostname))),
+    ):
+        results[path], elapsed[path] = _time(make().clean_content, lines)
+        ret, elapsed[path, "line"] = _time(_per_line, make())
+        assert [l for l in ret if l is not None] == results[path]
+
+    assert len(results["pipeline"]) == LINES - 1
+    assert results["pipeline"] == results["per-parser"]
+    print(
+        "\nclean_content: {0} lines in {1:.2f}s, per-parser {2:.2f}s;"
+        " one call per line {3:.2f}s, per-parser {4:.2f}s".format(
+            LINES,
+            elapsed["pipeline"],
+            elapsed["per-parser"],
+            elapsed["pipeline", "line"],
+            elapsed["per-parser", "line"],
+        )
+    )
@@ -0,0 +1,45 @@
+"""
+Benchmark of the IPv4 obfuscation.
+
+It replays a log of 500k lines with 50k unique IPv4 addresses.  It's skipped
+by default, run it with `pytest --runslow -s`.
+"""
+
+import time
+
+import pytest
+
+from insights.client.config import InsightsConfig
+from insights.cleaner import Cleaner
+
+LINES = 500000
+UNIQUE_IPS = 50000
+
+
+def _log_lines():
+    for i in range(LINES):
+        ip_n = i % UNIQUE_IPS
+        yield "Jan  1 00:00:00 lb01 haproxy[1234]: 172.{0}.{1}.{2}:443 [accepted] backend/web{3}\n".format(
+            16 + ip_n // 65025, (ip_n // 255) % 255, ip_n % 255 + 1, i % 10
+        )
+
+
+def test_benchmark_ipv4_obfuscation(request):
+    if not request.config.getoption("--runslow"):
+        pytest.skip("benchmark, run with --runslow")
+
+    c = InsightsConfig(obfuscation_list=['ipv4'])
+    pp = Cleaner(c, {})
+    lines = list(_log_lines())
+
+    start = time.time()
+    ret = pp.clean_content(lines)
+    elapsed = time.time() - start
+
+    assert len(ret) == LINES
+    assert len(pp.obfuscate['ipv4'].mapping()) == UNIQUE_IPS
+    print(
+        "\nIPv4 obfuscation: {0} lines, {1} unique IPs in {2:.2f}s".format(
+            LINES, UNIQUE_IPS, elapsed
+        )
+    )
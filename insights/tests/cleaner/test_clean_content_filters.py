@@ -1,6 +1,8 @@
 from pytest import mark
 
 from insights.cleaner import Cleaner
+from insights.cleaner import filters
+from insights.cleaner.filters import AllowFilter, get_matcher
 from insights.client.config import InsightsConfig
 
 test_data = 'testabc\nabcd\n \n\n1234\npwd: p4ssw0rd\ntest123\npwd:abc\n'.splitlines()
@@ -42,3 +44,39 @@ def test_clean_content_filters_allowlist_not(obfuscate):
     ret = pp.clean_content(test_data, allowlist=None)
     # content IS NOT changed
     assert test_data == ret
+
+
+@mark.parametrize("obfuscate", [True, False])
+def test_clean_content_filters_allowlist_multiple_keys_in_line(obfuscate):
+    conf = InsightsConfig(obfuscate=obfuscate)
+
+    pp = Cleaner(conf, None)
+    # "pwd:abc" counts for both "pwd" and "abc"
+    ret = pp.clean_content(test_data, allowlist={'abc': 2, 'pwd': 1})
+    assert ret == ['abcd', '', 'pwd:abc']
+    ret = pp.clean_content(test_data, allowlist={'abc': 3, 'pwd': 2, 'bc': 1})
+    assert ret == ['testabc', 'abcd', '', 'pwd: p4ssw0rd', 'pwd:abc']
+
+
+def test_filter_content():
+    allowlist = {'test': 2, 'pwd': 1, 'abc': 2, '12': 10}
+    ret = AllowFilter.filter_content(test_data, allowlist)
+    assert ret == ['testabc', 'abcd', '1234', 'test123', 'pwd:abc']
+    # the allowlist is not changed
+    assert allowlist == {'test': 2, 'pwd': 1, 'abc': 2, '12': 10}
+    assert AllowFilter.filter_content(test_data, {}) == []
+    assert AllowFilter.filter_content(test_data, {'xyz': 1}) == []
+    # the matcher is cached per keys
+    assert get_matcher(['a', 'b']) is get_matcher(set(['b', 'a']))
+
+
+def test_clean_content_filters_one_matcher():
+    filters._MATCHERS.clear()
+    allowlist = dict(('key%03d' % i, 1) for i in range(100))
+    lines = ['%s line %d' % (k, i) for i in range(2) for k in sorted(allowlist)]
+    pp = Cleaner(InsightsConfig(), None)
+    ret = pp.clean_content(lines, allowlist=allowlist)
+    # the last line of each key is kept
+    assert ret == lines[100:]
+    # the matcher is compiled once, not once per the keys left
+    assert len(filters._MATCHERS) == 1
@@ -10,7 +10,7 @@ from insights.cleaner import Cleaner
     [
         ("test_no_ip", "test_no_ip"),
         ("test 127.0.0.1", "test 127.0.0.1"),
-        ("radius_ip_1=10.0.0.1", "radius_ip_1=10.230.230.1"),
+        ("radius_ip_1=10.0.0.1", "radius_ip_1=40.5.5.4"),
         (
             (
                 "        inet 10.0.2.15"
@@ -19,24 +19,24 @@ from insights.cleaner import Cleaner
                 " dup 10.0.2.15"
             ),
             (
-                "        inet 10.230.230.3"
-                "  netmask 10.230.230.1"
-                "  broadcast 10.230.230.2"
-                " dup 10.230.230.3"
+                "        inet 40.5.6.78"
+                "  netmask 191.191.191.5"
+                "  broadcast 40.5.6.191"
+                " dup 40.5.6.78"
             ),
         ),
         (
             ["inet 10.0.2.15", "  netmask 255.255.255.0", " broadcast 10.0.2.255", "dup 10.0.2.15"],
             [
-                "inet 10.230.230.1",
-                "  netmask 10.230.230.3",
-                " broadcast 10.230.230.2",
-                "dup 10.230.230.1",
+                "inet 40.5.6.78",
+                "  netmask 191.191.191.5",
+                " broadcast 40.5.6.191",
+                "dup 40.5.6.78",
             ],
         ),
         (
             "radius_ip_1=10.0.0.100-10.0.0.200",
-            "radius_ip_1=10.230.230.1-10.230.230.2",
+            "radius_ip_1=40.5.5.255-40.5.5.179",
         ),
     ],
 )
@@ -59,7 +59,7 @@ def test_obfuscate_ipv4_match(obfuscate, obfuscation_list, line, expected):
     [
         (
             ("        inet 10.0.2.155" "  netmask 10.0.2.1" "  broadcast 10.0.2.15"),
-            ("        inet 10.230.230.1" "  netmask 10.230.230.3" "  broadcast 10.230.230.2"),
+            ("        inet 40.5.6.221" "  netmask 40.5.6.4" "  broadcast 40.5.6.78"),
         ),
     ],
 )
@@ -84,23 +84,23 @@ def test_obfuscate_ipv4_match_IP_overlap(obfuscate, obfuscation_list, line, expe
         ("test 127.0.0.1", "test 127.0.0.1"),
         (
             "tcp6       0      0 100.100.100.101:23    10.231.200.1:63564 ESTABLISHED 0",
-            "tcp6       0      0 10.230.230.1:23       10.230.230.2:63564 ESTABLISHED 0",
+            "tcp6       0      0 255.255.255.251:23    40.113.179.4:63564 ESTABLISHED 0",
         ),
         (
             "tcp6       0      0 10.0.0.1:23           10.0.0.110:63564   ESTABLISHED 0",
-            "tcp6       0      0 10.230.230.2:23       10.230.230.1:63564 ESTABLISHED 0",
+            "tcp6       0      0 40.5.5.4:23           40.5.5.236:63564   ESTABLISHED 0",
         ),
         (
             "tcp6  10.0.0.11    0 10.0.0.1:23       10.0.0.111:63564    ESTABLISHED 0",
-            "tcp6  10.230.230.2 0 10.230.230.3:23   10.230.230.1:63564  ESTABLISHED 0",
+            "tcp6  40.5.5.89    0 40.5.5.4:23       40.5.5.197:63564    ESTABLISHED 0",
         ),
         (
             "unix  2      [ ACC ]     STREAM     LISTENING     43279    2070/snmpd         172.31.0.1\n",
-            "unix  2      [ ACC ]     STREAM     LISTENING     43279    2070/snmpd         10.230.230.1\n",
+            "unix  2      [ ACC ]     STREAM     LISTENING     43279    2070/snmpd         226.38.5.4\n",
         ),
         (
             "unix  2      [ ACC ]     STREAM     LISTENING     43279    2070/snmpd         172.31.111.11\n",
-            "unix  2      [ ACC ]     STREAM     LISTENING     43279    2070/snmpd         10.230.230.1 \n",
+            "unix  2      [ ACC ]     STREAM     LISTENING     43279    2070/snmpd         226.38.197.89\n",
         ),
     ],
 )
@@ -167,3 +167,37 @@ def test_obfuscate_ipv4_false_positive(_ip2db, obfuscate, obfuscation_list, orig
     # "no_obfuscate=['ipv4']
     actual = pp.clean_content(original, no_obfuscate=['ipv4'])
     assert actual == original
+
+
+def test_obfuscate_ipv4_db_index():
+    c = InsightsConfig(obfuscation_list=['ipv4'])
+    pp = Cleaner(c, {})
+    ipv4 = pp.obfuscate['ipv4']
+    lines = ["src=10.0.{0}.{1} dst=10.0.0.1".format(i // 250, i % 250 + 1) for i in range(1000)]
+    ret = pp.clean_content(lines)
+    assert len(ret) == 1000
+    assert ret[999] == "src=40.5.1.247 dst=40.5.5.4"
+    assert ret[1] == "src=40.5.5.6 dst=40.5.5.4"
+    assert ret[0] == "src=40.5.5.4 dst=40.5.5.4"
+    # both directions are in sync
+    assert len(ipv4._ip_db) == len(ipv4._ip_idx) == 1000
+    for obf, ori in ipv4._ip_db.items():
+        assert ipv4._ip_idx[ori] == obf
+    # existing entries are reused
+    assert pp.clean_content("dst=10.0.3.250") == "dst=40.5.1.247"
+    assert len(ipv4.mapping()) == 1000
+    assert ipv4.mapping()[0] == {'original': '10.0.3.6', 'obfuscated': '40.5.1.0'}
+
+
+def test_obfuscate_ipv4_any_order():
+    c = InsightsConfig(obfuscation_list=['ipv4'])
+    lines = [
+        "src=10.0.{0}.{1} dst=192.168.{1}.{0}".format(i // 250, i % 250 + 1) for i in range(1000)
+    ]
+    pp = Cleaner(c, {})
+    ret = pp.clean_content(lines)
+    pp_reversed = Cleaner(c, {})
+    assert pp_reversed.clean_content(lines[::-1]) == ret[::-1]
+    assert pp.obfuscate['ipv4'].mapping() == pp_reversed.obfuscate['ipv4'].mapping()
+    # the addresses keep their length
+    assert [len(l) for l in ret] == [len(l) for l in lines]
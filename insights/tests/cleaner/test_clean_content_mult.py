@@ -9,7 +9,7 @@ def test_obfuscate_hostname_and_ip():
     pp = Cleaner(c, {}, hostname)
     result = pp.clean_content(line)
     assert 'example.com' in result
-    assert '10.230.230' in result
+    assert '40.5.5.4' in result
     for item in line.split():
         assert item not in result
 
@@ -27,3 +27,70 @@ def test_clean_content_keyword_with_hostname_and_ip():
     assert 'day' not in result
     assert 'keyword0' in result
     assert 'keyword1' in result
+
+
+def test_clean_content_parallel():
+    from concurrent.futures import ThreadPoolExecutor
+
+    hostname = 'test1.abc.com'
+    conf = InsightsConfig(obfuscation_list=['ipv4', 'ipv6', 'hostname', 'mac'], hostname=hostname)
+    lines = [
+        "host{0}.abc.com 10.0.{1}.{2} fe80::{0:x} 52:54:00:00:{1:02x}:{2:02x} name{3}".format(
+            i, i // 200, i % 200 + 1, i % 7
+        )
+        for i in range(2000)
+    ]
+    chunks = [lines[i::16] for i in range(16)]
+
+    def _clean(pp):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            return [r for ret in pool.map(pp.clean_content, chunks) for r in ret]
+
+    pp = Cleaner(conf, {'keywords': ['name1', 'name3']}, hostname)
+    result = _clean(pp)
+    assert len(result) == 2000
+    # one original gets exactly one obfuscated value
+    ipv4 = pp.obfuscate['ipv4']
+    assert len(ipv4._ip_db) == len(ipv4._ip_idx) == 2000
+    assert len(set(ipv4._ip_idx.values())) == 2000
+    for obf in ('ipv6', 'hostname', 'mac', 'keyword'):
+        ret = pp.obfuscate[obf].mapping()
+        assert len(ret) == len(set(m['original'] for m in ret))
+
+    # the hash based mappings do not depend on the processing order
+    pp_serial = Cleaner(conf, {'keywords': ['name1', 'name3']}, hostname)
+    pp_serial.clean_content(lines)
+    for obf in ('ipv4', 'ipv6', 'hostname', 'mac', 'keyword'):
+        assert pp.obfuscate[obf].mapping() == pp_serial.obfuscate[obf].mapping()
+    assert pp.obfuscate['hostname'].mapping()[0]['original'] == hostname
+
+
+def test_clean_content_pipeline_cached():
+    conf = InsightsConfig(obfuscation_list=['ipv4', 'mac'])
+    pp = Cleaner(conf, {'patterns': ['abc'], 'keywords': ['kw']})
+    redact, obfuscate = pp._get_pipeline()
+    assert [p for p, _ in redact] == [pp.redact['pattern']]
+    assert [p for p, _ in obfuscate] == [
+        pp.obfuscate['ipv4'],
+        pp.obfuscate['keyword'],
+        pp.obfuscate['mac'],
+        pp.obfuscate['password'],
+    ]
+    assert pp._get_pipeline() is pp._get_pipeline(None, False, False)
+    assert pp._get_pipeline(['mac', 'ipv4']) is pp._get_pipeline(['ipv4', 'mac'])
+    redact, obfuscate = pp._get_pipeline(['ipv4'], True, True)
+    assert redact == ()
+    assert [p for p, _ in obfuscate] == [
+        pp.obfuscate['keyword'],
+        pp.obfuscate['mac'],
+        pp.obfuscate['password'],
+    ]
+    assert all(kw == {'width': True} for _, kw in obfuscate)
+    assert len(pp._pipelines) == 3
+
+    ret = pp.clean_content(
+        ['abc 10.0.0.1', 'kw 10.0.0.1', 'password=abc', 'xyz'],
+        no_obfuscate=['mac'],
+        allowlist={'kw': 1, 'abc': 2},
+    )
+    assert ret == ['keyword0 40.5.5.4']
@@ -130,3 +130,32 @@ def test_clean_content_patterns_posix_regex(line, expected):
     pp = Cleaner(c, {'patterns': {'regex': ['myserver', r'my(\w*)key', 'test[[:digit:]]']}})
     actual = pp.clean_content(line)
     assert actual == expected
+
+
+def test_clean_content_patterns_merged():
+    conf = InsightsConfig()
+    rm_conf = {'patterns': {'regex': ['12.*4', '^abcd', r'(p)wd: \w+\1', '(?i)TEST']}}
+    pp = Cleaner(conf, rm_conf)
+    # groups and global flags cannot be merged, the patterns are kept separately
+    assert len(pp.redact['pattern']._searchers) == 3
+    ret = pp.clean_content(['test', 'abcd', 'pwd: xp', 'pwd: xyz', '1234', 'Ok'], [])
+    assert ret == ['pwd: xyz', 'Ok']
+
+    rm_conf = {'patterns': {'regex': ['(?i)test', 'abcd', 'xy(?i:Z)']}}
+    pp = Cleaner(conf, rm_conf)
+    # the global flag of the first pattern doesn't apply to the others
+    assert len(pp.redact['pattern']._searchers) == 2
+    ret = pp.clean_content(['TEST', 'abcd', 'ABCD', 'xyz', 'XYZ', 'xyZ'], [])
+    assert ret == ['ABCD', 'XYZ']
+
+    rm_conf = {'patterns': {'regex': ['12.*4', '^abcd', 'TeSt']}}
+    pp = Cleaner(conf, rm_conf)
+    assert len(pp.redact['pattern']._searchers) == 1
+    ret = pp.clean_content(['test', 'abcd', 'xabcd', '1234', 'TeSt'], [])
+    assert ret == ['test', 'xabcd']
+
+    rm_conf = {'patterns': ['1.3', 'a|b']}
+    pp = Cleaner(conf, rm_conf)
+    assert len(pp.redact['pattern']._searchers) == 1
+    ret = pp.clean_content(['123', '1.3', 'a', 'a|b'], [])
+    assert ret == ['123', 'a']
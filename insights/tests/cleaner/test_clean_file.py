@@ -15,7 +15,7 @@ def test_clean_file_obfuscate():
 
     # netstat_-neopa
     line = "tcp6       0      0 10.0.0.1:23           10.0.0.110:63564   ESTABLISHED 0"
-    ret = "tcp6       0      0 10.230.230.2:23       10.230.230.1:63564 ESTABLISHED 0"
+    ret = "tcp6       0      0 40.5.5.4:23           40.5.5.236:63564   ESTABLISHED 0"
 
     test_dir = os.path.join(arch.archive_dir, 'data', 'etc')
     os.makedirs(test_dir)
@@ -81,7 +81,7 @@ def test_rhsm_facts(test_umask, obfuscate, obfuscate_hostname, obfuscation_list,
         ips = json.loads(facts['insights_client.obfuscated_ipv4'])
         if obfuscate or obfuscation_list and 'ipv4' in obfuscation_list:
             assert ips[0]['original'] == '10.0.2.155'
-            assert ips[0]['obfuscated'] == '10.230.230.1'
+            assert ips[0]['obfuscated'] == '40.5.6.221'
         else:
             assert ips == []
         # ipv6
@@ -171,7 +171,7 @@ def test_all_csv_reports(rhsm_facts, obfuscate, obfuscate_hostname, obfuscation_
             # ip
             assert len(ips) > 1
             assert ips[0] == ['Obfuscated IPv4', 'Original IPv4']
-            assert ips[1] == ['10.230.230.1', '10.0.2.155']
+            assert ips[1] == ['40.5.6.221', '10.0.2.155']
         os.unlink(ip_report_file)
     else:
         assert not os.path.isfile(ip_report_file)
@@ -77,8 +77,9 @@ def test_canonical_facts_request_cleaned(get_proxies, post, get_canonical_facts,
 
     expected_url = connection.inventory_url + "/hosts/checkin"
     expected_headers = {"Content-Type": "application/json"}
+    # the facts are cleaned in place
     expected_data = get_canonical_facts.return_value
-    expected_data = connection._clean_facts(expected_data)
+    assert expected_data['ip'] == '40.5.5.4'
     post.assert_called_once_with(
         expected_url, headers=expected_headers, data=dumps(expected_data), log_response_text=False
     )
@@ -82,3 +82,22 @@ def test_load(log, reset_filters, sample_file, spec, filters, expected_first_lin
     assert broker[spec].content[0] == expected_first_line
     assert len(broker[spec].content) == expected_lines
     log.debug.assert_called_with("Extra-huge file is truncated %s", SAMPLE_FILE)
+
+
+@patch('insights.core.spec_factory.AllowFilter.filter_content')
+def test_load_filtered_streaming(filter_content, reset_filters, sample_file):
+    root, relpath = sample_file
+    add_filter(Stuff.large_file_wf, filter_kw, 3)
+    add_filter(Stuff.large_file_wf, "- 0Some")
+
+    _, broker = initialize_broker(root, broker=dr.Broker())
+    broker = dr.run(dr.get_dependency_graph(dostuff), broker=broker)
+
+    assert broker[Stuff.large_file_wf].content == [
+        "- 0Some test data",
+        "- 979Some test data",
+        "- 989Some test data",
+        "- 999Some test data",
+    ]
+    # the file is filtered without loading all the lines
+    assert not filter_content.called
@@ -0,0 +1,61 @@
+"""
+Benchmark of the hydration of a serialized archive with the metadata of every
+spec persisted by the default manifest, saved in the ``meta_data`` directory
+and in the single ``meta_data.idx`` file, and of only the specs required by
+one parser.
+
+It's skipped by default, run it with `pytest --runslow -s`.
+"""
+
+import time
+
+import pytest
+
+from insights.core import dr
+from insights.core.serde import Hydration
+from insights.core.spec_factory import DatasourceProvider
+from insights.parsers.hostname import Hostname
+from insights.specs import Specs
+
+
+def dehydrate(root, meta_index):
+    h = Hydration(root, meta_index=meta_index)
+    broker = dr.Broker()
+    specs = [getattr(Specs, k) for k in dir(Specs)]
+    specs = [s for s in specs if dr.is_registry_point(s)]
+    for spec in specs:
+        name = dr.get_simple_name(spec)
+        content = DatasourceProvider("content of " + name, "/" + name)
+        broker[spec] = [content] if spec.multi_output else content
+        broker.exec_times[spec] = 0.0
+        h.dehydrate(spec, broker)
+    h.close()
+    return len(specs)
+
+
+def test_benchmark_hydration(request, tmpdir):
+    if not request.config.getoption("--runslow"):
+        pytest.skip("benchmark, run with --runslow")
+
+    elapsed = {}
+    for meta_index in (False, True):
+        root = str(tmpdir.mkdir(str(meta_index)))
+        count = dehydrate(root, meta_index)
+        for components in (None, Hostname):
+            best = None
+            for _ in range(5):
+                start = time.time()
+                broker = Hydration(root).hydrate(components=components)
+                duration = time.time() - start
+                best = duration if best is None else min(best, duration)
+            assert len(list(broker)) == (count if components is None else 1)
+            elapsed[meta_index, components] = best
+
+    print(
+        "\nhydrate %d specs: meta_data %.4fs meta_data.idx %.4fs"
+        % (count, elapsed[False, None], elapsed[True, None])
+    )
+    print(
+        "hydrate for one parser: meta_data %.4fs meta_data.idx %.4fs"
+        % (elapsed[False, Hostname], elapsed[True, Hostname])
+    )
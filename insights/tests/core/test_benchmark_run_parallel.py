@@ -0,0 +1,68 @@
+"""
+Benchmark of the parallel execution of all the default components against an
+insights-archive, with a thread pool and with a process pool, which executes
+only the datasources.
+
+It's skipped by default, run it with `pytest --runslow -s`.  The archive can
+be specified with the `INSIGHTS_BENCHMARK_ARCHIVE` environment variable.
+"""
+
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import pytest
+
+from unittest.mock import patch
+
+from insights import _run, dr, load_default_plugins
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ARCHIVE = os.path.join(
+    HERE, "..", "..", "..", "examples", "cluster_rules", "cluster_hosts.tar.gz"
+)
+
+
+@contextmanager
+def _process_pool(parallel, prefix, kwargs):
+    with ProcessPoolExecutor(**kwargs) as pool:
+        yield pool
+
+
+def test_benchmark_run_parallel(request, tmpdir):
+    if not request.config.getoption("--runslow"):
+        pytest.skip("benchmark, run with --runslow")
+
+    archive = os.environ.get("INSIGHTS_BENCHMARK_ARCHIVE")
+    if not archive:
+        import tarfile
+
+        with tarfile.open(DEFAULT_ARCHIVE) as tf:
+            tf.extractall(str(tmpdir))
+        archive = str(tmpdir.join("host_01.tar.gz"))
+
+    load_default_plugins()
+    graph = dr.COMPONENTS[dr.GROUPS.single]
+
+    elapsed = {}
+    results = {}
+    for mode in ("serial", "threads", "processes"):
+        pool = patch("insights.get_pool", _process_pool) if mode == "processes" else None
+        start = time.time()
+        if pool:
+            with pool:
+                broker = _run(dr.Broker(), graph, archive, parallel=True)
+        else:
+            broker = _run(dr.Broker(), graph, archive, parallel=mode != "serial")
+        elapsed[mode] = time.time() - start
+        broker = broker[0] if isinstance(broker, list) else broker
+        results[mode] = set(broker.instances)
+
+    assert results["threads"] == results["serial"] == results["processes"]
+    print(
+        "\n{0}: serial {1:.2f}s, thread pool {2:.2f}s, process pool {3:.2f}s".format(
+            os.path.basename(archive), elapsed["serial"], elapsed["threads"], elapsed["processes"]
+        )
+    )
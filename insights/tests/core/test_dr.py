@@ -86,3 +86,46 @@ def test_get_registry_points_multiple_specs():
     for spec in [Specs.ps_aux, Specs.ps_auxww, Specs.ps_auxcww, Specs.ps_ef,
                  Specs.ps_auxcww, Specs.ps_eo_cmd]:
         assert spec in specs
+
+
+def test_get_registry_points_cached():
+    specs = dr.get_registry_points(multiple_spec_condition)
+    specs.clear()
+    assert len(dr.get_registry_points(multiple_spec_condition)) == 2
+    assert (multiple_spec_condition, None) in dr._REGISTRY_POINTS
+
+    # registering a component invalidates the cache
+    @condition(RegistrySpecs.simple_spec)
+    def another_condition(spec):
+        return True
+
+    assert (multiple_spec_condition, None) not in dr._REGISTRY_POINTS
+    assert dr.get_registry_points(another_condition) == set([RegistrySpecs.simple_spec])
+
+
+def test_get_dependency_graph_cached():
+    graph = dr.get_dependency_graph(multiple_spec_condition)
+    assert graph[multiple_spec_condition] == set([RegistrySpecs.first_spec_with_dep, RegistrySpecs.second_spec_with_dep])
+    assert graph[first_spec_with_dep_imp] == set([dependency_ds])
+    assert graph[dependency_ds] == set()
+    graph[dependency_ds].add(simple_spec_imp)
+    graph.pop(multiple_spec_condition)
+    assert dr.get_dependency_graph(multiple_spec_condition) == dict(
+        (c, dr.get_dependencies(c)) for c in [
+            multiple_spec_condition,
+            RegistrySpecs.first_spec_with_dep,
+            RegistrySpecs.second_spec_with_dep,
+            first_spec_with_dep_imp,
+            second_spec_with_dep_imp,
+            dependency_ds,
+        ]
+    )
+
+
+def test_get_subgraphs():
+    graph = dr.get_dependency_graph(multiple_spec_condition)
+    graph.update(dr.get_dependency_graph(simple_spec_condition))
+    for _ in range(2):
+        subgraphs = list(dr.get_subgraphs(graph))
+        assert sorted(len(g) for g in subgraphs) == [3, 6]
+        assert set().union(*subgraphs) == set(graph)
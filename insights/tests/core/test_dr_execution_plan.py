@@ -0,0 +1,178 @@
+from insights import _single_graph
+from insights.core import dr
+
+
+class plan_stage(dr.ComponentType):
+    pass
+
+
+@plan_stage("plan_input")
+def plan_one(x):
+    return x + 1
+
+
+@plan_stage(plan_one)
+def plan_two(x):
+    return x * 2
+
+
+@plan_stage(plan_two, optional=["plan_optional"])
+def plan_three(x, opt):
+    return (x, opt)
+
+
+def teardown_function(*args):
+    dr.set_enabled(plan_two, True)
+
+
+def test_execution_plan():
+    plan = dr.ExecutionPlan(plan_three)
+    assert plan.order.index(plan_one) < plan.order.index(plan_two) < plan.order.index(plan_three)
+    # the non-components are ordered but never invoked
+    assert "plan_input" in plan.order
+    assert plan.runnable == frozenset([plan_one, plan_two, plan_three])
+
+    # reusable across brokers
+    for i in range(3):
+        broker = dr.Broker()
+        broker["plan_input"] = i
+        broker = dr.run(plan, broker)
+        assert broker[plan_three] == ((i + 1) * 2, None)
+        assert set(broker.exec_times) == set(plan.order)
+
+
+def test_execution_plan_observers():
+    seen = []
+    plan = dr.ExecutionPlan(plan_three)
+    broker = dr.Broker()
+    broker["plan_input"] = 1
+    broker.add_observer(lambda c, b: seen.append(c), plan_stage)
+    plan.run(broker)
+    assert seen == [plan_one, plan_two, plan_three]
+
+
+def test_execution_plan_enabled():
+    plan = dr.get_execution_plan(plan_three)
+    dr.set_enabled(plan_two, False)
+    broker = dr.Broker()
+    broker["plan_input"] = 1
+    broker = plan.run(broker)
+    assert plan_one in broker
+    assert plan_two not in broker
+    assert plan_three in broker.missing_requirements
+
+
+def test_get_execution_plan_cached():
+    plan = dr.get_execution_plan(plan_three)
+    assert dr.get_execution_plan(plan_three) is plan
+    graph = dr.get_dependency_graph(plan_three)
+    assert dr.get_execution_plan(graph) is dr.get_execution_plan(graph)
+    # cached per the identity of the graph
+    assert dr.get_execution_plan(graph) is not dr.get_execution_plan(dict(graph))
+    assert not plan.stale
+
+
+def test_single_graph_cached():
+    graph = dr.get_dependency_graph(plan_three)
+    single = _single_graph(graph)
+    assert plan_three in single and "plan_input" not in single
+    assert _single_graph(graph) is single
+    assert dr.get_execution_plan(_single_graph(graph)) is dr.get_execution_plan(single)
+
+
+def test_execution_plan_invalidated():
+    plan = dr.get_execution_plan(plan_three)
+    graph_plan = dr.ExecutionPlan(dr.get_dependency_graph(plan_two))
+
+    @plan_stage(plan_three)
+    def plan_four(x):
+        return x
+
+    assert plan.stale
+    assert graph_plan.stale
+    assert dr.get_execution_plan(plan_three) is not plan
+
+    plan = dr.ExecutionPlan(plan_four)
+    assert plan_four in plan.runnable
+    broker = dr.Broker()
+    broker["plan_input"] = 1
+    assert dr.run(plan, broker)[plan_four] == (4, None)
+
+
+class PlanContext(object):
+    pass
+
+
+class OtherPlanContext(object):
+    pass
+
+
+@plan_stage(PlanContext)
+def plan_ctx_spec(ctx):
+    return "ctx"
+
+
+@plan_stage(OtherPlanContext)
+def plan_other_spec(ctx):
+    return "other"
+
+
+@plan_stage([plan_ctx_spec, plan_other_spec])
+def plan_any(a, b):
+    return a or b
+
+
+@plan_stage(plan_other_spec)
+def plan_other_parser(a):
+    return a
+
+
+@plan_stage(plan_other_parser, plan_ctx_spec)
+def plan_both(a, b):
+    return a + b
+
+
+def test_execution_plan_prune():
+    graph = dr.get_dependency_graph(plan_any)
+    graph.update(dr.get_dependency_graph(plan_both))
+    plan = dr.ExecutionPlan(graph)
+
+    broker = dr.Broker()
+    broker[PlanContext] = PlanContext()
+    order, pruned = plan.prune(broker)
+    assert pruned == set([plan_other_spec, plan_other_parser, plan_both])
+    assert order == [c for c in plan.order if c in (PlanContext, plan_ctx_spec, plan_any)]
+    # cached per the seeded broker
+    assert plan.prune(broker)[0] is order
+
+    broker = plan.run(broker, prune=True)
+    assert broker[plan_any] == "ctx"
+    assert broker.pruned == pruned
+    assert plan_both not in broker.missing_requirements
+    assert plan_other_spec not in broker.exec_times
+
+    # the same result as without pruning
+    unpruned = dr.Broker()
+    unpruned[PlanContext] = PlanContext()
+    unpruned = dr.run(graph, unpruned)
+    assert set(unpruned.instances) == set(broker.instances)
+    assert unpruned[plan_any] == broker[plan_any]
+    assert plan_both in unpruned.missing_requirements
+    assert unpruned.pruned == set()
+
+    broker = dr.Broker()
+    broker[OtherPlanContext] = OtherPlanContext()
+    broker = dr.run(graph, broker, prune=True)
+    assert broker.pruned == set([plan_ctx_spec, plan_both])
+    assert broker[plan_any] == "other"
+
+
+def test_execution_plan_prune_disabled():
+    plan = dr.ExecutionPlan(plan_three)
+    broker = dr.Broker()
+    broker["plan_input"] = 1
+    assert plan.prune(broker)[1] == set()
+    dr.set_enabled(plan_two, False)
+    order, pruned = plan.prune(broker)
+    assert pruned == set([plan_three])
+    assert plan_two not in order
@@ -0,0 +1,183 @@
+import os
+import threading
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from insights.core import dr
+from insights.core.plugins import datasource
+
+# the barrier par_slow_a and par_slow_b have to reach together
+MEET = {}
+
+
+class par_stage(dr.ComponentType):
+    pass
+
+
+def _meet():
+    if "barrier" in MEET:
+        MEET["barrier"].wait()
+
+
+@par_stage("par_input")
+def par_slow_a(x):
+    _meet()
+    return x + 1
+
+
+@par_stage("par_input")
+def par_slow_b(x):
+    _meet()
+    return x + 2
+
+
+@par_stage("par_input", prio=10)
+def par_prio(x):
+    return threading.current_thread().name
+
+
+@par_stage(par_slow_a, par_slow_b)
+def par_sum(a, b):
+    return a + b
+
+
+@par_stage(par_sum, "par_missing")
+def par_skipped(a, b):
+    return a
+
+
+@par_stage(par_sum)
+def par_error(a):
+    raise Exception("boom")
+
+
+@par_stage([par_error, par_sum])
+def par_any(a, b):
+    return (a, b)
+
+
+@datasource("par_input")
+def par_ds(broker):
+    return (broker["par_input"] + broker.get("par_seed", 0), os.getpid())
+
+
+@datasource("par_input")
+def par_ds_local(broker):
+    # the result can't be pickled, it's invoked in the calling process again
+    return (lambda: 0, os.getpid())
+
+
+@datasource(par_ds)
+def par_ds_error(broker):
+    raise Exception("remote boom")
+
+
+@par_stage(par_ds, par_sum)
+def par_ds_sum(ds, a):
+    return ds[0] + a
+
+
+def _graph():
+    graph = {}
+    for c in (par_prio, par_skipped, par_any):
+        graph.update(dr.get_dependency_graph(c))
+    return graph
+
+
+def _ds_graph():
+    graph = _graph()
+    for c in (par_ds_local, par_ds_error, par_ds_sum):
+        graph.update(dr.get_dependency_graph(c))
+    return graph
+
+
+def test_run_parallel():
+    order = []
+
+    def observer(c, b):
+        order.append(c)
+
+    MEET["barrier"] = threading.Barrier(2, timeout=10)
+    try:
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="par-test") as pool:
+            broker = dr.Broker()
+            broker["par_input"] = 1
+            broker.add_observer(observer, par_stage)
+            broker = dr.run_parallel(_graph(), broker, pool)
+        # par_slow_a and par_slow_b ran concurrently
+        assert not MEET["barrier"].broken
+    finally:
+        MEET.clear()
+    assert broker[par_sum] == 5
+    assert broker[par_any] == (None, 5)
+    assert broker[par_prio].startswith("par-test")
+    assert par_skipped in broker.missing_requirements
+    assert par_error in broker.exceptions
+    assert set(broker.exec_times) == set(_graph())
+    # dependencies are tried and observed before dependents
+    assert order.index(par_slow_a) < order.index(par_sum)
+    assert order.index(par_slow_b) < order.index(par_sum)
+    assert order.index(par_sum) < order.index(par_error) < order.index(par_any)
+    assert sorted(order, key=dr.get_name) == sorted(
+        [c for c in _graph() if c in dr.DELEGATES], key=dr.get_name
+    )
+
+
+def test_run_parallel_same_as_serial():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        broker = dr.Broker()
+        broker["par_input"] = 1
+        brokers = dr.run_all(_graph(), broker, pool)
+    assert brokers == [broker]
+
+    serial = dr.Broker()
+    serial["par_input"] = 1
+    serial = dr.run(_graph(), serial)
+
+    assert set(broker.instances) == set(serial.instances)
+    assert set(broker.exceptions) == set(serial.exceptions)
+    assert broker.missing_requirements == serial.missing_requirements
+
+
+def test_run_parallel_priorities():
+    plan = dr.ExecutionPlan(_graph())
+    prio = plan.priorities
+    assert prio[par_prio] == (10, 1)
+    assert prio[par_slow_a] == (0, 4)
+    assert prio[par_sum] == (0, 3)
+    assert prio["par_input"] == (0, 5)
+
+
+def test_run_parallel_no_pool():
+    broker = dr.Broker()
+    broker["par_input"] = 1
+    broker = dr.run_parallel(_graph(), broker, None)
+    assert broker[par_sum] == 5
+
+
+def test_run_parallel_process_pool():
+    order = []
+
+    def observer(c, b):
+        order.append(c)
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        broker = dr.Broker()
+        broker["par_input"] = 1
+        broker["par_seed"] = 10
+        broker.add_observer(observer)
+        broker = dr.run_parallel(_ds_graph(), broker, pool)
+
+    # only the datasources are executed in the pool
+    assert broker[par_ds][0] == 11
+    assert broker[par_ds][1] != os.getpid()
+    assert broker[par_ds_local][1] == os.getpid()
+    assert broker[par_ds_sum] == 16
+    assert broker[par_sum] == 5
+    assert broker[par_prio] == threading.current_thread().name
+    assert par_ds_error in broker.exceptions
+    assert "remote boom" in broker.tracebacks[broker.exceptions[par_ds_error][0]]
+    assert par_skipped in broker.missing_requirements
+    assert set(broker.exec_times) == set(_ds_graph())
+    assert order.index(par_ds) < order.index(par_ds_error)
+    assert order.index(par_ds) < order.index(par_ds_sum)
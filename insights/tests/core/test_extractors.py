@@ -1,12 +1,18 @@
 import os
 import shlex
 import subprocess
+import tarfile
 import tempfile
 import zipfile
 from contextlib import closing
 
-from insights.core.hydration import get_all_files
+from insights import _run, dr, load_default_plugins
+from insights.core.context import SosArchiveContext
+from insights.core.hydration import get_all_files, identify
 from insights.core.archives import extract
+from insights.core.spec_factory import get_file_patterns
+from insights.parsers.hostname import Hostname
+from insights.parsers.redhat_release import RedhatRelease
 
 
 def test_with_zip():
@@ -46,3 +52,61 @@ def test_with_zip():
         os.unlink("/tmp/test.zip")
 
     subprocess.call(shlex.split("rm -rf %s" % tmp_dir))
+
+
+def _make_sosreport(tmpdir):
+    top = tmpdir.mkdir("src").mkdir("sosreport-host")
+    top.mkdir("etc").join("redhat-release").write(
+        "Red Hat Enterprise Linux Server release 7.3 (Maipo)"
+    )
+    top.join("etc", "hosts").write("127.0.0.1 localhost")
+    general = top.mkdir("sos_commands").mkdir("general")
+    general.join("hostname_-f").write("test.example.com")
+    top.join("sos_commands").mkdir("block").join("lsblk").write("lsblk\n" * 1000)
+    top.mkdir("var").mkdir("log").join("messages").write("message\n" * 1000)
+    os.symlink("sos_commands/general/hostname_-f", str(top.join("hostname")))
+    path = str(tmpdir.join("sosreport-host.tar.xz"))
+    with tarfile.open(path, "w:xz") as tf:
+        tf.add(str(top), arcname="sosreport-host")
+    return path
+
+
+def test_extract_patterns(tmpdir):
+    archive = _make_sosreport(tmpdir)
+    with extract(archive, patterns=["etc/redhat-release", "hostname", "etc/missing"]) as ex:
+        files = sorted(os.path.relpath(f, ex.tmp_dir) for f in get_all_files(ex.tmp_dir))
+        assert files == [
+            "sosreport-host/etc/redhat-release",
+            "sosreport-host/hostname",
+            "sosreport-host/sos_commands/block/lsblk",
+        ]
+        with open(os.path.join(ex.tmp_dir, "sosreport-host", "hostname")) as f:
+            assert f.read() == "test.example.com"
+        _, context = identify(list(get_all_files(ex.tmp_dir)))
+        assert context is SosArchiveContext
+    assert not os.path.exists(ex.tmp_dir)
+
+
+def test_extract_patterns_fallback(tmpdir):
+    top = tmpdir.mkdir("src").mkdir("archive")
+    top.mkdir("etc").join("hosts").write("127.0.0.1 localhost")
+    top.join("etc", "fstab").write("")
+    path = str(tmpdir.join("archive.tar.gz"))
+    with tarfile.open(path, "w:gz") as tf:
+        tf.add(str(top), arcname="archive")
+    # no context is identified by a marker
+    with extract(path, patterns=["etc/hosts"]) as ex:
+        assert len(list(get_all_files(ex.tmp_dir))) == 2
+
+
+def test_run_extract_needed(tmpdir):
+    load_default_plugins()
+    archive = _make_sosreport(tmpdir)
+    graph = dr.get_dependency_graph(RedhatRelease)
+    graph.update(dr.get_dependency_graph(Hostname))
+    patterns = get_file_patterns(graph)
+    assert "etc/redhat-release" in patterns
+    assert "var/log/messages" not in patterns
+    broker = _run(dr.Broker(), graph, archive, extract_needed=True)
+    assert broker[RedhatRelease].major == 7
+    assert broker[Hostname].fqdn == "test.example.com"
@@ -3,6 +3,8 @@ import os
 
 from tempfile import mkdtemp
 
+import pytest
+
 from insights.core import dr
 from insights.core.exceptions import ContentException
 from insights.core.plugins import component, datasource, make_info, rule
@@ -32,6 +34,16 @@ def thing():
     return Foo()
 
 
+@component()
+def another_thing():
+    return Foo()
+
+
+@component(thing)
+def use_thing(t):
+    return t.a
+
+
 @serializer(Foo)
 def serialize_foo(obj, root=None):
     return {"a": obj.a, "b": obj.b}
@@ -265,3 +277,126 @@ def test_dehydrate():
             assert "Fake Datasource" in tb
     finally:
         fs.remove(tmp_path)
+
+
+def test_round_trip_meta_index():
+    tmp_path = mkdtemp()
+    try:
+        h = Hydration(tmp_path, meta_index=True)
+
+        broker = dr.Broker()
+        broker[thing] = Foo()
+        broker.exec_times[thing] = 0.5
+        h.dehydrate(thing, broker)
+        h.dehydrate(Specs.the_data, dr.run(report))
+        h.close()
+        assert os.path.exists(h.meta_index)
+        assert not os.path.exists(h.meta_root)
+
+        table, content = h._load_meta_index()
+        assert sorted(table) == sorted([dr.get_name(thing), dr.get_name(Specs.the_data)])
+        offset, length = table[dr.get_name(thing)]
+        assert json.loads(content[offset : offset + length].decode("utf-8"))["name"] == dr.get_name(
+            thing
+        )
+
+        broker = Hydration(tmp_path).hydrate()
+        assert thing in broker
+        assert broker.exec_times[thing] >= 0.5
+        foo = broker[thing]
+        assert foo.a == 1
+        assert foo.b == 2
+    finally:
+        fs.remove(tmp_path)
+
+
+def test_hydrate_meta_index_not_closed():
+    tmp_path = mkdtemp()
+    try:
+        h = Hydration(tmp_path, meta_index=True)
+        broker = dr.Broker()
+        broker[thing] = Foo()
+        broker.exec_times[thing] = 0.5
+        h.dehydrate(thing, broker)
+        # e.g. the collection was interrupted
+        with open(h.meta_index, "a") as f:
+            f.write('{"name": "insights.tests.core.test_serde.thi')
+
+        table, _ = h._load_meta_index()
+        assert table is None
+        broker = Hydration(tmp_path).hydrate()
+        assert broker[thing].a == 1
+    finally:
+        fs.remove(tmp_path)
+
+
+def dehydrate_things(tmp_path, meta_index):
+    h = Hydration(tmp_path, meta_index=meta_index)
+    broker = dr.Broker()
+    for comp in (thing, another_thing):
+        broker[comp] = Foo()
+        broker.exec_times[comp] = 0.5
+        h.dehydrate(comp, broker)
+    h.close()
+
+
+@pytest.mark.parametrize("meta_index", [False, True])
+def test_hydrate_lazy(meta_index):
+    tmp_path = mkdtemp()
+    try:
+        dehydrate_things(tmp_path, meta_index)
+
+        broker = Hydration(tmp_path).hydrate(components=[use_thing])
+        assert thing in broker
+        assert another_thing not in broker
+        assert thing not in broker.instances
+        assert broker.exec_times[thing] >= 0.5
+        assert broker[thing].a == 1
+        assert thing in broker.instances
+
+        broker = dr.run(use_thing, broker=broker)
+        assert broker[use_thing] == 1
+    finally:
+        fs.remove(tmp_path)
+
+
+@pytest.mark.parametrize("meta_index", [False, True])
+def test_hydrate_lazy_pool(meta_index):
+    from concurrent.futures import ThreadPoolExecutor
+
+    tmp_path = mkdtemp()
+    try:
+        dehydrate_things(tmp_path, meta_index)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            graph = dr.get_dependency_graph(use_thing)
+            graph.update(dr.get_dependency_graph(another_thing))
+            broker = Hydration(tmp_path).hydrate(components=graph, pool=pool)
+        assert set(broker.keys()) == set([thing, another_thing])
+        assert broker[another_thing].b == 2
+    finally:
+        fs.remove(tmp_path)
+
+
+def test_hydrate_lazy_error():
+    tmp_path = mkdtemp()
+    try:
+        h = Hydration(tmp_path)
+        doc = {
+            "name": dr.get_name(thing),
+            "exec_time": 0.5,
+            "ser_time": 0.1,
+            "errors": [],
+            "results": {"type": "insights.tests.core.test_serde.NotFoo", "object": {}},
+        }
+        fs.ensure_path(h.meta_root)
+        with open(os.path.join(h.meta_root, dr.get_name(thing) + ".json"), "w") as f:
+            json.dump(doc, f)
+
+        broker = h.hydrate(components=use_thing)
+        assert thing in broker
+        assert broker.get(thing) is None
+        assert thing not in broker
+        assert thing not in Hydration(tmp_path).hydrate()
+    finally:
+        fs.remove(tmp_path)
@@ -0,0 +1,141 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from multiprocessing import Process
+
+import pytest
+
+import insights
+
+from insights.core.serve import RESPAWN_DELAY, _bind, request, serve
+
+RULES = """
+from insights import rule, make_fail
+from insights.parsers.redhat_release import RedhatRelease
+
+
+@rule(RedhatRelease)
+def report(rhr):
+    return make_fail("RELEASE", major=rhr.major)
+"""
+
+
+def handler(req):
+    if req["archive"].endswith("bad"):
+        raise ValueError("bad archive")
+    if req["archive"].endswith("crash"):
+        os._exit(3)
+    return json.dumps({"pid": os.getpid(), "archive": req["archive"]})
+
+
+def wait_for(path, proc):
+    for _ in range(600):
+        if os.path.exists(path):
+            return
+        assert proc.poll() is None if hasattr(proc, "poll") else proc.is_alive()
+        time.sleep(0.1)
+    raise AssertionError("server didn't start")
+
+
+@pytest.fixture
+def server(tmpdir):
+    path = str(tmpdir.join("insights.sock"))
+    proc = Process(target=serve, args=(path, handler), kwargs={"max_requests": 2})
+    proc.start()
+    wait_for(path, proc)
+    yield path
+    proc.terminate()
+    proc.join(10)
+    assert not os.path.exists(path)
+
+
+def test_serve(server, tmpdir):
+    archive = str(tmpdir.join("archive"))
+    results = [json.loads(request(server, archive, timeout=10)) for _ in range(3)]
+    assert [r["archive"] for r in results] == [archive] * 3
+    # the worker is replaced after 2 archives
+    assert results[0]["pid"] == results[1]["pid"]
+    assert results[1]["pid"] != results[2]["pid"]
+
+
+def test_serve_error(server, tmpdir):
+    result = json.loads(request(server, str(tmpdir.join("bad")), timeout=10))
+    assert result == {"error": "ValueError: bad archive"}
+    # the worker still serves
+    assert "pid" in json.loads(request(server, str(tmpdir.join("archive")), timeout=10))
+
+
+def test_serve_worker_crash(server, tmpdir):
+    start = time.time()
+    assert request(server, str(tmpdir.join("crash")), timeout=10) == ""
+    # the worker is replaced after the delay
+    assert "pid" in json.loads(request(server, str(tmpdir.join("archive")), timeout=10))
+    assert time.time() - start >= RESPAWN_DELAY
+
+
+def test_bind_in_use(server, tmpdir):
+    with pytest.raises(OSError):
+        _bind(server)
+    # the live socket is kept
+    assert "pid" in json.loads(request(server, str(tmpdir.join("archive")), timeout=10))
+
+    not_socket = tmpdir.join("file")
+    not_socket.write("data")
+    with pytest.raises(OSError):
+        _bind(str(not_socket))
+    assert not_socket.read() == "data"
+
+
+def test_bind_stale(tmpdir):
+    path = str(tmpdir.join("stale.sock"))
+    _bind(path).close()
+    # left by a server which is gone
+    assert os.path.exists(path)
+    sock = _bind(path)
+    try:
+        assert os.path.exists(path)
+    finally:
+        sock.close()
+
+
+def test_insights_run_serve(tmpdir):
+    root = tmpdir.mkdir("archive")
+    root.mkdir("etc").join("redhat-release").write(
+        "Red Hat Enterprise Linux Server release 7.3 (Maipo)"
+    )
+    root.mkdir("insights_commands").join("hostname").write("test.example.com")
+    tmpdir.join("serve_rules.py").write(RULES)
+    path = str(tmpdir.join("insights.sock"))
+    cmd = [
+        sys.executable,
+        "-c",
+        "from insights import main; main()",
+        "--serve",
+        path,
+        "--workers",
+        "2",
+        "-p",
+        "serve_rules",
+    ]
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(insights.__file__)), str(tmpdir)]
+    )
+    proc = subprocess.Popen(cmd, env=env)
+    try:
+        wait_for(path, proc)
+        for _ in range(2):
+            result = json.loads(request(path, str(root), timeout=60))
+            assert [r["details"] for r in result["reports"]] == [
+                {"type": "rule", "error_key": "RELEASE", "major": 7}
+            ]
+            assert result["system"]["hostname"] == "test"
+        assert "error" in json.loads(request(path, str(tmpdir.join("missing")), timeout=60))
+    finally:
+        proc.terminate()
+        proc.wait()
+    assert proc.returncode == 0
+    assert not os.path.exists(path)
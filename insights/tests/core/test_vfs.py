@@ -0,0 +1,191 @@
+import gzip
+import io
+import os
+import random
+import tarfile
+import zipfile
+
+import pytest
+
+from insights import _run, dr, load_default_plugins
+from insights.core.context import HostArchiveContext
+from insights.core.exceptions import InvalidContentType
+from insights.core.hydration import create_context
+from insights.core.spec_factory import TextFileProvider
+from insights.core.vfs import LOCAL_FS, IndexedGzipFile, TarFS, ZipFS, get_fs, open_archive
+from insights.parsers.hostname import Hostname
+from insights.parsers.redhat_release import RedhatRelease
+
+RELEASE = "Red Hat Enterprise Linux Server release 7.3 (Maipo)"
+
+
+@pytest.fixture
+def src(tmpdir):
+    top = tmpdir.mkdir("src").mkdir("archive")
+    top.mkdir("etc").join("redhat-release").write(RELEASE)
+    top.mkdir("insights_commands").join("hostname_-f").write("test.example.com")
+    top.mkdir("var").mkdir("log").join("messages").write(
+        "\n".join("line %d" % i for i in range(100))
+    )
+    top.join("etc", ".hidden").write("hidden")
+    os.symlink("../etc", str(top.join("var", "etc")))
+    os.symlink("etc/redhat-release", str(top.join("release")))
+    os.symlink("../../outside", str(top.join("escape")))
+    return top
+
+
+def make_tar(src, path, mode):
+    with tarfile.open(path, mode) as tf:
+        tf.add(str(src), arcname="archive")
+    return path
+
+
+def make_zip(src, path):
+    with zipfile.ZipFile(path, "w") as zf:
+        for root, dirs, files in os.walk(str(src)):
+            for name in dirs + files:
+                full = os.path.join(root, name)
+                arcname = os.path.relpath(full, str(src.dirpath()))
+                if os.path.islink(full):
+                    info = zipfile.ZipInfo(arcname)
+                    info.external_attr = 0o120777 << 16
+                    zf.writestr(info, os.readlink(full))
+                elif os.path.isfile(full):
+                    zf.write(full, arcname)
+    return path
+
+
+@pytest.fixture(params=["w:gz", "w:", "w:bz2", "zip"])
+def archive(request, src, tmpdir):
+    path = str(tmpdir.join("archive." + request.param.replace(":", "")))
+    if request.param == "zip":
+        return make_zip(src, path)
+    return make_tar(src, path, request.param)
+
+
+def test_archive_fs(archive):
+    with open_archive(archive) as afs:
+        assert isinstance(afs, ZipFS if archive.endswith("zip") else TarFS)
+        top = os.path.join(afs.root, "archive")
+        assert afs.exists(os.path.join(top, "etc", "redhat-release"))
+        assert afs.isdir(os.path.join(top, "etc"))
+        assert not afs.exists(os.path.join(top, "etc", "missing"))
+        assert afs.listdir(os.path.join(top, "etc")) == [".hidden", "redhat-release"]
+        assert afs.getsize(os.path.join(top, "etc", "redhat-release")) == len(RELEASE)
+        with afs.open(os.path.join(top, "etc", "redhat-release"), "r") as f:
+            assert f.read() == RELEASE
+        with afs.open(os.path.join(top, "insights_commands", "hostname_-f"), "rb") as f:
+            assert f.read() == b"test.example.com"
+        assert os.path.join(top, "etc", "redhat-release") in afs.files()
+        with pytest.raises(OSError):
+            afs.listdir(os.path.join(top, "missing"))
+        with pytest.raises(IOError):
+            afs.open(os.path.join(top, "etc"))
+
+
+def test_archive_fs_glob(archive):
+    with open_archive(archive) as afs:
+        top = os.path.join(afs.root, "archive")
+        assert sorted(afs.glob(os.path.join(top, "*"))) == [
+            os.path.join(top, n) for n in ["etc", "insights_commands", "release", "var"]
+        ]
+        assert afs.glob(os.path.join(top, "*", "redhat-*")) == [
+            os.path.join(top, "etc", "redhat-release")
+        ]
+        assert afs.glob(os.path.join(top, "etc", ".h*")) == [os.path.join(top, "etc", ".hidden")]
+        assert afs.glob(os.path.join(top, "etc", "redhat-release")) == [
+            os.path.join(top, "etc", "redhat-release")
+        ]
+        assert afs.glob(os.path.join(top, "etc", "missing")) == []
+        assert afs.glob("/etc/*") == []
+
+
+def test_archive_fs_symlinks(archive):
+    with open_archive(archive) as afs:
+        top = os.path.join(afs.root, "archive")
+        release = os.path.join(top, "etc", "redhat-release")
+        assert afs.realpath(os.path.join(top, "release")) == release
+        assert afs.realpath(os.path.join(top, "var", "etc", "redhat-release")) == release
+        assert afs.listdir(os.path.join(top, "var", "etc")) == [".hidden", "redhat-release"]
+        with afs.open(os.path.join(top, "release"), "r") as f:
+            assert f.read() == RELEASE
+        assert not afs.exists(os.path.join(top, "escape"))
+
+
+@pytest.mark.parametrize("mode", ["w:gz", "w:"])
+def test_archive_fs_hard_links(src, tmpdir, mode):
+    os.link(str(src.join("etc", "redhat-release")), str(src.join("redhat-release")))
+    archive = make_tar(src, str(tmpdir.join("archive.tar")), mode)
+    with tarfile.open(archive) as tf:
+        assert tf.getmember("archive/redhat-release").islnk()
+    with open_archive(archive) as afs:
+        link = os.path.join(afs.root, "archive", "redhat-release")
+        assert afs.getsize(link) == len(RELEASE)
+        with afs.open(link, "r") as f:
+            assert f.read() == RELEASE
+
+
+def test_archive_fs_spool(src, tmpdir):
+    archive = make_tar(src, str(tmpdir.join("archive.tar")), "w:")
+    with open_archive(archive, spool_size=10) as afs:
+        with afs.open(os.path.join(afs.root, "archive", "etc", "redhat-release"), "r") as f:
+            # copied to a temporary file
+            assert not isinstance(f.buffer, io.BytesIO)
+            assert f.read() == RELEASE
+
+
+def test_open_archive_invalid(tmpdir):
+    path = tmpdir.join("archive.txt")
+    path.write("not an archive")
+    with pytest.raises(InvalidContentType):
+        with open_archive(str(path)):
+            pass
+
+
+def test_indexed_gzip_file(tmpdir):
+    rand = random.Random(0)
+    content = b"".join(b"%d %x\n" % (i, rand.getrandbits(64)) for i in range(200000))
+    path = str(tmpdir.join("content.gz"))
+    half = len(content) // 2
+    # a multi-member gzip file
+    with open(path, "wb") as f:
+        f.write(gzip.compress(content[:half]))
+        f.write(gzip.compress(content[half:]))
+
+    gz = IndexedGzipFile(path, spacing=65536)
+    try:
+        assert gz.read() == content
+        assert len(gz._points) > 10
+        for _ in range(100):
+            offset = rand.randrange(len(content))
+            size = rand.randrange(100000)
+            gz.seek(offset)
+            assert gz.read(size) == content[offset : offset + size]
+            assert gz.tell() == min(offset + size, len(content))
+        assert gz.seek(-10, os.SEEK_END) == len(content) - 10
+        assert gz.read() == content[-10:]
+        assert gz.read(10) == b""
+    finally:
+        gz.close()
+
+
+def test_context_fs(archive):
+    with open_archive(archive) as afs:
+        ctx = create_context(afs.root, fs=afs)
+        assert isinstance(ctx, HostArchiveContext)
+        assert ctx.root == os.path.join(afs.root, "archive")
+        assert get_fs(ctx) is afs
+        p = TextFileProvider("var/log/messages", root=ctx.root, ctx=ctx)
+        assert p.content[-1] == "line 99"
+        assert list(p.stream())[0] == "line 0"
+    assert get_fs(HostArchiveContext()) is LOCAL_FS
+
+
+def test_run_no_extract(archive):
+    load_default_plugins()
+    graph = dr.get_dependency_graph(RedhatRelease)
+    graph.update(dr.get_dependency_graph(Hostname))
+    extracted = _run(dr.Broker(), graph, archive)
+    broker = _run(dr.Broker(), graph, archive, no_extract=True)
+    assert broker[RedhatRelease].major == extracted[RedhatRelease].major == 7
+    assert broker[Hostname].fqdn == extracted[Hostname].fqdn == "test.example.com"
@@ -1,5 +1,7 @@
 import time
 
+from concurrent.futures import ThreadPoolExecutor
+
 from insights.core import dr
 from insights.core.context import HostContext, SosArchiveContext
 from insights.core.exceptions import TimeoutException
@@ -12,6 +14,8 @@ class Specs(SpecSet):
     spec_ds_timeout_3_1 = RegistryPoint()
     spec_ds_timeout_default_1 = RegistryPoint()
     spec_foreach_ds_timeout_1_2 = RegistryPoint(multi_output=True)
+    spec_ds_timeout_command = RegistryPoint()
+    spec_ds_timeout_loop = RegistryPoint()
 
 
 @datasource(timeout=1)
@@ -32,6 +36,20 @@ def ds_timeout_3_1(broker):
     return DatasourceProvider('foo', "test_ds_timeout_3_1_")
 
 
+@datasource(HostContext, timeout=1)
+def ds_timeout_command(broker):
+    broker[HostContext].shell_out("/usr/bin/sleep 10")
+    return DatasourceProvider('foo', "test_ds_timeout_command")
+
+
+@datasource(HostContext, timeout=1)
+def ds_timeout_loop(broker):
+    end = time.time() + 10
+    while time.time() < end:
+        pass
+    return DatasourceProvider('foo', "test_ds_timeout_loop")
+
+
 @datasource()
 def ds_timeout_default_1(broker):
     time.sleep(1)
@@ -43,6 +61,8 @@ class TestSpecs(Specs):
     spec_ds_timeout_3_1 = ds_timeout_3_1
     spec_ds_timeout_default_1 = ds_timeout_default_1
     spec_foreach_ds_timeout_1_2 = foreach_execute(foreach_ds_timeout_1_2, "/usr/bin/echo %s")
+    spec_ds_timeout_command = ds_timeout_command
+    spec_ds_timeout_loop = ds_timeout_loop
 
 #
 # TEST
@@ -133,3 +153,37 @@ def test_not_hostcontext_timeout_foreach_datasource_hit():
     assert ds_timeout_default_1 in broker
     assert foreach_ds_timeout_1_2 in broker
     assert Specs.spec_foreach_ds_timeout_1_2 not in broker.exceptions
+
+
+def test_timeout_datasource_command_in_thread():
+    broker = dr.Broker()
+    broker[HostContext] = HostContext(timeout=30)
+    persist = set([
+        TestSpecs.spec_ds_timeout_command,
+        TestSpecs.spec_ds_timeout_3_1,
+    ])
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        dr.run_all(persist, broker=broker, pool=pool)
+
+    # the command is killed at the deadline although not in the main thread
+    assert time.time() - start < 5
+    assert ds_timeout_3_1 in broker
+    assert ds_timeout_command not in broker
+    exs = broker.exceptions[Specs.spec_ds_timeout_command]
+    assert [ex for ex in exs if isinstance(ex, TimeoutException) and str(ex) == "Datasource spec insights.tests.datasources.test_datasource_timeout.TestSpecs.spec_ds_timeout_command timed out after 1 seconds!"]
+
+
+def test_timeout_datasource_loop_in_main_thread():
+    broker = dr.Broker()
+    broker[HostContext] = HostContext()
+
+    start = time.time()
+    dr.run_all(set([TestSpecs.spec_ds_timeout_loop]), broker=broker)
+
+    # the python code is interrupted by the alarm in the main thread
+    assert time.time() - start < 5
+    assert ds_timeout_loop not in broker
+    exs = broker.exceptions[Specs.spec_ds_timeout_loop]
+    assert [ex for ex in exs if isinstance(ex, TimeoutException)]
@@ -1,6 +1,7 @@
 import pytest
 
 from collections import defaultdict
+from unittest.mock import patch
 
 from insights.combiners.ps import Ps
 from insights.core import dr, filters
@@ -9,6 +10,7 @@ from insights.core.exceptions import SkipComponent
 from insights.core.spec_factory import DatasourceProvider
 from insights.parsers.ps import PsEoCmd
 from insights.specs import Specs
+from insights.specs.datasources import get_packages
 from insights.specs.datasources.package_provides import cmd_and_pkg, get_package
 from insights.tests import context_wrap
 
@@ -19,57 +21,45 @@ JAVA_PATH_ERR = '/error/java'
 JAVA_PKG_2 = 'java-1.8.0-openjdk-headless-1.8.0.292.b10-1.el7_9.x86_64'
 HTTPD_PATH = '/usr/sbin/httpd'
 HTTPD_PKG = 'httpd-2.4.6-97.el7_9.x86_64'
+SHARED_PATH = '/usr/bin/shared'
+SHARED_PKGS = ['shared-1.0-1.el7.x86_64', 'shared-compat-1.0-1.el7.x86_64']
+BROKEN_PATH = '/usr/bin/broken'
+
+
+def fake_realpath(path):
+    return JAVA_PATH_2 if path == JAVA_PATH_1 else path
+
+
+def fake_exists(path):
+    return path.startswith('/') and path != JAVA_PATH_ERR
 
 
 class FakeContext(HostContext):
+    def __init__(self, *args, **kwargs):
+        super(FakeContext, self).__init__(*args, **kwargs)
+        self.rpm_cmds = []
+
     def shell_out(self, cmd, split=True, timeout=None, keep_rc=False, env=None, signum=None):
         tmp_cmd = cmd.strip().split()
         shell_cmd = tmp_cmd[0]
         arg = tmp_cmd[-1]
-        if 'readlink' in shell_cmd:
-            if arg == JAVA_PATH_1:
-                return (
-                    0,
-                    [
-                        JAVA_PATH_2,
-                    ],
-                )
-            elif arg == JAVA_PATH_ERR:
-                return (
-                    1,
-                    [
-                        'file not found',
-                    ],
-                )
-            elif arg.startswith('/'):
-                return (
-                    0,
-                    [
-                        arg,
-                    ],
-                )
-        elif 'rpm' in shell_cmd:
-            if arg == JAVA_PATH_2:
-                return (
-                    0,
-                    [
-                        JAVA_PKG_2,
-                    ],
-                )
-            elif arg == HTTPD_PATH:
-                return (
-                    0,
-                    [
-                        HTTPD_PKG,
-                    ],
-                )
-            else:
-                return (
-                    1,
-                    [
-                        'file {0} is not owned by any package'.format(arg),
-                    ],
-                )
+        if 'rpm' in shell_cmd:
+            self.rpm_cmds.append(cmd)
+            rc, output = 0, []
+            for path in tmp_cmd[2:]:
+                if path == JAVA_PATH_2:
+                    output.append(JAVA_PKG_2)
+                elif path == HTTPD_PATH:
+                    output.append(HTTPD_PKG)
+                elif path == SHARED_PATH:
+                    output.extend(SHARED_PKGS)
+                elif path == BROKEN_PATH:
+                    rc += 1
+                    output.append('error: rpmdb: damaged header #42 retrieved -- skipping.')
+                else:
+                    rc += 1
+                    output.append('file {0} is not owned by any package'.format(path))
+            return (rc, output)
         elif 'which' in shell_cmd:
             if 'exception' in arg:
                 raise Exception()
@@ -101,6 +91,8 @@ def teardown_function(func):
     filters.FILTERS = defaultdict(dict)
 
 
+@patch("os.path.exists", fake_exists)
+@patch("os.path.realpath", fake_realpath)
 def test_get_package():
     ctx = FakeContext()
 
@@ -113,6 +105,8 @@ def test_get_package():
     assert result == 'java-1.8.0-openjdk-headless-1.8.0.292.b10-1.el7_9.x86_64'
 
 
+@patch("os.path.exists", fake_exists)
+@patch("os.path.realpath", fake_realpath)
 def test_get_package_bad():
     ctx = FakeContext()
 
@@ -120,11 +114,53 @@ def test_get_package_bad():
     assert result is None
 
 
+@patch("os.path.exists", fake_exists)
+@patch("os.path.realpath", fake_realpath)
 def test_get_package_err():
     ctx = FakeContext()
 
     result = get_package(ctx, JAVA_PATH_ERR)
     assert result is None
+    assert ctx.rpm_cmds == []
+
+
+@patch("os.path.exists", fake_exists)
+@patch("os.path.realpath", fake_realpath)
+def test_get_packages():
+    ctx = FakeContext()
+
+    result = get_packages(ctx, [JAVA_PATH_1, JAVA_PATH_2, HTTPD_PATH, JAVA_PATH_BAD, JAVA_PATH_ERR])
+    assert result == {
+        JAVA_PATH_1: JAVA_PKG_2,
+        JAVA_PATH_2: JAVA_PKG_2,
+        HTTPD_PATH: HTTPD_PKG,
+    }
+    # the files not owned by any package are left out of a second query
+    assert ctx.rpm_cmds == [
+        '/usr/bin/rpm -qf {0} {1} {2}'.format(JAVA_PATH_BAD, JAVA_PATH_2, HTTPD_PATH),
+        '/usr/bin/rpm -qf {0} {1}'.format(JAVA_PATH_2, HTTPD_PATH),
+    ]
+
+
+@patch("os.path.exists", fake_exists)
+@patch("os.path.realpath", fake_realpath)
+def test_get_packages_owned_twice():
+    ctx = FakeContext()
+
+    result = get_packages(ctx, [SHARED_PATH, HTTPD_PATH, JAVA_PATH_BAD])
+    assert result == {SHARED_PATH: SHARED_PKGS[0], HTTPD_PATH: HTTPD_PKG}
+    assert len(ctx.rpm_cmds) == 5
+
+
+@patch("os.path.exists", fake_exists)
+@patch("os.path.realpath", fake_realpath)
+def test_get_packages_error():
+    ctx = FakeContext()
+
+    # the error doesn't tell the file
+    result = get_packages(ctx, [BROKEN_PATH, HTTPD_PATH, JAVA_PATH_BAD])
+    assert result == {HTTPD_PATH: HTTPD_PKG}
+    assert len(ctx.rpm_cmds) == 4
 
 
 PS_EO_CMD = """
@@ -155,6 +191,8 @@ EXPECTED = DatasourceProvider(
 )
 
 
+@patch("os.path.exists", fake_exists)
+@patch("os.path.realpath", fake_realpath)
 def test_cmd_and_pkg():
     pseo = PsEoCmd(context_wrap(PS_EO_CMD))
     ps = Ps(None, None, None, None, None, pseo)
@@ -165,6 +203,7 @@ def test_cmd_and_pkg():
     result = cmd_and_pkg(broker)
     assert result is not None
     assert sorted(result.content) == sorted(EXPECTED.content)
+    assert len(broker[HostContext].rpm_cmds) == 2
 
 
 def test_cmd_and_pkg_no_filters():
@@ -178,6 +217,8 @@ def test_cmd_and_pkg_no_filters():
         cmd_and_pkg(broker)
 
 
+@patch("os.path.exists", fake_exists)
+@patch("os.path.realpath", fake_realpath)
 def test_cmd_and_pkg_not_found():
     pseo = PsEoCmd(context_wrap(PS_EO_CMD))
     ps = Ps(None, None, None, None, None, pseo)
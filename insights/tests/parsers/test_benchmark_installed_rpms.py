@@ -0,0 +1,63 @@
+"""
+Benchmark of the comparisons of the packages of a 3000 packages ``rpm -qa``:
+the newest version of each package, the sorting of the kernels and the
+lookup of the packages older than the fixed packages of an erratum list.
+
+It's skipped by default, run it with `pytest --runslow -s`.
+"""
+
+import random
+import time
+
+import pytest
+
+from insights.parsers.installed_rpms import InstalledRpms
+from insights.tests import context_wrap
+
+
+def rpm_qa(count):
+    random.seed(0)
+    lines = []
+    for i in range(count // 3):
+        for _ in range(3):
+            version = "%d.%d.%d" % (
+                random.randint(0, 9),
+                random.randint(0, 30),
+                random.randint(0, 300),
+            )
+            release = "%d.el8_%d.%d" % (
+                random.randint(1, 500),
+                random.randint(0, 9),
+                random.randint(0, 9),
+            )
+            lines.append("package%d-%s-%s.x86_64" % (i, version, release))
+    return lines
+
+
+def best_of(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        duration = time.time() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def test_benchmark_installed_rpms(request):
+    if not request.config.getoption("--runslow"):
+        pytest.skip("benchmark, run with --runslow")
+
+    lines = rpm_qa(3000)
+    rpms = InstalledRpms(context_wrap("\n".join(lines)))
+    fixed = [l.rsplit(".", 1)[0] for l in lines[1::3]]
+
+    newest = best_of(lambda: [rpms.get_max(name) for name in rpms.packages])
+    ordered = best_of(lambda: [sorted(pkgs) for pkgs in rpms.packages.values()])
+    older = best_of(lambda: rpms.older_than(fixed))
+    assert len(rpms.older_than(fixed)) > 0
+
+    print(
+        "\n%d packages: get_max %.4fs sorted %.4fs older_than %d fixed %.4fs"
+        % (len(lines), newest, ordered, len(fixed), older)
+    )
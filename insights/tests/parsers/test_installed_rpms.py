@@ -604,6 +604,32 @@ def test_rpm_with_diff_length_version():
     assert rpm1 > rpm2
 
 
+def test_version_key():
+    rpm = InstalledRpm.from_package('kernel-3.10.0-327.el7')
+    key = rpm.version_key
+    assert rpm.version_key is key
+    rpm.epoch = '1'
+    assert rpm.version_key > key
+    assert InstalledRpm.from_package('kernel-3.10.0~rc1-327.el7') < InstalledRpm.from_package('kernel-3.10.0-327.el7')
+    assert InstalledRpm.from_package('kernel-3.10.0^1-327.el7') > InstalledRpm.from_package('kernel-3.10.0-327.el7')
+    with pytest.raises(ValueError):
+        InstalledRpm.from_package('kernel-3.10.0-327.el7') < InstalledRpm.from_package('bash-4.2.46-34.el7')
+
+
+def test_older_than():
+    rpms = InstalledRpms(context_wrap(RPMS_MULTIPLE_KERNEL + RPMS_PACKAGE))
+    older = rpms.older_than([
+        'kernel-3.10.0-327.36.1.el7',
+        InstalledRpm.from_package('openssh-server-5.3p1-105.el6'),
+        'openssl-1.0.0-27.el6',
+        'bash-4.1.2-33.el6',
+    ])
+    assert sorted(older) == ['kernel', 'openssh-server']
+    assert [r.release for r in older['kernel']] == ['327.el7']
+    assert older['openssh-server'][0].release == '104.el6'
+    assert rpms.older_than(['kernel-3.10.0-327.el7']) == {}
+
+
 def test_container_installed_rpms():
     rpms = ContainerInstalledRpms(
         context_wrap(
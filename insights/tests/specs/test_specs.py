@@ -2,6 +2,7 @@ import glob
 import os
 import json
 import pytest
+import tarfile
 import tempfile
 
 from collections import defaultdict
@@ -11,10 +12,12 @@ from insights import collect
 from insights.cleaner import Cleaner
 from insights.client.archive import InsightsArchive
 from insights.client.config import InsightsConfig
+from insights.client.utilities import largest_spec_in_archive
 from insights.core import Parser, dr
 from insights.core import filters
+from insights.core.archives import SIZES_SUFFIX, ArchiveWriter
 from insights.core.context import HostContext
-from insights.core.exceptions import ContentException
+from insights.core.exceptions import CalledProcessError, ContentException
 from insights.core.filters import add_filter
 from insights.core.plugins import datasource
 from insights.core.spec_factory import (
@@ -337,6 +340,29 @@ def test_datasource_provider():
     assert list(ds.stream()) == data.splitlines()
 
 
+def test_foreach_execute_workers():
+    files = [here + "/../__init__.py", "/no/such/_file", here + "/../integration.py"]
+    serial = foreach_execute(Stuff.files0, 'ls -l %s')
+    concurrent = foreach_execute(Stuff.files0, 'ls -l %s', workers=2)
+    broker = dr.Broker()
+    broker[HostContext] = HostContext()
+    broker[Stuff.files0] = files
+
+    expected = serial(broker)
+    result = concurrent(broker)
+    assert all(p._loader is None for p in expected)
+    assert all(p._loader is result[0]._loader for p in result)
+    assert [p.cmd for p in result] == [p.cmd for p in expected]
+    for p, e in zip(result, expected):
+        if "no/such" in p.cmd:
+            with pytest.raises(CalledProcessError):
+                e.content
+            with pytest.raises(CalledProcessError):
+                p.content
+        else:
+            assert p.content == e.content
+
+
 def test_exp_no_filters():
     broker = dr.Broker()
     broker[HostContext] = HostContext()
@@ -457,6 +483,64 @@ def test_specs_collect(gen, obfuscate):
     arch.delete_archive_dir()
 
 
+@pytest.mark.parametrize("compressor", ["gz", "xz", "none"])
+@patch('insights.cleaner.Cleaner.generate_report', return_value=None)
+def test_specs_collect_compress(gen, compressor):
+    manifest = collect.load_manifest(specs_manifest)
+    for pkg in manifest.get("plugins", {}).get("packages", []):
+        dr.load_components(pkg, exclude=None)
+    conf = InsightsConfig(manifest=manifest, compressor=compressor)
+    arch = InsightsArchive(conf)
+    arch.create_archive_dir()
+    tar_file, errors = collect.collect(
+        tmp_path=arch.tmp_dir, archive_name=arch.archive_name, client_config=conf, compress=True
+    )
+    ext = "" if compressor == "none" else "." + compressor
+    assert tar_file == os.path.join(arch.tmp_dir, arch.archive_name + ".tar" + ext)
+    assert not os.path.exists(os.path.join(arch.tmp_dir, arch.archive_name))
+
+    with tarfile.open(tar_file) as tf:
+        members = dict((m.name, m) for m in tf.getmembers())
+    names = set(members)
+    meta_name = os.path.join(
+        arch.archive_name, "meta_data", "insights.tests.specs.test_specs.Specs.smpl_file.json"
+    )
+    assert meta_name in names
+    assert os.path.join(arch.archive_name, "insights_archive.txt") in names
+    with open(tar_file + SIZES_SUFFIX) as f:
+        sizes = json.load(f)
+    rel, size, compressed = sizes["insights.tests.specs.test_specs.Specs.smpl_file"][0]
+    assert size == members[os.path.normpath(os.path.join(arch.archive_name, "data", rel))].size
+    if compressor == "xz":
+        assert compressed is None
+    elif compressor == "none":
+        # the headers and the content padded to the tar blocks
+        assert compressed > size and compressed % tarfile.BLOCKSIZE == 0
+    else:
+        assert 0 < compressed < size
+    assert largest_spec_in_archive(tar_file)[1] == max(f[1] for v in sizes.values() for f in v)
+
+    arch.delete_tmp_dir()
+
+
+@patch('insights.core.dr.run_all', side_effect=RuntimeError("boom"))
+def test_specs_collect_compress_error(run_all):
+    conf = InsightsConfig(manifest=collect.load_manifest(specs_manifest))
+    arch = InsightsArchive(conf)
+    arch.create_archive_dir()
+    close_patch = patch.object(
+        ArchiveWriter, "close", autospec=True, side_effect=ArchiveWriter.close
+    )
+    with close_patch as close, pytest.raises(RuntimeError):
+        collect.collect(
+            tmp_path=arch.tmp_dir, archive_name=arch.archive_name, client_config=conf, compress=True
+        )
+    assert close.call_count == 1
+    assert close.call_args[0][0]._file.closed
+
+    arch.delete_tmp_dir()
+
+
 def test_specs_default_module_utils():
     rpm_formatter = _make_rpm_formatter(['"name":"%{NAME}"', '"version":"%{VERSION}"'])
     assert ',"version":' in rpm_formatter
@@ -0,0 +1,132 @@
+import os
+import pytest
+
+from unittest.mock import patch
+
+from insights.core import dr
+from insights.core.context import HostContext
+from insights.core.exceptions import CalledProcessError
+from insights.core.filters import add_filter
+from insights.core.plugins import datasource
+from insights.core.spec_factory import (
+    RegistryPoint,
+    SpecSet,
+    container_collect,
+    container_execute,
+)
+
+this_file = os.path.abspath(__file__).rstrip("c")
+
+
+class FakeContext(HostContext):
+    """Runs the commands of the containers on the host"""
+
+    def __init__(self, **kwargs):
+        super(FakeContext, self).__init__(**kwargs)
+        self.execs = []
+
+    def shell_out(self, cmd, split=True, timeout=None, keep_rc=False, env=None, signum=None):
+        # <podman|docker> exec -e <env> container_id command...
+        container_id = cmd[0][4]
+        self.execs.append(container_id)
+        if container_id == "gone":
+            if keep_rc:
+                return 125, "Error: no container with name or ID gone found"
+            raise CalledProcessError(125, cmd[0], "Error: no container with name or ID gone found")
+        cmd = [cmd[0][5:]] + cmd[1:]
+        return super(FakeContext, self).shell_out(cmd, split, timeout, keep_rc, env, signum)
+
+
+class Specs(SpecSet):
+    cnt_cmd = RegistryPoint(multi_output=True)
+    cnt_file = RegistryPoint(multi_output=True)
+    cnt_file_filter = RegistryPoint(multi_output=True, filterable=True)
+    cnt_no_such_cmd = RegistryPoint(multi_output=True)
+    cnt_sleep = RegistryPoint(multi_output=True)
+
+
+class Stuff(Specs):
+    @datasource(HostContext)
+    def containers(broker):
+        return [
+            ("rhel8", "podman", "c1"),
+            ("rhel8", "podman", "c2"),
+        ]
+
+    cnt_cmd = container_execute(containers, "/bin/echo hello")
+    cnt_file = container_collect(containers, this_file)
+    cnt_file_filter = container_collect(containers, this_file)
+    cnt_no_such_cmd = container_execute(containers, "/no/such_cmd")
+    cnt_sleep = container_execute(containers, "/bin/sleep 5")
+
+
+def setup_function(func):
+    add_filter(Stuff.cnt_file_filter, "import")
+
+
+def get_broker(containers, *planned, **kwargs):
+    broker = dr.Broker()
+    broker[HostContext] = FakeContext(**kwargs)
+    broker[Stuff.containers] = containers
+    broker.planned = frozenset(planned)
+    return broker
+
+
+@patch("insights.core.spec_factory.which", return_value=True)
+def test_one_exec_per_container(which):
+    broker = get_broker(Stuff.containers(None))
+    ctx = broker[HostContext]
+    specs = [Stuff.cnt_cmd, Stuff.cnt_file, Stuff.cnt_file_filter, Stuff.cnt_no_such_cmd]
+    dr.run(specs, broker=broker)
+    # the specs not in the run are left out
+    assert set(broker["container_providers"]) == set(specs)
+    assert [p.content for p in broker[Stuff.cnt_cmd]] == [["hello"], ["hello"]]
+    assert ctx.execs == ["c1", "c2"]
+
+    with open(this_file) as f:
+        lines = f.read().splitlines()
+    assert [p.content for p in broker[Stuff.cnt_file]] == [lines, lines]
+    filtered = broker[Stuff.cnt_file_filter]
+    assert [p.content for p in filtered] == [[l for l in lines if "import" in l]] * 2
+    assert all(p.rc == 0 for p in filtered)
+    for p in broker[Stuff.cnt_no_such_cmd]:
+        with pytest.raises(CalledProcessError):
+            p.load()
+    assert ctx.execs == ["c1", "c2"]
+
+
+@patch("insights.core.spec_factory.which", return_value=True)
+def test_not_planned(which):
+    broker = get_broker(Stuff.containers(None), Stuff.cnt_cmd)
+    ctx = broker[HostContext]
+    assert [p.content for p in Stuff.cnt_cmd(broker)] == [["hello"], ["hello"]]
+    assert list(broker["container_providers"]) == [Stuff.cnt_cmd]
+    assert ctx.execs == ["c1", "c2"]
+
+
+@patch("insights.core.spec_factory.which", return_value=True)
+def test_exec_failed(which):
+    broker = get_broker([("rhel8", "podman", "gone")], Stuff.cnt_cmd, Stuff.cnt_file)
+    ctx = broker[HostContext]
+    cmds = Stuff.cnt_cmd(broker)
+    files = Stuff.cnt_file(broker)
+    with pytest.raises(CalledProcessError):
+        cmds[0].load()
+    with pytest.raises(CalledProcessError):
+        files[0].load()
+    # the failure of the batched exec is the failure of each command
+    assert ctx.execs == ["gone"]
+
+
+@patch("insights.core.spec_factory.which", return_value=True)
+def test_exec_timeout(which):
+    containers = [("rhel8", "podman", "c1")]
+    broker = get_broker(containers, Stuff.cnt_cmd, Stuff.cnt_sleep, timeout=1)
+    ctx = broker[HostContext]
+    cmds = Stuff.cnt_cmd(broker)
+    sleeps = Stuff.cnt_sleep(broker)
+    # the finished command is kept and the other one runs on its own
+    assert cmds[0].content == ["hello"]
+    with pytest.raises(CalledProcessError):
+        sleeps[0].load()
+    assert ctx.execs == ["c1", "c1"]
@@ -75,3 +75,37 @@ def test_touch_times():
     assert os.stat(path).st_atime == 1259798405
     assert os.stat(path).st_mtime == 1259798400
     fs.remove(path)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"\n",
+        b"a",
+        b"a\nb",
+        b"a\nb\n\n",
+        b"a\r\nb\rc\n",
+        "l中ne\n".encode("utf-8") * 10,
+        b"bad \xff byte\nok\n",
+    ],
+)
+@pytest.mark.parametrize("blocksize", [1, 3, 65536])
+def test_reverse_readlines(tmpdir, data, blocksize):
+    path = str(tmpdir.join("test_reverse_readlines"))
+    with open(path, "wb") as f:
+        f.write(data)
+    with open(path, "r", encoding="utf-8", errors="surrogateescape") as f:
+        expected = [l.rstrip("\n") for l in f]
+    assert list(fs.reverse_readlines(path, blocksize=blocksize)) == expected[::-1]
+
+
+@pytest.mark.parametrize("blocksize", [1, 4, 65536])
+def test_reverse_readlines_start(tmpdir, blocksize):
+    path = str(tmpdir.join("test_reverse_readlines_start"))
+    with open(path, "w") as f:
+        f.write("line1\nline2\nline3\n")
+    # the broken first line is discarded
+    assert list(fs.reverse_readlines(path, start=2, blocksize=blocksize)) == ["line3", "line2"]
+    assert list(fs.reverse_readlines(path, start=6, blocksize=blocksize)) == ["line3"]
+    assert list(fs.reverse_readlines(path, start=17, blocksize=blocksize)) == []
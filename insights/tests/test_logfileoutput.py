@@ -321,3 +321,44 @@ def test_logs_with_milliseconds():
     log = FakeTowerLog(ctx)
     assert len(log.lines) == 4
     assert len(list(log.get_after(datetime(2020, 5, 28, 19, 25, 46, 944)))) == 3
+
+
+def test_logs_get_between():
+    ctx = context_wrap(MESSAGES, path='/var/log/messages')
+    log = FakeMessagesClass(ctx)
+    found = list(log.get_between(datetime(2017, 3, 27, 3, 18, 24), datetime(2017, 3, 27, 3, 18, 25)))
+    assert len(found) == 6
+    assert all(l['raw_message'].startswith('Mar 27 03:18:24') for l in found[::2])
+    # Continuation lines follow their time stamped line
+    found = list(log.get_between(datetime(2017, 3, 27, 3, 39, 0), datetime(2017, 3, 27, 3, 39, 46)))
+    assert len(found) == 14
+    assert found[-1]['raw_message'].startswith('Mar 27 03:39:43 system rsyslogd-2177')
+    found = list(log.get_between(datetime(2017, 3, 27, 3, 18, 0), datetime(2017, 3, 27, 3, 49, 10), 'pulp'))
+    assert len(found) == 7
+    assert list(log.get_between(datetime(2017, 3, 27, 3, 49, 10), datetime(2017, 3, 27, 3, 49, 0))) == []
+
+    ctx = context_wrap(HTTPD_ACCESS_LOG, path='/var/log/httpd/access_log')
+    log = FakeAccessLog(ctx)
+    assert len(list(log.get_between(datetime(2016, 2, 14, 3, 18, 55), datetime(2016, 2, 14, 3, 20, 0)))) == 2
+
+
+def test_logs_time_index():
+    ctx = context_wrap(MESSAGES_ROLLOVER_YEAR, path='/var/log/messages')
+    log = FakeMessagesClass(ctx)
+    assert len(list(log.get_after(datetime(2017, 1, 1, 1, 0, 0)))) == 6
+    index = log._time_index()
+    assert len(index.positions) == 18
+    assert not index.ordered
+    # The index is reused by the following queries
+    assert len(list(log.get_after(datetime(2017, 12, 31, 23, 0, 0)))) == 15
+    assert log._time_index() is index
+
+    ctx = context_wrap(MESSAGES, path='/var/log/messages')
+    log = FakeMessagesClass(ctx)
+    assert len(list(log.get_after(datetime(2017, 3, 27, 3, 39, 46)))) == 3
+    index = log._time_index()
+    assert index.ordered
+    assert index.bounds(datetime(2017, 3, 27, 3, 39, 46), None) == (len(index.positions) - 3, len(index.positions))
+    # Bisecting is not possible when the year of the logs may be shifted
+    assert index.bounds(datetime(2017, 1, 1, 0, 0, 0), None) is None
+    assert len(list(log.get_after(datetime(2017, 1, 1, 0, 0, 0)))) == len(log.lines)
@@ -36,3 +36,26 @@ def test_syslog():
     systemd_logs = list(msg_info.get_logs_by_procname('systemd'))
     assert len(systemd_logs) == 1
     assert systemd_logs[0]['timestamp'] == 'May  5 03:50:01'
+
+
+def test_syslog_parsed_lines():
+    msg_info = Syslog(context_wrap(MSGINFO))
+    assert list(msg_info.get_logs_by_procname('yum[11954]')) == msg_info.get('sos-3.2')
+    cached = msg_info._syslog_lines()
+    assert sorted(cached.procnames) == sorted([
+        'CROND', 'CROND[27921]', 'CROND[30677]', 'crontab', 'crontab[28951]', 'crontab[32515]', 'ehtest',
+        'systemd', 'jabberd/sm', 'jabberd/sm[11057]', 'wrapper', 'wrapper[11375]',
+        'yum', 'yum[11597]', 'yum[11954]', ''
+    ])
+    # the hostnames and procnames are stored once
+    assert cached.strings.count('lxc-rhel68-sat56') == 1
+    assert cached.strings.count('wrapper[11375]') == 1
+    assert list(msg_info.get_logs_by_procname('')) == [{
+        'raw_message': MSGINFO.splitlines()[5],
+        'message': 'crontab[12345]: { # this line will be skipped by `_parse_line`',
+    }]
+    # the dictionaries are the ones of _parse_line, and not shared
+    for i, line in enumerate(msg_info.lines):
+        assert msg_info._parse_line_at(i) == msg_info._parse_line(line)
+    msg_info.get('Wrapper')[0]['message'] = 'changed'
+    assert msg_info.get('Wrapper')[0]['message'] == "--> Wrapper Started as Daemon"
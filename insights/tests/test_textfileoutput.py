@@ -162,3 +162,52 @@ def test_lines_2():
     ctx = context_wrap(MESSAGES_ROLLOVER_YEAR, path='/var/log/messages')
     log = FakeMessagesClass(ctx)
     assert len(log.lines) == 18
+
+
+class FakeIndexedClass(TextFileOutput):
+    pass
+
+
+FakeIndexedClass.token_scan('xinetd_found', 'xinetd')
+FakeIndexedClass.keep_scan('nrpe_starts', ['START', 'nrpe'])
+FakeIndexedClass.last_scan('last_catalog', 'catalog')
+FakeIndexedClass.token_scan('kernel_found', 'kernel')
+
+
+def test_token_index():
+    ctx = context_wrap(MESSAGES_ROLLOVER_YEAR, path='/var/log/messages')
+    log = FakeIndexedClass(ctx)
+    # All the tokens of the scanners are indexed while parsing
+    index = log._token_index()
+    assert sorted(index) == ['START', 'catalog', 'kernel', 'nrpe', 'xinetd']
+    assert index['catalog'] == [0, 5, 6]
+    assert index['kernel'] == []
+    assert log.xinetd_found is True
+    assert log.kernel_found is False
+    assert len(log.nrpe_starts) == 3
+    assert log.last_catalog == {'raw_line': MESSAGES_ROLLOVER_YEAR.splitlines()[6]}
+
+    # The tokens searched with get are indexed too
+    assert [l['raw_line'] for l in log.get(['EXIT', 'vnetd'], check=any, num=2, reverse=True)] == \
+        MESSAGES_ROLLOVER_YEAR.splitlines()[15:18:2]
+    assert 'EXIT' in index and 'vnetd' in index
+    assert 'vnetd' in log
+    assert log.get('nrpe', num=0) == []
+
+    # The index is reset when the lines are replaced
+    log.lines = log.lines[:6]
+    assert log.get('nrpe') == []
+    assert log._token_index() is not index
+
+
+class FakeUnscannedClass(TextFileOutput):
+    pass
+
+
+def test_token_index_lazy():
+    ctx = context_wrap(MESSAGES_ROLLOVER_YEAR, path='/var/log/messages')
+    log = FakeUnscannedClass(ctx)
+    # Nothing is indexed until it's searched
+    assert log._token_index() == {}
+    assert len(log.get('catalog')) == 3
+    assert list(log._token_index()) == ['catalog']
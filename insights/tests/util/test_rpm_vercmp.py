@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 import pytest
-from insights.util.rpm_vercmp import _rpm_vercmp, version_compare
+from insights.util.rpm_vercmp import _rpm_vercmp, version_compare, version_key
 
 
 # data copied from
@@ -187,3 +187,12 @@ def test_version_compare():
     assert version_compare(rpm1, rpm2) == -1
     assert version_compare(rpm3, rpm4) == 1
     assert version_compare(rpm4, rpm5) == -1
+
+
+def test_version_key(rpm_data):
+    for l, r, expected in rpm_data:
+        lk, rk = version_key(l), version_key(r)
+        actual = -1 if lk < rk else 1 if lk > rk else 0
+        assert actual == expected, (l, r, actual, expected)
+    assert version_key(None) < version_key('') < version_key('0')
+    assert version_key('1.0~rc1') < version_key('1.0') < version_key('1.0^git1') < version_key('1.0a')
@@ -0,0 +1,48 @@
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from insights.util import watchdog
+from insights.util.subproc import call
+
+
+def _sleep_with_deadline(timeout, secs):
+    start = time.time()
+    with watchdog.deadline(timeout) as dl:
+        rc, _ = call("sh -c 'sleep {0} & sleep {0}'".format(secs), keep_rc=True)
+    return dl, rc, time.time() - start
+
+
+def test_deadline_expired():
+    dl, rc, elapsed = _sleep_with_deadline(1, 10)
+    assert dl.expired
+    assert rc != 0
+    assert elapsed < 5
+    assert watchdog.active_deadlines() == []
+
+
+def test_deadline_not_expired():
+    dl, rc, elapsed = _sleep_with_deadline(10, 0)
+    assert not dl.expired
+    assert rc == 0
+    assert watchdog.popen_kwargs() == {}
+
+
+def test_deadline_in_threads():
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda t: _sleep_with_deadline(*t), [(1, 10), (10, 0)] * 2))
+    assert time.time() - start < 5
+    assert [dl.expired for dl, _, _ in results] == [True, False] * 2
+
+
+def test_deadline_nested():
+    with watchdog.deadline(1) as outer:
+        with watchdog.deadline(10) as inner:
+            assert watchdog.active_deadlines() == [outer, inner]
+            assert watchdog.popen_kwargs() == {"start_new_session": True}
+            rc, _ = call("sleep 10", keep_rc=True)
+        assert watchdog.active_deadlines() == [outer]
+    assert outer.expired
+    assert not inner.expired
+    assert rc != 0
@@ -119,3 +119,61 @@ def size(path):
     """
 
     return os.stat(path).st_size
+
+
+def reverse_readlines(path, start=0, blocksize=65536, opener=open):
+    """Read the lines of a text file backwards, from the last line.
+
+    The file is read in blocks from its end, so only one block and the
+    current line are kept in memory.  The lines are decoded as UTF-8 with
+    "surrogateescape" and split like the universal newlines mode of ``open``.
+
+    Parameters
+    ----------
+    path : str
+        absolute path to a file.
+    start : int
+        the offset to stop reading at.  When it's not 0, the first line,
+        which is likely broken, is discarded.
+    blocksize : int
+        the size of each block read from the file.
+    opener : function
+        called with the `path` and ``"rb"`` to open the file, e.g. the
+        ``open`` of an :class:`insights.core.vfs.ArchiveFS`.
+
+    Yields
+    ------
+    str
+        the lines without newline in reverse order.
+    """
+
+    def _lines(raw):
+        line = raw.decode("utf-8", "surrogateescape")
+        if line.endswith("\r"):
+            line = line[:-1]
+        if "\r" in line:
+            return reversed(line.replace("\r\n", "\n").replace("\r", "\n").split("\n"))
+        return [line]
+
+    with opener(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        last = True
+        while pos > start:
+            read_size = min(blocksize, pos - start)
+            pos -= read_size
+            f.seek(pos)
+            pieces = (f.read(read_size) + tail).split(b"\n")
+            # the first piece might be continued in the previous block
+            tail = pieces[0]
+            if last:
+                last = False
+                if pieces[-1] == b"" and len(pieces) > 1:
+                    # the last line ends with newline
+                    pieces.pop()
+            for raw in reversed(pieces[1:]):
+                for line in _lines(raw):
+                    yield line
+        if start == 0 and (tail or not last):
+            for line in _lines(tail):
+                yield line
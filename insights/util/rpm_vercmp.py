@@ -14,9 +14,13 @@ and non-ascii characters.
 https://raw.githubusercontent.com/rpm-software-management/rpm/master/tests/rpmvercmp.at
 """
 
+import re
+
 from collections import deque
 from itertools import takewhile
 
+_SEGMENT_RE = re.compile(r"~|\^|[0-9]+|[a-zA-Z]+")
+
 
 def _rpm_vercmp(a, b):
     if a == b:
@@ -128,6 +132,35 @@ def _rpm_vercmp(a, b):
     return 1
 
 
+def version_key(version):
+    """
+    Returns a key of the `version` string ordered as `_rpm_vercmp` compares
+    the versions: the keys of two versions compare the same as the versions.
+
+    The version is split in its tilde, caret, alpha and numeric segments,
+    ordered as they're compared: a tilde sorts before the end of a version,
+    which sorts before a caret, which sorts before alpha segments, which sort
+    before numeric ones.  The key of ``None`` sorts before any other like in
+    `rpm.labelCompare`.
+    """
+    if version is None:
+        return ()
+    key = []
+    # non-ascii characters are separators, as the other non-alphanumerics
+    for segment in _SEGMENT_RE.findall(str(version)):
+        if segment == "~":
+            key.append((0,))
+        elif segment == "^":
+            key.append((2,))
+        elif segment.isdigit():
+            key.append((4, int(segment)))
+        else:
+            key.append((3, segment))
+    # the end of the version
+    key.append((1,))
+    return tuple(key)
+
+
 try:
     import rpm
     from functools import cmp_to_key
@@ -8,7 +8,7 @@ import signal
 from contextlib import contextmanager
 from subprocess import Popen, PIPE, STDOUT
 
-from insights.util import which
+from insights.util import watchdog, which
 
 stream_options = {
     "bufsize": -1,  # use OS defaults. Non buffered if not set.
@@ -61,7 +61,10 @@ def stream(command, stdin=None, env=os.environ, timeout=None):
 
     output = None
     try:
-        output = Popen(command, env=env, stdin=stdin, **stream_options)
+        options = dict(stream_options)
+        # started in own process group to be killed by the active deadlines
+        options.update(watchdog.popen_kwargs())
+        output = watchdog.register(Popen(command, env=env, stdin=stdin, **options))
         yield output.stdout
     finally:
         if output:
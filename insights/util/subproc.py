@@ -6,7 +6,7 @@ import signal
 from subprocess import Popen, PIPE, STDOUT
 
 from insights.core.exceptions import CalledProcessError
-from insights.util import which
+from insights.util import watchdog, which
 
 try:
     from subprocess import DEVNULL
@@ -68,43 +68,57 @@ class Pipeline(object):
 
     def _build_pipes(self, out_stream=PIPE):
         log.debug("Executing: %s" % str(self.cmds))
+        # started in own process group to be killed by the active deadlines
+        extra = watchdog.popen_kwargs()
         if len(self.cmds) == 1:
-            return Popen(
+            return watchdog.register(
+                Popen(
+                    self.cmds[0],
+                    bufsize=self.bufsize,
+                    stdin=DEVNULL,
+                    stderr=STDOUT,
+                    stdout=out_stream,
+                    env=self.env,
+                    **extra
+                )
+            )
+
+        stdout = watchdog.register(
+            Popen(
                 self.cmds[0],
                 bufsize=self.bufsize,
                 stdin=DEVNULL,
                 stderr=STDOUT,
-                stdout=out_stream,
+                stdout=PIPE,
                 env=self.env,
+                **extra
             )
-
-        stdout = Popen(
-            self.cmds[0],
-            bufsize=self.bufsize,
-            stdin=DEVNULL,
-            stderr=STDOUT,
-            stdout=PIPE,
-            env=self.env,
         ).stdout
         last = len(self.cmds) - 2
         for i, arg in enumerate(self.cmds[1:]):
             if i < last:
-                stdout = Popen(
-                    arg,
-                    bufsize=self.bufsize,
-                    stdin=stdout,
-                    stderr=STDOUT,
-                    stdout=PIPE,
-                    env=self.env,
+                stdout = watchdog.register(
+                    Popen(
+                        arg,
+                        bufsize=self.bufsize,
+                        stdin=stdout,
+                        stderr=STDOUT,
+                        stdout=PIPE,
+                        env=self.env,
+                        **extra
+                    )
                 ).stdout
             else:
-                return Popen(
-                    arg,
-                    bufsize=self.bufsize,
-                    stdin=stdout,
-                    stderr=STDOUT,
-                    stdout=out_stream,
-                    env=self.env,
+                return watchdog.register(
+                    Popen(
+                        arg,
+                        bufsize=self.bufsize,
+                        stdin=stdout,
+                        stderr=STDOUT,
+                        stdout=out_stream,
+                        env=self.env,
+                        **extra
+                    )
                 )
 
     def __call__(self, keep_rc=False):
@@ -0,0 +1,184 @@
+"""
+Deadline Watchdog
+=================
+
+Deadlines for the code running in any thread or process, without relying on
+``signal.SIGALRM`` which only works in the main thread.
+
+A deadline is started with :func:`deadline` in the current thread.  The
+subprocesses spawned in that thread by :mod:`insights.util.subproc` and
+:mod:`insights.util.streams` while the deadline is active are started in their
+own process group and are registered to the deadline.  Once the deadline
+expires, a single watchdog thread per process kills the registered process
+groups, so that a hung command returns immediately.  The code holding the
+deadline checks :attr:`Deadline.expired` when it's done.
+
+.. code-block:: python
+
+    with deadline(10) as dl:
+        rc, output = call("sleep 60", keep_rc=True)
+    assert dl.expired
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+
+class Deadline(object):
+    """
+    A deadline of `timeout` seconds from now and the subprocesses spawned
+    under it.
+
+    Attributes:
+        timeout (int): the timeout in seconds.
+        expires (float): the time when it expires, see :func:`time.time`.
+        expired (bool): whether it's expired.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.expires = time.time() + timeout
+        self.expired = False
+        self._procs = []
+        self._lock = threading.Lock()
+
+    def register(self, proc):
+        """
+        Register a subprocess, it's killed when the deadline expires.  It's
+        killed immediately if the deadline is already expired.
+        """
+        with self._lock:
+            self._procs = [p for p in self._procs if p.poll() is None]
+            self._procs.append(proc)
+            expired = self.expired
+        if expired:
+            _kill(proc)
+
+    def expire(self):
+        """
+        Mark the deadline as expired and kill the registered subprocesses.
+        """
+        with self._lock:
+            self.expired = True
+            procs, self._procs = self._procs, []
+        for proc in procs:
+            _kill(proc)
+
+
+def _kill(proc):
+    if proc.poll() is not None:
+        return
+    log.debug("Killing process group %s", proc.pid)
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        try:
+            proc.kill()
+        except OSError:
+            pass
+
+
+class _Watchdog(object):
+    """
+    The thread expiring the active deadlines of the process.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._counter = itertools.count()
+        self._pid = None
+
+    def _ensure_thread(self):
+        # the thread doesn't survive a fork, e.g. in a process pool
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._heap = []
+            thread = threading.Thread(target=self._run, name="insights-watchdog")
+            thread.daemon = True
+            thread.start()
+
+    def add(self, dl):
+        with self._cond:
+            self._ensure_thread()
+            heapq.heappush(self._heap, (dl.expires, next(self._counter), dl))
+            self._cond.notify()
+
+    def _run(self):
+        with self._cond:
+            while True:
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    heapq.heappop(self._heap)[2].expire()
+                # wake up at the next deadline, or when a deadline is added
+                self._cond.wait(self._heap[0][0] - now if self._heap else None)
+
+    def remove(self, dl):
+        with self._cond:
+            self._heap = [e for e in self._heap if e[2] is not dl]
+            heapq.heapify(self._heap)
+
+
+_WATCHDOG = _Watchdog()
+_local = threading.local()
+
+
+def active_deadlines():
+    """
+    Returns:
+        list: the deadlines active in the current thread, innermost last.
+    """
+    return getattr(_local, "deadlines", [])
+
+
+@contextmanager
+def deadline(timeout):
+    """
+    Start a deadline of `timeout` seconds for the current thread.
+
+    Yields:
+        Deadline: the started deadline.
+    """
+    dl = Deadline(timeout)
+    _local.deadlines = active_deadlines() + [dl]
+    _WATCHDOG.add(dl)
+    try:
+        yield dl
+    finally:
+        _local.deadlines = [d for d in active_deadlines() if d is not dl]
+        _WATCHDOG.remove(dl)
+
+
+def popen_kwargs():
+    """
+    Returns:
+        dict: the extra keyword arguments of :class:`subprocess.Popen` to start
+        the subprocess in its own process group when a deadline is active.
+    """
+    if not active_deadlines():
+        return {}
+    if sys.version_info[0] >= 3:
+        return {"start_new_session": True}
+    return {"preexec_fn": os.setsid}  # pragma: no cover
+
+
+def register(proc):
+    """
+    Register the subprocess to all the deadlines active in the current thread.
+
+    Returns:
+        Popen: the `proc`
+    """
+    for dl in active_deadlines():
+        dl.register(proc)
+    return proc